@@ -0,0 +1,174 @@
+# FYP_Scraper/FYP_Scraper/dates.py
+"""
+Date parsing shared by the spiders and the MongoDB pipeline.
+
+The sites print dates in Pakistan local time and in several formats
+("12 Mar, 2025", "Mar 12, 2025", "12 Mar 2025", "2025-03-12", Urdu month
+names). parse_local() turns any of them into a naive local datetime for
+listing-level comparisons; published_at() gives the UTC instant that is
+stored as a BSON date next to the original string. Both are memoized:
+listing pages repeat the same few dates many times. DateWindow is the
+[since, until] range of publication dates a crawl is limited to.
+
+Articles written before published_at existed can be backfilled with
+
+    python -m FYP_Scraper.dates
+"""
+
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+import re
+
+# Pakistan Standard Time, no daylight saving
+PKT = timezone(timedelta(hours=5), 'PKT')
+
+URDU_MONTHS = {
+    "جنوری": "Jan", "فروری": "Feb", "مارچ": "Mar", "اپریل": "Apr",
+    "مئی": "May", "جون": "Jun", "جولائی": "Jul", "اگست": "Aug",
+    "ستمبر": "Sep", "اکتوبر": "Oct", "نومبر": "Nov", "دسمبر": "Dec",
+}
+
+DATE_FORMATS = [
+    "%d %b, %Y",  # city42: 12 Mar, 2025
+    "%b %d, %Y",  # nawaiwaqt: Mar 12, 2025
+    "%d %b %Y",  # urdupoint, daily pakistan URLs: 12 Mar 2025
+    "%d %B, %Y",
+    "%B %d, %Y",
+    "%d %B %Y",
+    "%Y-%m-%d",  # dunya archive date
+    "%d-%b-%Y",
+    "%d/%m/%Y",
+]
+
+TIME_FORMATS = ["%I:%M %p", "%I:%M%p", "%H:%M", "%I:%M:%S %p", "%H:%M:%S"]
+
+_URDU_MONTH_RE = re.compile("|".join(URDU_MONTHS))
+
+
+@lru_cache(maxsize=4096)
+def parse_local(text, time_text=None):
+    """
+    Parse a date (and optional time of day) as printed by the sites.
+
+    Returns a naive datetime in Pakistan local time, or None when the text
+    matches none of DATE_FORMATS. An unparsable time is ignored.
+    """
+    if not text:
+        return None
+    text = _URDU_MONTH_RE.sub(lambda match: URDU_MONTHS[match.group(0)], " ".join(text.split()))
+    for date_format in DATE_FORMATS:
+        try:
+            parsed = datetime.strptime(text, date_format)
+            break
+        except ValueError:
+            continue
+    else:
+        return None
+
+    if time_text:
+        time_text = " ".join(time_text.split()).upper()
+        for time_format in TIME_FORMATS:
+            try:
+                time_of_day = datetime.strptime(time_text, time_format)
+            except ValueError:
+                continue
+            return parsed.replace(hour=time_of_day.hour, minute=time_of_day.minute, second=time_of_day.second)
+    return parsed
+
+
+def to_utc(local):
+    """Convert a naive Pakistan local datetime to an aware UTC one."""
+    return local.replace(tzinfo=PKT).astimezone(timezone.utc)
+
+
+def published_at(text, time_text=None):
+    """UTC publication time for a date string (and time), or None."""
+    local = parse_local(text, time_text if time_text != 'N/A' else None)
+    return to_utc(local) if local else None
+
+
+class DateWindow:
+    """
+    Publication dates a crawl is limited to, as naive Pakistan local times.
+
+    `since` and `until` are dates as accepted by parse_local() ("2024-01-31")
+    and either may be left open; `until` includes the whole day. Spiders
+    build it from their since/until arguments, falling back to the
+    CRAWL_SINCE / CRAWL_UNTIL settings:
+
+        scrapy crawl dunya_news -a since=2025-01-01 -a until=2025-03-31
+    """
+
+    def __init__(self, since=None, until=None):
+        self.since = self.parse(since, 'since')
+        until = self.parse(until, 'until')
+        if until and until == until.replace(hour=0, minute=0, second=0):
+            until += timedelta(days=1)  # up to the end of that day
+        self.until = until
+
+    @classmethod
+    def from_spider(cls, spider):
+        settings = spider.settings
+        return cls(
+            getattr(spider, 'since', None) or settings.get('CRAWL_SINCE'),
+            getattr(spider, 'until', None) or settings.get('CRAWL_UNTIL'),
+        )
+
+    @staticmethod
+    def parse(value, name):
+        if not value:
+            return None
+        if isinstance(value, datetime):
+            return value
+        parsed = parse_local(str(value))
+        if parsed is None:
+            raise ValueError(f"Invalid {name} date: {value!r}")
+        return parsed
+
+    def too_old(self, date):
+        return bool(self.since and date < self.since)
+
+    def too_new(self, date):
+        return bool(self.until and date >= self.until)
+
+    def __contains__(self, date):
+        return not (self.too_old(date) or self.too_new(date))
+
+    def __repr__(self):
+        return f"DateWindow(since={self.since}, until={self.until})"
+
+
+def backfill(db, batch_size=1000):
+    """Set published_at on stored articles that lack it, in every *_raw collection."""
+    from pymongo import UpdateOne
+
+    for collection_name in db.list_collection_names():
+        if not collection_name.endswith('_raw'):
+            continue
+        collection = db[collection_name]
+        cursor = collection.find(
+            {'published_at': {'$exists': False}},
+            {'date': 1, 'reported_time': 1},
+        )
+        updates = []
+        updated = 0
+        for doc in cursor:
+            published = published_at(doc.get('date'), doc.get('reported_time'))
+            if published:
+                updates.append(UpdateOne({'_id': doc['_id']}, {'$set': {'published_at': published}}))
+            if len(updates) >= batch_size:
+                updated += collection.bulk_write(updates, ordered=False).modified_count
+                updates = []
+        if updates:
+            updated += collection.bulk_write(updates, ordered=False).modified_count
+        print(f"{collection_name}: set published_at on {updated} articles")
+
+
+if __name__ == '__main__':
+    from FYP_Scraper.mongo import get_client, get_mongo_uri, release_client
+
+    client = get_client(get_mongo_uri())
+    try:
+        backfill(client['news_db'])
+    finally:
+        release_client(client)
@@ -0,0 +1,225 @@
+# FYP_Scraper/FYP_Scraper/export.py
+"""
+Streaming export of scraped articles to partitioned Parquet and JSONL files.
+
+Files are laid out with Hive-style partitions by source and publication
+month (Pakistan time), one set of part files per crawl:
+
+    exports/parquet/source=24_news/month=2025-03/part-24_news-20250312T101500-00000.parquet
+    exports/jsonl/source=24_news/month=2025-03/part-24_news-20250312T101500-00000.jsonl
+
+so analytics jobs can prune partitions and read only the columns they need:
+
+    import pyarrow.dataset as ds
+    dataset = ds.dataset("exports/parquet", partitioning="hive")
+    table = dataset.to_table(
+        columns=["title", "published_at"],
+        filter=(ds.field("source") == "24_news") & (ds.field("month") == "2025-03"),
+    )
+
+Parquet rows are buffered per partition and written as row groups of at
+most `row_group_size` rows. A part file is written under a hidden
+temporary name (ignored by pyarrow's dataset discovery) and renamed into
+place once it reaches `max_file_bytes` or the crawl ends, so readers never
+see a partial file. Parquet needs pyarrow, which is optional.
+"""
+
+from datetime import datetime, timezone
+import json
+import os
+
+from FYP_Scraper.dates import PKT, published_at
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pyarrow is optional; only the JSONL export works without it
+    pyarrow = None
+
+# Columns of an exported article; partition columns (source, month) are
+# taken from the directory names
+COLUMNS = [
+    ('url', 'string'),
+    ('title', 'string'),
+    ('content', 'string'),
+    ('date', 'string'),
+    ('reported_time', 'string'),
+    ('published_at', 'timestamp'),
+    ('category', 'string'),
+    ('categories', 'list'),
+    ('matched_keywords', 'list'),
+    ('matched_locations', 'list'),
+    ('story_cluster_id', 'int'),
+]
+
+
+def parquet_schema():
+    types = {
+        'string': pyarrow.string(),
+        'timestamp': pyarrow.timestamp('ms', tz='UTC'),
+        'list': pyarrow.list_(pyarrow.string()),
+        'int': pyarrow.int64(),
+    }
+    return pyarrow.schema([(name, types[kind]) for name, kind in COLUMNS])
+
+
+def partition_of(row):
+    """Return (source, month) for an article row."""
+    published = row.get('published_at')
+    month = published.astimezone(PKT).strftime('%Y-%m') if published else 'unknown'
+    return row.get('source') or 'unknown', month
+
+
+class PartFile:
+    """One part file being written under a temporary name."""
+
+    extension = None
+
+    def __init__(self, directory, name):
+        self.path = os.path.join(directory, f"{name}.{self.extension}")
+        self.tmp_path = os.path.join(directory, f".{name}.{self.extension}.tmp")
+        self.rows = 0
+
+    def size(self):
+        return os.path.getsize(self.tmp_path)
+
+    def finish(self):
+        """Close the file and move it into place."""
+        self.close()
+        os.replace(self.tmp_path, self.path)
+
+
+class ParquetPartFile(PartFile):
+    extension = 'parquet'
+
+    def __init__(self, directory, name, schema, compression):
+        super().__init__(directory, name)
+        self.schema = schema
+        self.writer = pyarrow.parquet.ParquetWriter(self.tmp_path, schema, compression=compression)
+
+    def write(self, rows):
+        columns = {name: [row.get(name) for row in rows] for name in self.schema.names}
+        # One call, one row group
+        self.writer.write_table(pyarrow.Table.from_pydict(columns, schema=self.schema), row_group_size=len(rows))
+        self.rows += len(rows)
+
+    def close(self):
+        self.writer.close()
+
+
+class JsonLinesPartFile(PartFile):
+    extension = 'jsonl'
+
+    def __init__(self, directory, name):
+        super().__init__(directory, name)
+        self.file = open(self.tmp_path, 'w', encoding='utf-8')
+
+    def write(self, rows):
+        for row in rows:
+            self.file.write(json.dumps(
+                {name: row.get(name) for name, _ in COLUMNS},
+                ensure_ascii=False, default=lambda value: value.isoformat(),
+            ))
+            self.file.write('\n')
+        self.rows += len(rows)
+
+    def size(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+class PartitionedExporter:
+    """
+    Writes article rows to part files under directory/<format>/source=/month=.
+
+    `formats` is any of 'parquet' and 'jsonl'. Rows wait in per-partition
+    buffers until a partition has `row_group_size` of them, or until
+    `max_buffered_rows` rows are waiting in total, and are then written to
+    the partition's open part file(s).
+    """
+
+    def __init__(self, directory, formats, name, row_group_size=10000, max_file_bytes=128 * 1024 * 1024,
+                 max_buffered_rows=50000, compression='zstd'):
+        unknown = set(formats) - {'parquet', 'jsonl'}
+        if unknown:
+            raise ValueError(f"Unknown export format: {', '.join(sorted(unknown))}")
+        if 'parquet' in formats and pyarrow is None:
+            raise ImportError("Parquet export needs pyarrow (pip install pyarrow)")
+        self.directory = directory
+        self.formats = list(formats)
+        self.name = name
+        self.row_group_size = row_group_size
+        self.max_file_bytes = max_file_bytes
+        self.max_buffered_rows = max_buffered_rows
+        self.compression = compression
+        self.schema = parquet_schema() if 'parquet' in formats else None
+
+        self.buffers = {}  # (source, month) -> rows
+        self.buffered = 0
+        self.open_files = {}  # (format, source, month) -> PartFile
+        self.sequence = 0
+        self.files_written = 0
+        self.rows_written = 0
+        self.bytes_written = 0
+
+    def export(self, row):
+        row = dict(row)
+        if not row.get('published_at'):
+            row['published_at'] = published_at(row.get('date'), row.get('reported_time'))
+        partition = partition_of(row)
+        buffer = self.buffers.setdefault(partition, [])
+        buffer.append(row)
+        self.buffered += 1
+        if len(buffer) >= self.row_group_size:
+            self.flush(partition)
+        elif self.buffered >= self.max_buffered_rows:
+            self.flush_all()
+
+    def flush_all(self):
+        for partition in list(self.buffers):
+            self.flush(partition)
+
+    def flush(self, partition):
+        rows = self.buffers.pop(partition, [])
+        self.buffered -= len(rows)
+        if not rows:
+            return
+        for export_format in self.formats:
+            key = (export_format, *partition)
+            part = self.open_files.get(key) or self.open_part(key)
+            part.write(rows)
+            if part.size() >= self.max_file_bytes:
+                self.finish(key)
+        self.rows_written += len(rows)
+
+    def open_part(self, key):
+        export_format, source, month = key
+        directory = os.path.join(self.directory, export_format, f"source={source}", f"month={month}")
+        os.makedirs(directory, exist_ok=True)
+        name = f"part-{self.name}-{self.sequence:05d}"
+        self.sequence += 1
+        if export_format == 'parquet':
+            part = ParquetPartFile(directory, name, self.schema, self.compression)
+        else:
+            part = JsonLinesPartFile(directory, name)
+        self.open_files[key] = part
+        return part
+
+    def finish(self, key):
+        part = self.open_files.pop(key)
+        part.finish()
+        self.files_written += 1
+        self.bytes_written += os.path.getsize(part.path)
+
+    def close(self):
+        self.flush_all()
+        for key in list(self.open_files):
+            self.finish(key)
+
+
+def run_name(spider_name, now=None):
+    """Part file prefix of a crawl: spider name and UTC start time."""
+    now = now or datetime.now(timezone.utc)
+    return f"{spider_name}-{now:%Y%m%dT%H%M%S}"
@@ -0,0 +1,315 @@
+# Define here your extensions
+#
+# See documentation in:
+# https://docs.scrapy.org/en/latest/topics/extensions.html
+
+import json
+import os
+import re
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from scrapy import signals
+from scrapy.exceptions import CloseSpider, NotConfigured
+from scrapy.utils.project import data_path
+from twisted.internet import threads
+
+from FYP_Scraper.dates import DateWindow
+from FYP_Scraper.metrics import Histogram
+from FYP_Scraper.mongo import get_client, get_mongo_uri, release_client
+from FYP_Scraper.signals import callback_timed, mongodb_write_finished
+
+
+class IncrementalStopController:
+    """
+    Stops pagination once a crawl reaches what the previous run already saw.
+
+    Each source (or source:category) keeps a high-water mark in
+    news_db.crawl_state: the newest article URL and listing date seen by the
+    last successful run. Spiders report every listing page through
+    observe_listing(); once a page reaches the mark they stop requesting
+    further pages, the requests already in flight drain, and the spider
+    closes with reason "caught_up". The mark only advances when a run ends
+    normally, so an interrupted crawl never hides older unseen articles.
+
+    A run bounded by `until` (CRAWL_UNTIL or -a until=..., a backfill of an
+    older range) neither stops at the mark nor moves it: its newest article
+    is not the newest one the site has.
+    """
+
+    def __init__(self, mongo_uri, stats=None):
+        self.mongo_uri = mongo_uri
+        self.stats = stats
+        self.marks = {}  # key -> {'newest_url': ..., 'newest_date': ...} from the last run
+        self.newest_urls = {}  # key -> (page, first URL on that page) seen this run
+        self.newest_dates = {}  # key -> newest listing date seen this run
+        self.caught_up = set()
+        self.backfill = False
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool('INCREMENTAL_STOP_ENABLED'):
+            raise NotConfigured
+        extension = cls(get_mongo_uri(), stats=crawler.stats)
+        crawler.signals.connect(extension.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(extension.spider_idle, signal=signals.spider_idle)
+        crawler.signals.connect(extension.spider_closed, signal=signals.spider_closed)
+        return extension
+
+    def spider_opened(self, spider):
+        until = DateWindow.from_spider(spider).until
+        if until:
+            self.backfill = True
+            spider.logger.info(f"Crawling up to {until}: high-water marks are neither used nor updated")
+            return None
+        spider.stop_controller = self
+        sources = getattr(spider, 'sources', None) or [getattr(spider, 'source', spider.name)]
+        d = threads.deferToThread(self.load_marks, sources)
+        d.addCallback(self._marks_loaded, spider)
+        d.addErrback(self._marks_failed, spider)
+        return d
+
+    def load_marks(self, sources):
+        client = get_client(self.mongo_uri)
+        try:
+            # Keys are the source itself or "source:category"
+            names = '|'.join(re.escape(source) for source in sources)
+            query = {'_id': {'$regex': f"^(?:{names})(:|$)"}}
+            return {doc['_id']: doc for doc in client['news_db']['crawl_state'].find(query)}
+        finally:
+            release_client(client)
+
+    def _marks_loaded(self, marks, spider):
+        self.marks = marks
+        for key, mark in marks.items():
+            spider.logger.info(f"High-water mark for {key}: {mark.get('newest_url')} ({mark.get('newest_date')})")
+
+    def _marks_failed(self, failure, spider):
+        spider.logger.error(f"Could not load crawl state, crawling without a stop mark: {failure.getErrorMessage()}")
+
+    def observe_listing(self, spider, urls, page=0, dates=None, key=None):
+        """
+        Record one listing page (newest first) and return False once it has
+        reached the previous run's mark, i.e. no further pages are needed.
+        """
+        key = key or getattr(spider, 'source', spider.name)
+        urls = [url for url in urls if url]
+        dates = [date for date in (dates or []) if date]
+        if not urls:
+            return True
+
+        # Listing pages may arrive out of order, so the new mark is the first
+        # URL of the lowest page and the newest date across all pages
+        if key not in self.newest_urls or page < self.newest_urls[key][0]:
+            self.newest_urls[key] = (page, urls[0])
+        newest_date = max(dates) if dates else None
+        if newest_date and (key not in self.newest_dates or newest_date > self.newest_dates[key]):
+            self.newest_dates[key] = newest_date
+
+        mark = self.marks.get(key)
+        if not mark:
+            return True
+        if newest_date and mark.get('newest_date') and newest_date < mark['newest_date']:
+            reached = True
+        else:
+            reached = mark.get('newest_url') in urls
+        if reached and key not in self.caught_up:
+            self.caught_up.add(key)
+            if self.stats:
+                self.stats.inc_value('incremental/caught_up')
+            spider.logger.info(f"{key}: listing page {page} reached the previous run's articles, stopping pagination")
+        return not reached
+
+    def is_caught_up(self, key):
+        return key in self.caught_up
+
+    def spider_idle(self, spider):
+        # Everything in flight has drained by now; report why we stopped
+        if self.caught_up and self.caught_up >= set(self.newest_urls):
+            raise CloseSpider('caught_up')
+
+    def spider_closed(self, spider, reason):
+        if reason not in ('finished', 'caught_up') or not self.newest_urls or self.backfill:
+            return
+        return threads.deferToThread(self.save_marks, spider)
+
+    def save_marks(self, spider):
+        client = get_client(self.mongo_uri)
+        try:
+            collection = client['news_db']['crawl_state']
+            for key, (_, newest_url) in self.newest_urls.items():
+                newest_date = self.newest_dates.get(key)
+                update = {'newest_url': newest_url, 'updated_at': datetime.now(timezone.utc)}
+                if newest_date:
+                    update['newest_date'] = newest_date
+                collection.update_one({'_id': key}, {'$set': update}, upsert=True)
+                spider.logger.info(f"Saved high-water mark for {key}: {newest_url} ({newest_date})")
+        finally:
+            release_client(client)
+
+
+class CrawlMetrics:
+    """
+    Latency histograms for a crawl, exported when the spider closes.
+
+    Three histograms are kept:
+
+    - download latency per spider, domain and proxy ("direct" without one),
+      from the downloader's download_latency; responses served from the
+      HTTP cache are left out;
+    - callback time per spider callback (parse_ajax, parse_article, ...),
+      reported by CallbackTimingMiddleware;
+    - MongoDB write latency per pipeline and operation, split into
+      successful and failed writes.
+
+    At close they are written to METRICS_DIR (under .scrapy) as
+    {spider}.prom in the Prometheus text format and/or {spider}.json, per
+    METRICS_FORMATS, and a compact summary of the run is stored in
+    news_db.crawl_runs.
+    """
+
+    def __init__(self, directory, formats, mongo_enabled=True, stats=None):
+        unknown = set(formats) - {'prometheus', 'json'}
+        if unknown:
+            raise ValueError(f"Unknown metrics format: {', '.join(sorted(unknown))}")
+        self.directory = directory
+        self.formats = list(formats)
+        self.mongo_enabled = mongo_enabled
+        self.stats = stats
+        self.download_latency = Histogram(
+            'scrapy_download_latency_seconds', 'Time from sending a request to receiving its response headers.',
+            ('spider', 'domain', 'proxy'),
+        )
+        self.callback_duration = Histogram(
+            'scrapy_callback_duration_seconds', 'Time spent in spider callbacks, per response.',
+            ('spider', 'callback'),
+        )
+        self.write_latency = Histogram(
+            'scrapy_mongodb_write_seconds', 'Duration of MongoDB writes made by the item pipelines.',
+            ('pipeline', 'operation', 'outcome'),
+        )
+        self.started_at = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool('METRICS_ENABLED'):
+            raise NotConfigured
+        extension = cls(
+            data_path(settings.get('METRICS_DIR', 'metrics'), createdir=True),
+            settings.getlist('METRICS_FORMATS', ['prometheus', 'json']),
+            mongo_enabled=settings.getbool('METRICS_MONGO_ENABLED', True),
+            stats=crawler.stats,
+        )
+        crawler.signals.connect(extension.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(extension.response_received, signal=signals.response_received)
+        crawler.signals.connect(extension.callback_timed, signal=callback_timed)
+        crawler.signals.connect(extension.write_finished, signal=mongodb_write_finished)
+        crawler.signals.connect(extension.spider_closed, signal=signals.spider_closed)
+        return extension
+
+    def spider_opened(self, spider):
+        self.started_at = datetime.now(timezone.utc)
+
+    def response_received(self, response, request, spider):
+        latency = request.meta.get('download_latency')
+        if latency is None or 'cached' in response.flags:
+            return
+        self.download_latency.observe(
+            latency, spider.name, urlsplit(response.url).hostname or '', proxy_label(request.meta.get('proxy')),
+        )
+
+    def callback_timed(self, spider, callback, duration):
+        self.callback_duration.observe(duration, spider.name, callback)
+
+    def write_finished(self, pipeline, operation, latency, succeeded):
+        self.write_latency.observe(latency, pipeline, operation, 'success' if succeeded else 'error')
+
+    def histograms(self):
+        return [self.download_latency, self.callback_duration, self.write_latency]
+
+    def spider_closed(self, spider, reason):
+        finished_at = datetime.now(timezone.utc)
+        try:
+            self.write_files(spider)
+        except OSError as e:
+            spider.logger.error(f"Could not write crawl metrics: {e}")
+        if not self.mongo_enabled:
+            return
+        document = self.run_document(spider, reason, finished_at)
+        d = threads.deferToThread(self.save_run, document)
+        d.addErrback(lambda failure: spider.logger.error(
+            f"Could not store the crawl run summary: {failure.getErrorMessage()}"
+        ))
+        return d
+
+    def write_files(self, spider):
+        outputs = {}
+        if 'prometheus' in self.formats:
+            lines = []
+            for histogram in self.histograms():
+                # Writes are labelled by pipeline only; add the spider
+                const_labels = {'spider': spider.name} if histogram is self.write_latency else None
+                lines.extend(histogram.prometheus(const_labels))
+            outputs[f"{spider.name}.prom"] = '\n'.join(lines) + '\n'
+        if 'json' in self.formats:
+            outputs[f"{spider.name}.json"] = json.dumps(
+                {histogram.name: histogram.summary() for histogram in self.histograms()}, indent=2,
+            )
+        for name, text in outputs.items():
+            # Written aside and renamed, so a node_exporter textfile
+            # collector never reads a half-written file
+            path = os.path.join(self.directory, name)
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(path + '.tmp', path)
+            spider.logger.info(f"Crawl metrics written to {path}")
+
+    def run_document(self, spider, reason, finished_at):
+        stats = self.stats.get_stats() if self.stats else {}
+        started_at = self.started_at or stats.get('start_time') or finished_at
+        duration = (finished_at - started_at).total_seconds()
+        items = stats.get('item_scraped_count', 0)
+        responses = stats.get('response_received_count', 0)
+        return {
+            'spider': spider.name,
+            'started_at': started_at,
+            'finished_at': finished_at,
+            'reason': reason,
+            'duration': round(duration, 3),
+            'items': items,
+            'responses': responses,
+            'items_per_minute': round(items * 60 / duration, 2) if duration else 0,
+            'stats': {
+                key.replace('.', '_'): value for key, value in stats.items()
+                if key.startswith(RUN_STAT_PREFIXES) and isinstance(value, (int, float))
+            },
+            'download_latency': self.download_latency.summary(),
+            'callback_duration': self.callback_duration.summary(),
+            'mongodb_writes': self.write_latency.summary(),
+        }
+
+    def save_run(self, document):
+        client = get_client(get_mongo_uri())
+        try:
+            client['news_db']['crawl_runs'].insert_one(document)
+        finally:
+            release_client(client)
+
+
+# Stats worth keeping in the per-run document; per-status or per-exception
+# counters are kept too, everything else stays in the crawl log
+RUN_STAT_PREFIXES = (
+    'downloader/request_count', 'downloader/response_count', 'downloader/response_status_count/',
+    'downloader/exception_count', 'retry/', 'httpcache/', 'mongodb/', 'item_dropped_count',
+    'log_count/ERROR', 'log_count/WARNING', 'date_window/', 'incremental/', 'known_urls/', 'proxy_pool/',
+    'spool/', 'story_clusters/', 'export/', 'adaptive_throttle/', 'weather/',
+)
+
+
+def proxy_label(proxy):
+    """Proxy host:port without credentials, or "direct"."""
+    if not proxy:
+        return 'direct'
+    parts = urlsplit(proxy if '://' in proxy else f"http://{proxy}")
+    return f"{parts.hostname}:{parts.port}" if parts.port else parts.hostname or 'direct'
@@ -0,0 +1,55 @@
+# FYP_Scraper/FYP_Scraper/extraction.py
+
+
+class ParagraphExtractor:
+    """
+    Joins the paragraph text of an article body in one walk over its element.
+
+    Each element matching `root` (a CSS selector) is walked once in
+    document order. Elements carrying any of `skip_classes` are skipped with
+    their whole subtree (app banners, related-news boxes). A <p> is kept if it is a direct child of the root,
+    or, when `include_classes` is given, has all of those classes anywhere
+    below it; with direct_only=False every <p> outside a skipped subtree is
+    kept. Each kept paragraph contributes its full text, including text in
+    nested links and formatting tags.
+    """
+
+    def __init__(self, root, skip_classes=(), include_classes=(), direct_only=True, separator=" "):
+        self.root = root
+        self.skip_classes = frozenset(skip_classes)
+        self.include_classes = frozenset(include_classes)
+        self.direct_only = direct_only
+        self.separator = separator
+
+    def paragraphs(self, selector):
+        """Return the stripped, non-empty paragraph texts under the root."""
+        texts = []
+        for root in selector.css(self.root):
+            self.walk(root.root, texts)
+        return texts
+
+    def walk(self, root, texts):
+        stack = [(child, 1) for child in reversed(root)]
+        while stack:
+            element, depth = stack.pop()
+            if not isinstance(element.tag, str):  # comments, processing instructions
+                continue
+            classes = element.get('class')
+            classes = frozenset(classes.split()) if classes else frozenset()
+            if classes & self.skip_classes:
+                continue
+            if element.tag == 'p' and self.keep(depth, classes):
+                text = ''.join(element.itertext()).strip()
+                if text:
+                    texts.append(text)
+                continue
+            stack.extend((child, depth + 1) for child in reversed(element))
+
+    def keep(self, depth, classes):
+        if not self.direct_only or depth == 1:
+            return True
+        return bool(self.include_classes) and self.include_classes <= classes
+
+    def extract(self, selector):
+        """Return the article text, paragraphs joined by the separator."""
+        return self.separator.join(self.paragraphs(selector))
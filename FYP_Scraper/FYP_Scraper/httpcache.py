@@ -0,0 +1,165 @@
+# FYP_Scraper/FYP_Scraper/httpcache.py
+
+import os
+import sqlite3
+import time
+import zlib
+
+from scrapy.extensions.httpcache import RFC2616Policy
+from scrapy.http import Headers
+from scrapy.responsetypes import responsetypes
+from scrapy.utils.project import data_path
+from w3lib.http import headers_dict_to_raw, headers_raw_to_dict
+
+
+def callback_name(request):
+    callback = request.callback
+    if callback is None:
+        return 'parse'
+    return getattr(callback, '__name__', None)
+
+
+class CallbackTTLPolicy(RFC2616Policy):
+    """
+    RFC 2616 caching with a fixed freshness lifetime per spider callback.
+
+    News sites rarely send usable Cache-Control headers, so a request whose
+    callback is listed in HTTPCACHE_CALLBACK_TTLS is served from the cache
+    for that many seconds after it was fetched (short for listings, long for
+    articles), and any 200 response to it is cached. Once stale it is
+    revalidated with If-None-Match / If-Modified-Since when the cached
+    response carried an ETag or Last-Modified, and refetched otherwise.
+    Requests for other callbacks follow plain RFC2616Policy.
+    """
+
+    def __init__(self, settings):
+        super().__init__(settings)
+        self.callback_ttls = {
+            name: int(ttl) for name, ttl in settings.getdict('HTTPCACHE_CALLBACK_TTLS').items()
+        }
+
+    def callback_ttl(self, request):
+        return self.callback_ttls.get(callback_name(request))
+
+    def should_cache_response(self, response, request):
+        if self.callback_ttl(request) is None:
+            return super().should_cache_response(response, request)
+        if b'no-store' in self._parse_cachecontrol(response):
+            return False
+        return response.status == 200
+
+    def _compute_freshness_lifetime(self, response, request, now):
+        ttl = self.callback_ttl(request)
+        if ttl is None:
+            return super()._compute_freshness_lifetime(response, request, now)
+        return ttl
+
+
+class SQLiteCacheStorage:
+    """
+    HTTP cache storage keeping every cached response of a spider in one
+    SQLite file ({HTTPCACHE_DIR}/{spider.name}.sqlite) with zlib-compressed
+    bodies, instead of six small files per response.
+
+    Entries older than HTTPCACHE_SQLITE_MAX_AGE seconds are never returned
+    and are purged when the spider opens and closes, at which point the
+    oldest entries are also evicted until the stored bodies fit in
+    HTTPCACHE_SQLITE_MAX_BYTES. Evictions and the cache size are reported
+    in the crawl stats next to HttpCacheMiddleware's hit/miss counts.
+    """
+
+    def __init__(self, settings):
+        self.cachedir = data_path(settings['HTTPCACHE_DIR'], createdir=True)
+        self.max_age = settings.getint('HTTPCACHE_SQLITE_MAX_AGE', 0)
+        self.max_bytes = settings.getint('HTTPCACHE_SQLITE_MAX_BYTES', 0)
+        self.compression_level = settings.getint('HTTPCACHE_SQLITE_COMPRESSION_LEVEL', 6)
+        self.commit_every = settings.getint('HTTPCACHE_SQLITE_COMMIT_EVERY', 50)
+        self.db = None
+        self.stats = None
+        self.uncommitted = 0
+
+    def open_spider(self, spider):
+        path = os.path.join(self.cachedir, f'{spider.name}.sqlite')
+        self.db = sqlite3.connect(path, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            ' fingerprint BLOB PRIMARY KEY,'
+            ' url TEXT NOT NULL,'
+            ' status INTEGER NOT NULL,'
+            ' headers BLOB NOT NULL,'
+            ' body BLOB NOT NULL,'
+            ' size INTEGER NOT NULL,'
+            ' stored_at REAL NOT NULL)'
+        )
+        self.db.execute('CREATE INDEX IF NOT EXISTS responses_stored_at ON responses (stored_at)')
+        self.db.execute('BEGIN')
+        self.fingerprinter = spider.crawler.request_fingerprinter
+        self.stats = spider.crawler.stats
+        self.evict(spider)
+        spider.logger.debug(f"Using SQLite cache storage in {path}")
+
+    def close_spider(self, spider):
+        self.evict(spider)
+        self.db.execute('COMMIT')
+        self.db.close()
+        self.db = None
+
+    def retrieve_response(self, spider, request):
+        row = self.db.execute(
+            'SELECT url, status, headers, body, stored_at FROM responses WHERE fingerprint = ?',
+            (self.fingerprinter.fingerprint(request),),
+        ).fetchone()
+        if row is None:
+            return None
+        url, status, raw_headers, body, stored_at = row
+        if self.max_age and stored_at < time.time() - self.max_age:
+            return None
+        body = zlib.decompress(body)
+        headers = Headers(headers_raw_to_dict(raw_headers))
+        respcls = responsetypes.from_args(headers=headers, url=url, body=body)
+        return respcls(url=url, headers=headers, status=status, body=body)
+
+    def store_response(self, spider, request, response):
+        body = zlib.compress(response.body, self.compression_level)
+        self.db.execute(
+            'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (
+                self.fingerprinter.fingerprint(request),
+                response.url,
+                response.status,
+                headers_dict_to_raw(response.headers),
+                body,
+                len(body),
+                time.time(),
+            ),
+        )
+        self.stats.inc_value('httpcache/stored_bytes', len(body), spider=spider)
+        self.uncommitted += 1
+        if self.uncommitted >= self.commit_every:
+            self.db.execute('COMMIT')
+            self.db.execute('BEGIN')
+            self.uncommitted = 0
+
+    def evict(self, spider):
+        evicted = 0
+        if self.max_age:
+            evicted += self.db.execute(
+                'DELETE FROM responses WHERE stored_at < ?', (time.time() - self.max_age,)
+            ).rowcount
+        if self.max_bytes:
+            # Keep the newest entries whose running total fits in max_bytes
+            evicted += self.db.execute(
+                'DELETE FROM responses WHERE fingerprint IN ('
+                ' SELECT fingerprint FROM ('
+                '  SELECT fingerprint, SUM(size) OVER (ORDER BY stored_at DESC) AS total'
+                '  FROM responses)'
+                ' WHERE total > ?)',
+                (self.max_bytes,),
+            ).rowcount
+        entries, size = self.db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+        if evicted:
+            self.stats.inc_value('httpcache/evicted', evicted, spider=spider)
+        self.stats.set_value('httpcache/entries', entries, spider=spider)
+        self.stats.set_value('httpcache/size_bytes', size, spider=spider)
@@ -49,6 +49,28 @@ class NewsArticleItem(scrapy.Item):
         default='N/A'
     )
 
+    # UTC publication time parsed from date/reported_time (FYP_Scraper.dates);
+    # set by the pipeline when a spider leaves it out
+    published_at = scrapy.Field()
+
+    # Every category an article was filed under (category holds the first)
+    categories = scrapy.Field()
+
+    # Keywords and locations found while filtering the article
+    matched_keywords = scrapy.Field()
+    matched_locations = scrapy.Field()
+
+    # Shared by copies of the same story across sources (StoryClusterPipeline)
+    story_cluster_id = scrapy.Field()
+
+
+class ArticleCategoriesItem(scrapy.Item):
+    # Categories an article's listings turned up after its NewsArticleItem
+    # was yielded; MongoDBPipeline adds them to the stored document
+    url = scrapy.Field()
+    source = scrapy.Field()
+    categories = scrapy.Field()
+
 
 class WeatherDataItem(scrapy.Item):
     unique_id = scrapy.Field(
@@ -0,0 +1,97 @@
+# FYP_Scraper/FYP_Scraper/matching.py
+
+from collections import deque
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is optional; fall back to pure Python
+    ahocorasick = None
+
+
+class KeywordMatcher:
+    """
+    Finds every occurrence of a fixed set of labelled phrases in one scan.
+
+    The phrases are compiled once into an Aho-Corasick automaton, so matching
+    costs one pass over the text however many phrases there are. Uses the C
+    automaton from pyahocorasick; the pure-Python fallback gives the same
+    results (overlapping and nested matches included) but is only there so
+    the spiders keep working without it, it is slower than plain `in` checks.
+
+        matcher = KeywordMatcher({"location": ["لاہور", "کراچی"], "murder": ["قتل"]})
+        matcher.find("لاہور میں قتل")  # {"location": ["لاہور"], "murder": ["قتل"]}
+    """
+
+    def __init__(self, patterns):
+        # phrase -> labels it belongs to (a phrase may appear under several)
+        self.labels = {}
+        for label, phrases in patterns.items():
+            for phrase in phrases:
+                if phrase:
+                    self.labels.setdefault(phrase, []).append(label)
+
+        if ahocorasick is not None:
+            self.automaton = ahocorasick.Automaton()
+            for phrase, labels in self.labels.items():
+                self.automaton.add_word(phrase, (phrase, tuple(labels)))
+            self.automaton.make_automaton()
+            self._scan = self._scan_c
+        else:
+            self._build()
+            self._scan = self._scan_python
+
+    def find(self, text):
+        """Return {label: [matched phrases in order of first appearance]}."""
+        hits = {}
+        seen = set()
+        for phrase, labels in self._scan(text):
+            if phrase in seen:
+                continue
+            seen.add(phrase)
+            for label in labels:
+                hits.setdefault(label, []).append(phrase)
+        return hits
+
+    def _scan_c(self, text):
+        if not text:
+            return
+        for _, value in self.automaton.iter(text):
+            yield value
+
+    def _build(self):
+        # Trie as parallel lists: goto[state] = {char: state}
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for phrase, labels in self.labels.items():
+            state = 0
+            for char in phrase:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.output[state].append((phrase, tuple(labels)))
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                # Children of the root always fall back to the root
+                self.fail[child] = self.goto[fallback].get(char, 0) if state else 0
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def _scan_python(self, text):
+        goto, fail, output = self.goto, self.fail, self.output
+        state = 0
+        for char in text or "":
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                yield from output[state]
@@ -0,0 +1,88 @@
+# FYP_Scraper/FYP_Scraper/metrics.py
+
+# Upper bounds (seconds) of the histogram buckets, Prometheus style; the
+# last bucket (+Inf) is implicit
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram with labels, exported in the Prometheus text
+    format or summarised (count, mean, estimated percentiles) as a dict.
+    """
+
+    def __init__(self, name, help_text, label_names, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self.series = {}  # label values -> [bucket counts..., +Inf count], sum
+
+    def observe(self, value, *label_values):
+        series = self.series.get(label_values)
+        if series is None:
+            series = self.series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+        counts = series[0]
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[index] += 1
+                break
+        else:
+            counts[-1] += 1
+        series[1] += value
+
+    def quantile(self, label_values, q):
+        """Estimate a quantile by linear interpolation inside its bucket."""
+        counts, _ = self.series[label_values]
+        total = sum(counts)
+        rank = q * total
+        seen = 0
+        lower = 0.0
+        for index, count in enumerate(counts):
+            upper = self.buckets[index] if index < len(self.buckets) else self.buckets[-1]
+            if count and seen + count >= rank:
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+            lower = upper
+        return lower
+
+    def summary(self):
+        """
+        Return one dict per label set: the labels plus count, sum, mean and
+        the estimated p50, p90 and p99. Label values stay values, not keys,
+        so domains (with their dots) can be stored in MongoDB as they are.
+        """
+        result = []
+        for label_values, (counts, total) in sorted(self.series.items()):
+            count = sum(counts)
+            result.append({
+                **dict(zip(self.label_names, label_values)),
+                'count': count,
+                'sum': round(total, 6),
+                'mean': round(total / count, 6) if count else 0,
+                **{f"p{int(q * 100)}": round(self.quantile(label_values, q), 6) for q in (0.5, 0.9, 0.99)},
+            })
+        return result
+
+    def prometheus(self, const_labels=None):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        const_labels = const_labels or {}
+        for label_values, (counts, total) in sorted(self.series.items()):
+            labels = {**const_labels, **dict(zip(self.label_names, label_values))}
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{format_labels({**labels, 'le': bound})} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(labels)} {total:.6f}")
+            lines.append(f"{self.name}_count{format_labels(labels)} {cumulative}")
+        return lines
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
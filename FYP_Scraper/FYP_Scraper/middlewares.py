@@ -4,10 +4,29 @@
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
 from scrapy import signals
-from scrapy.exceptions import NotConfigured
-import pandas as pd
+from scrapy.downloadermiddlewares.retry import get_retry_request
+from scrapy.exceptions import DontCloseSpider, IgnoreRequest, NotConfigured
+from scrapy.http import Request, TextResponse
+from scrapy.utils.misc import load_object
+from scrapy.utils.response import response_status_message
+import csv
 import random
-from fake_useragent import UserAgent
+import re
+import hashlib
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from twisted.internet import task, threads
+from scrapy.utils.defer import maybe_deferred_to_future
+from scrapy.utils.httpobj import urlparse_cached
+import time
+import weakref
+from w3lib.url import canonicalize_url
+from FYP_Scraper.httpcache import callback_name
+from FYP_Scraper.mongo import get_client, get_mongo_uri, release_client
+from FYP_Scraper.proxies import ProxyPool
+from FYP_Scraper.signals import callback_timed
+from FYP_Scraper.throttle import AIMDController, CircuitBreaker
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
@@ -104,44 +123,167 @@ class FypScraperDownloaderMiddleware:
         spider.logger.info("Spider opened: %s" % spider.name)
 
 
+def _to_float(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if value != value else value  # NaN
+
+
 class RandomProxyMiddleware:
-    def __init__(self):
-        try:
-            df = pd.read_csv('Free_Proxy_List.csv')
-            http_proxies = df[df['protocols'] == 'http']
-            self.proxy_list = [f"http://{row['ip']}:{row['port']}" for _, row in http_proxies.iterrows()]
-            if not self.proxy_list:
-                raise NotConfigured
-        except Exception:
-            raise NotConfigured
+    """
+    Routes requests through proxies from PROXY_LIST_FILE, picked by health
+    rather than uniformly (see FYP_Scraper.proxies.ProxyPool).
+
+    The pool is seeded from the list's responseTime/latency (ms) and upTime
+    (%) columns, then learns from every download: latencies and successes
+    from responses, failures from connection errors and
+    PROXY_FAILURE_HTTP_CODES. Sits after RetryMiddleware, so every retry
+    gets a fresh pick.
+    """
+
+    def __init__(self, pool, failure_codes=(), stats=None):
+        self.pool = pool
+        self.failure_codes = {int(code) for code in failure_codes}
+        self.stats = stats
 
     @classmethod
     def from_crawler(cls, crawler):
-        middleware = cls()
+        settings = crawler.settings
+        pool = ProxyPool(
+            alpha=settings.getfloat('PROXY_EWMA_ALPHA', 0.3),
+            max_failures=settings.getint('PROXY_MAX_FAILURES', 3),
+            quarantine_base=settings.getfloat('PROXY_QUARANTINE_BASE', 60),
+            quarantine_max=settings.getfloat('PROXY_QUARANTINE_MAX', 1800),
+        )
+        try:
+            cls.load_proxies(pool, settings.get('PROXY_LIST_FILE', 'Free_Proxy_List.csv'))
+        except Exception:
+            raise NotConfigured
+        if not len(pool):
+            raise NotConfigured
+        middleware = cls(
+            pool,
+            failure_codes=settings.getlist('PROXY_FAILURE_HTTP_CODES', [407, 408, 502, 503, 504, 522, 524]),
+            stats=crawler.stats,
+        )
         crawler.signals.connect(middleware.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
         return middleware
 
+    @staticmethod
+    def load_proxies(pool, path):
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                if row.get('protocols') != 'http':
+                    continue
+                latency_ms = _to_float(row.get('responseTime'))
+                if latency_ms is None:
+                    latency_ms = _to_float(row.get('latency'))
+                uptime = _to_float(row.get('upTime'))
+                pool.add(
+                    f"http://{row['ip']}:{row['port']}",
+                    latency=latency_ms / 1000 if latency_ms is not None else 1.0,
+                    success_rate=uptime / 100 if uptime is not None else 0.5,
+                )
+
     def spider_opened(self, spider):
-        pass
+        self.update_stats()
+
+    def spider_closed(self, spider):
+        self.update_stats()
+        for proxy in self.pool.best():
+            spider.logger.debug(
+                f"Proxy {proxy.url}: latency {proxy.latency:.2f}s, "
+                f"success {proxy.success_rate:.0%}, {proxy.requests} requests"
+            )
+
+    def update_stats(self):
+        if self.stats is None:
+            return
+        available = len(self.pool.available())
+        self.stats.set_value('proxy_pool/size', len(self.pool))
+        self.stats.set_value('proxy_pool/available', available)
+        self.stats.set_value('proxy_pool/quarantined', len(self.pool) - available)
+        self.stats.set_value('proxy_pool/quarantines', self.pool.total_quarantines)
+
+    def inc_stat(self, key):
+        if self.stats is not None:
+            self.stats.inc_value(key)
 
     def process_request(self, request, spider):
-        if self.proxy_list:
-            request.meta['proxy'] = random.choice(self.proxy_list)
+        proxy = self.pool.choose(exclude=request.meta.get('excluded_proxies', ()))
+        if proxy:
+            request.meta['proxy'] = proxy
+
+    def process_response(self, request, response, spider):
+        proxy = request.meta.get('proxy')
+        if proxy in self.pool.proxies and 'cached' not in response.flags:
+            if response.status in self.failure_codes:
+                self.record_failure(proxy, spider)
+            else:
+                self.pool.record_success(proxy, request.meta.get('download_latency'))
+                self.inc_stat('proxy_pool/successes')
+        return response
+
+    def process_exception(self, request, exception, spider):
+        if isinstance(exception, RetryScheduled):
+            return  # Held or rescheduled before (or instead of) using the proxy
+        proxy = request.meta.get('proxy')
+        if proxy in self.pool.proxies:
+            self.record_failure(proxy, spider)
+
+    def record_failure(self, proxy, spider):
+        self.inc_stat('proxy_pool/failures')
+        if self.pool.record_failure(proxy):
+            spider.logger.debug(f"Quarantined proxy {proxy}")
+            self.update_stats()
 
 
 class RandomUserAgentMiddleware:
-    def __init__(self):
-        self.ua = UserAgent()
-        self.fallback_ua = [
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:89.0) Gecko/20100101 Firefox/89.0',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15',
-        ]
+    """
+    Sends each request with a random browser User-Agent and the usual
+    browser headers.
+
+    fake_useragent is only asked once, at startup, for USER_AGENT_POOL_SIZE
+    agents; requests then pick from that pool instead of querying it every
+    time.
+    """
+
+    fallback_ua = [
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+        'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:89.0) Gecko/20100101 Firefox/89.0',
+        'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15',
+    ]
+    default_headers = {
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.5',
+        'Accept-Encoding': 'gzip, deflate, br',
+        'Connection': 'keep-alive',
+        'Upgrade-Insecure-Requests': '1',
+        'DNT': '1',
+    }
+
+    def __init__(self, pool_size=50):
+        self.user_agents = self.build_pool(pool_size)
+
+    @classmethod
+    def build_pool(cls, size):
+        try:
+            from fake_useragent import UserAgent
+
+            ua = UserAgent()
+            # Deduplicate: the pool is sampled from a finite browser list
+            agents = list(dict.fromkeys(ua.random for _ in range(size)))
+        except Exception:
+            agents = []
+        return agents or list(cls.fallback_ua)
 
     @classmethod
     def from_crawler(cls, crawler):
-        middleware = cls()
+        middleware = cls(pool_size=crawler.settings.getint('USER_AGENT_POOL_SIZE', 50))
         crawler.signals.connect(middleware.spider_opened, signal=signals.spider_opened)
         return middleware
 
@@ -149,16 +291,577 @@ class RandomUserAgentMiddleware:
         pass
 
     def process_request(self, request, spider):
+        agents = self.user_agents
+        if request.meta.get('retry_times') and len(agents) > 1:
+            # A retry never goes out with the User-Agent that just failed
+            previous = (request.headers.get('User-Agent') or b'').decode('latin-1')
+            agents = [agent for agent in agents if agent != previous]
+        request.headers['User-Agent'] = random.choice(agents)
+        request.headers.update(self.default_headers)
+
+
+def url_key(url):
+    """64-bit hash of the canonical form of a URL."""
+    digest = hashlib.blake2b(canonicalize_url(url).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+class KnownUrlFilterMiddleware:
+    """
+    Drops article requests for URLs that are already stored in
+    news_db.{source}_raw (for each of spider.sources when a spider crawls
+    several), so they are never scheduled or downloaded again.
+
+    The stored URLs are loaded once at spider_opened into a sorted array of
+    64-bit hashes (8 bytes per article). With KNOWN_URLS_REFRESH_DAYS set,
+    articles last crawled longer ago than that are left out of the set and
+    get re-downloaded; documents written before crawled_at existed count as
+    known.
+    """
+
+    def __init__(self, mongo_uri, callbacks, refresh_days=0, stats=None):
+        self.mongo_uri = mongo_uri
+        self.callbacks = set(callbacks)
+        self.refresh_days = refresh_days
+        self.stats = stats
+        self.known = array('Q')
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool('KNOWN_URLS_ENABLED'):
+            raise NotConfigured
+        middleware = cls(
+            get_mongo_uri(),
+            settings.getlist('KNOWN_URLS_CALLBACKS', ['parse_article', 'parse_news']),
+            refresh_days=settings.getint('KNOWN_URLS_REFRESH_DAYS', 0),
+            stats=crawler.stats,
+        )
+        crawler.signals.connect(middleware.spider_opened, signal=signals.spider_opened)
+        return middleware
+
+    def spider_opened(self, spider):
+        sources = getattr(spider, 'sources', None) or [getattr(spider, 'source', None)]
+        sources = [source for source in sources if source]
+        if not sources:
+            spider.logger.info(f"Known-URL filter disabled: spider {spider.name} has no source attribute")
+            return
+        # Returning the Deferred makes Scrapy wait for the load before the
+        # first request is scheduled, without blocking the reactor
+        d = threads.deferToThread(self.load_known_urls, sources)
+        d.addCallback(self._known_urls_loaded, sources, spider)
+        d.addErrback(self._known_urls_failed, sources, spider)
+        return d
+
+    def load_known_urls(self, sources):
+        query = {}
+        if self.refresh_days > 0:
+            cutoff = datetime.now(timezone.utc) - timedelta(days=self.refresh_days)
+            query = {'$or': [{'crawled_at': {'$gte': cutoff}}, {'crawled_at': {'$exists': False}}]}
+
+        client = get_client(self.mongo_uri)
         try:
-            request.headers['User-Agent'] = self.ua.random
-        except:
-            request.headers['User-Agent'] = random.choice(self.fallback_ua)
-        request.headers.update({
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'DNT': '1',
-        })
-    
+            keys = []
+            for source in sources:
+                cursor = client['news_db'][f"{source}_raw"].find(query, {'url': 1, '_id': 0}).batch_size(10000)
+                keys.extend(url_key(doc['url']) for doc in cursor if doc.get('url'))
+        finally:
+            release_client(client)
+        return array('Q', sorted(keys))
+
+    def _known_urls_loaded(self, known, sources, spider):
+        self.known = known
+        if self.stats:
+            self.stats.set_value('known_urls/loaded', len(known))
+        collections = ', '.join(f"{source}_raw" for source in sources)
+        spider.logger.info(f"Loaded {len(known)} known URLs from {collections} ({len(known) * known.itemsize // 1024} KiB)")
+
+    def _known_urls_failed(self, failure, sources, spider):
+        collections = ', '.join(f"{source}_raw" for source in sources)
+        spider.logger.error(f"Could not load known URLs from {collections}, crawling everything: {failure.getErrorMessage()}")
+
+    def is_known(self, url):
+        key = url_key(url)
+        index = bisect_left(self.known, key)
+        return index < len(self.known) and self.known[index] == key
+
+    def process_spider_output(self, response, result, spider):
+        for item_or_request in result:
+            if (
+                isinstance(item_or_request, Request)
+                and self.known
+                and getattr(item_or_request.callback, '__name__', None) in self.callbacks
+                and self.is_known(item_or_request.url)
+            ):
+                if self.stats:
+                    self.stats.inc_value('known_urls/filtered')
+                spider.logger.debug(f"Skipping known article: {item_or_request.url}")
+                continue
+            yield item_or_request
+
+
+class CallbackTimingMiddleware:
+    """
+    Measures how long each spider callback takes per response and sends it
+    as the callback_timed signal (collected by the CrawlMetrics extension).
+
+    Placed next to the spider, so the time counted is the callback call
+    itself plus each step of its output generator (sync or async), not the
+    work other middlewares and the engine do with the items and requests it
+    yields.
+    """
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+        # response -> perf_counter() before the callback ran; weak, so a
+        # response dropped by an exception does not stay behind, and a new
+        # response never finds the start time of an old one
+        self.started = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool('METRICS_ENABLED'):
+            raise NotConfigured
+        return cls(crawler)
+
+    def process_spider_input(self, response, spider):
+        self.started[response] = time.perf_counter()
+
+    def process_spider_output(self, response, result, spider):
+        elapsed = self.elapsed_before_output(response)
+        iterator = iter(result)
+        while True:
+            step = time.perf_counter()
+            try:
+                output = next(iterator)
+            except StopIteration:
+                elapsed += time.perf_counter() - step
+                break
+            elapsed += time.perf_counter() - step
+            yield output
+        self.timed(response, spider, elapsed)
+
+    async def process_spider_output_async(self, response, result, spider):
+        elapsed = self.elapsed_before_output(response)
+        iterator = aiter(result)
+        while True:
+            step = time.perf_counter()
+            try:
+                output = await anext(iterator)
+            except StopAsyncIteration:
+                elapsed += time.perf_counter() - step
+                break
+            elapsed += time.perf_counter() - step
+            yield output
+        self.timed(response, spider, elapsed)
+
+    def process_spider_exception(self, response, exception, spider):
+        self.started.pop(response, None)
+
+    def elapsed_before_output(self, response):
+        started = self.started.pop(response, None)
+        return time.perf_counter() - started if started is not None else 0.0
+
+    def timed(self, response, spider, elapsed):
+        self.crawler.signals.send_catch_log(
+            callback_timed, spider=spider, callback=callback_name(response.request), duration=elapsed,
+        )
+
+
+# Next free request time per domain, shared by every crawler in the process
+_domain_next_request = {}
+
+
+class DomainPolitenessMiddleware:
+    """
+    Spaces requests to the same domain across all crawlers in one process.
+
+    DOWNLOAD_DELAY only applies within a single crawler, so when the runner
+    starts several crawlers against one site their request rates would add
+    up. Each request reserves the domain for the current delay of its
+    downloader slot in this crawler (as AdaptiveThrottleMiddleware last set
+    it; DOWNLOAD_DELAY or the DOWNLOAD_SLOTS entry before the slot exists)
+    and waits, without blocking the reactor, until its reservation comes up.
+    """
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+        self.default_delay = crawler.settings.getfloat('DOWNLOAD_DELAY')
+        self.slot_settings = crawler.settings.getdict('DOWNLOAD_SLOTS')
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool('DOMAIN_POLITENESS_ENABLED'):
+            raise NotConfigured
+        return cls(crawler)
+
+    def interval(self, request):
+        downloader = self.crawler.engine.downloader
+        key = downloader.get_slot_key(request)
+        slot = downloader.slots.get(key)
+        if slot is not None:
+            return slot.delay
+        return self.slot_settings.get(key, {}).get('delay', self.default_delay)
+
+    def reserve(self, request):
+        """Reserve the request's domain; returns the seconds to wait for the reservation."""
+        domain = urlparse_cached(request).hostname or ''
+        now = time.monotonic()
+        start = max(now, _domain_next_request.get(domain, now))
+        _domain_next_request[domain] = start + self.interval(request)
+        return start - now
+
+    async def process_request(self, request, spider):
+        wait = self.reserve(request)
+        if wait > 0:
+            from twisted.internet import reactor
+
+            await maybe_deferred_to_future(task.deferLater(reactor, wait, lambda: None))
+        return None
+
+
+class AdaptiveThrottleMiddleware:
+    """
+    Adjusts each domain's downloader slot (concurrency and delay) to how
+    the site responds, see FYP_Scraper.throttle.AIMDController.
+
+    Slots start from DOWNLOAD_DELAY, CONCURRENT_REQUESTS_PER_DOMAIN or
+    their DOWNLOAD_SLOTS entry. Responses with
+    ADAPTIVE_THROTTLE_BACKOFF_HTTP_CODES and download errors back a slot
+    off; other responses (cache hits excepted) let it speed up. Proxied
+    requests are judged with the proxy in mind: their errors, and
+    PROXY_BLOCK_HTTP_CODES responses (blocked or failing proxy IPs), are
+    left to RandomProxyMiddleware, and their latency is compared with that
+    proxy's own history. Current limits are in the stats as
+    adaptive_throttle/<slot>/concurrency and .../delay.
+    """
+
+    def __init__(self, crawler, controller, backoff_codes=(), proxy_codes=()):
+        self.crawler = crawler
+        self.controller = controller
+        self.backoff_codes = {int(code) for code in backoff_codes}
+        self.proxy_codes = {int(code) for code in proxy_codes}
+        self.stats = crawler.stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool('ADAPTIVE_THROTTLE_ENABLED'):
+            raise NotConfigured
+        controller = AIMDController(
+            min_concurrency=settings.getint('ADAPTIVE_THROTTLE_MIN_CONCURRENCY', 1),
+            max_concurrency=settings.getint('ADAPTIVE_THROTTLE_MAX_CONCURRENCY', 16),
+            min_delay=settings.getfloat('ADAPTIVE_THROTTLE_MIN_DELAY', 0.25),
+            max_delay=settings.getfloat('ADAPTIVE_THROTTLE_MAX_DELAY', 60),
+            rate_step=settings.getfloat('ADAPTIVE_THROTTLE_RATE_STEP', 0.05),
+            backoff_factor=settings.getfloat('ADAPTIVE_THROTTLE_BACKOFF_FACTOR', 0.5),
+            latency_factor=settings.getfloat('ADAPTIVE_THROTTLE_LATENCY_FACTOR', 2.0),
+        )
+        middleware = cls(
+            crawler,
+            controller,
+            backoff_codes=settings.getlist('ADAPTIVE_THROTTLE_BACKOFF_HTTP_CODES', [403, 429, 500, 502, 503, 504, 522, 524]),
+            proxy_codes=settings.getlist('PROXY_BLOCK_HTTP_CODES', [403, 407]),
+        )
+        # Sent once the request has its slot, before the slot is used: limits
+        # are reapplied to slots the downloader recreated after idling
+        crawler.signals.connect(middleware.request_reached_downloader, signal=signals.request_reached_downloader)
+        return middleware
+
+    def slot(self, request):
+        key = request.meta.get('download_slot')
+        if key is None:
+            return None, None
+        return key, self.crawler.engine.downloader.slots.get(key)
+
+    def request_reached_downloader(self, request, spider):
+        key, slot = self.slot(request)
+        if slot is None:
+            return
+        limits = self.controller.limits(key, slot.concurrency, slot.delay)
+        self.apply(key, slot, limits)
+        request.meta['adaptive_throttle_sent'] = time.monotonic()
+
+    def apply(self, key, slot, limits):
+        slot.concurrency = int(limits.concurrency)
+        slot.delay = limits.delay
+        if self.stats is not None:
+            self.stats.set_value(f'adaptive_throttle/{key}/concurrency', slot.concurrency)
+            self.stats.set_value(f'adaptive_throttle/{key}/delay', round(slot.delay, 2))
+
+    def process_response(self, request, response, spider):
+        if 'cached' in response.flags or 'adaptive_throttle_sent' not in request.meta:
+            return response
+        key, slot = self.slot(request)
+        proxy = request.meta.get('proxy')
+        sent_at = request.meta['adaptive_throttle_sent']
+        if proxy and response.status in self.proxy_codes:
+            return response
+        if response.status in self.backoff_codes:
+            retry_after = _retry_after(response)
+            if self.controller.record_failure(key, sent_at, retry_after):
+                self.backed_off(key, slot, str(response.status), spider)
+        else:
+            latency = request.meta.get('download_latency') if response.status < 400 else None
+            if self.controller.record_success(key, proxy or 'direct', latency, sent_at):
+                self.backed_off(key, slot, 'latency', spider)
+            elif slot is not None:
+                self.apply(key, slot, self.controller.slots[key])
+        return response
+
+    def process_exception(self, request, exception, spider):
+        if (
+            isinstance(exception, RetryScheduled)
+            or request.meta.get('proxy')
+            or 'adaptive_throttle_sent' not in request.meta
+        ):
+            return None
+        key, slot = self.slot(request)
+        if self.controller.record_failure(key, request.meta['adaptive_throttle_sent']):
+            self.backed_off(key, slot, type(exception).__name__, spider)
+        return None
+
+    def backed_off(self, key, slot, reason, spider):
+        limits = self.controller.slots[key]
+        if slot is not None:
+            self.apply(key, slot, limits)
+        if self.stats is not None:
+            self.stats.inc_value('adaptive_throttle/backoffs')
+            self.stats.inc_value(f'adaptive_throttle/backoffs/{reason}')
+        spider.logger.info(
+            f"{key}: {reason}, backing off to concurrency {int(limits.concurrency)}, delay {limits.delay:.2f}s"
+        )
+
+
+def _retry_after(response):
+    """Seconds from a Retry-After header, if given as a number."""
+    value = response.headers.get('Retry-After')
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+class RetryScheduled(IgnoreRequest):
+    """
+    The request failed and a copy of it was scheduled to be sent again
+    later. Errbacks receive this instead of the original error and should
+    not treat the request as finished.
+    """
+
+
+class BackoffRetryMiddleware:
+    """
+    Retries failed requests after an exponential backoff, in place of
+    Scrapy's RetryMiddleware (which resends them at once).
+
+    A request is retried on RETRY_HTTP_CODES, on RETRY_EXCEPTIONS and on
+    soft blocks: 200 responses that (when smaller than
+    RETRY_SOFT_BLOCK_MAX_BYTES) match RETRY_SOFT_BLOCK_PATTERNS, such as
+    captcha and WAF challenge pages. Empty and non-text 200 responses only
+    count as blocks for requests that opt in, with meta soft_block_empty or
+    a callback in RETRY_SOFT_BLOCK_EMPTY_CALLBACKS (article pages): for
+    listings they are the normal end of pagination. Soft blocks get
+    RETRY_SOFT_BLOCK_TIMES retries, everything else RETRY_TIMES.
+
+    The retry is held back RETRY_BACKOFF_BASE * 2 ** (retries - 1) seconds,
+    jittered to between half and all of it and capped at RETRY_BACKOFF_MAX
+    (longer if the site sent Retry-After), by a reactor timer that hands it
+    back to the engine, so waiting retries take no downloader slot; the
+    spider is kept open until they have all been sent. Retries go out with
+    dont_filter, a different proxy (the failed ones are excluded) and a
+    different User-Agent, and bypass a cached response that caused them.
+
+    A per-domain CircuitBreaker watches the same outcomes: when the error
+    rate of a domain's last RETRY_BREAKER_WINDOW responses reaches
+    RETRY_BREAKER_THRESHOLD, its requests are held back for
+    RETRY_BREAKER_COOLDOWN seconds (doubling while it keeps tripping).
+    Errors that PROXY_BLOCK_HTTP_CODES or connection failures through a
+    proxy cause are retried but not held against the domain.
+    """
+
+    def __init__(self, crawler, breaker, max_retry_times=5, soft_block_times=2, retry_http_codes=(),
+                 exceptions_to_retry=(), priority_adjust=-1, backoff_base=2.0, backoff_max=120.0,
+                 soft_block_patterns=(), soft_block_max_bytes=32768, soft_block_empty_callbacks=(),
+                 proxy_codes=()):
+        self.crawler = crawler
+        self.breaker = breaker
+        self.max_retry_times = max_retry_times
+        self.soft_block_times = soft_block_times
+        self.retry_http_codes = {int(code) for code in retry_http_codes}
+        self.exceptions_to_retry = tuple(exceptions_to_retry)
+        self.priority_adjust = priority_adjust
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.soft_block_pattern = (
+            re.compile(b'|'.join(pattern.encode('utf-8') for pattern in soft_block_patterns), re.IGNORECASE)
+            if soft_block_patterns else None
+        )
+        self.soft_block_max_bytes = soft_block_max_bytes
+        self.soft_block_empty_callbacks = set(soft_block_empty_callbacks)
+        self.proxy_codes = {int(code) for code in proxy_codes}
+        self.stats = crawler.stats
+        self.scheduled = set()  # IDelayedCall of every retry waiting to be sent
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool('RETRY_ENABLED'):
+            raise NotConfigured
+        breaker = CircuitBreaker(
+            window=settings.getint('RETRY_BREAKER_WINDOW', 20),
+            min_requests=settings.getint('RETRY_BREAKER_MIN_REQUESTS', 10),
+            threshold=settings.getfloat('RETRY_BREAKER_THRESHOLD', 0.5),
+            cooldown=settings.getfloat('RETRY_BREAKER_COOLDOWN', 60),
+            max_cooldown=settings.getfloat('RETRY_BREAKER_MAX_COOLDOWN', 900),
+        )
+        middleware = cls(
+            crawler,
+            breaker,
+            max_retry_times=settings.getint('RETRY_TIMES'),
+            soft_block_times=settings.getint('RETRY_SOFT_BLOCK_TIMES', 2),
+            retry_http_codes=settings.getlist('RETRY_HTTP_CODES'),
+            exceptions_to_retry=[
+                load_object(x) if isinstance(x, str) else x for x in settings.getlist('RETRY_EXCEPTIONS')
+            ],
+            priority_adjust=settings.getint('RETRY_PRIORITY_ADJUST'),
+            backoff_base=settings.getfloat('RETRY_BACKOFF_BASE', 2.0),
+            backoff_max=settings.getfloat('RETRY_BACKOFF_MAX', 120.0),
+            soft_block_patterns=settings.getlist('RETRY_SOFT_BLOCK_PATTERNS'),
+            soft_block_max_bytes=settings.getint('RETRY_SOFT_BLOCK_MAX_BYTES', 32768),
+            soft_block_empty_callbacks=settings.getlist('RETRY_SOFT_BLOCK_EMPTY_CALLBACKS'),
+            proxy_codes=settings.getlist('PROXY_BLOCK_HTTP_CODES', [403, 407]),
+        )
+        crawler.signals.connect(middleware.spider_idle, signal=signals.spider_idle)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def process_request(self, request, spider):
+        domain = urlparse_cached(request).hostname or ''
+        paused = self.breaker.paused_for(domain)
+        if paused:
+            self.inc_stat('retry/breaker_held')
+            self.schedule(request.replace(dont_filter=True), paused + random.uniform(0, 1))
+            raise RetryScheduled(f"{domain} is paused by the circuit breaker")
+        return None
+
+    def process_response(self, request, response, spider):
+        reason = soft_block = max_retry_times = None
+        if response.status in self.retry_http_codes:
+            reason = response_status_message(response.status)
+        elif response.status == 200:
+            soft_block = self.soft_block(request, response)
+            if soft_block:
+                reason = f"soft block: {soft_block}"
+                max_retry_times = request.meta.get('max_retry_times', self.soft_block_times)
+                self.inc_stat('retry/soft_blocks')
+
+        if 'cached' not in response.flags:
+            # Through a proxy, blocks are most likely of the proxy's address
+            blame_proxy = request.meta.get('proxy') and (response.status in self.proxy_codes or soft_block)
+            self.record(request, spider, error=bool(reason) and not blame_proxy)
+        if not reason or request.meta.get('dont_retry', False):
+            return response
+        retry = self.retry(request, reason, spider, max_retry_times)
+        if retry is None:
+            return response
+        if 'cached' in response.flags:
+            # Go past the cached copy, and do not let a 304 bring it back
+            retry.headers['Cache-Control'] = 'no-cache'
+            for header in ('If-None-Match', 'If-Modified-Since'):
+                retry.headers.pop(header, None)
+        self.schedule(retry, self.backoff(retry, _retry_after(response)))
+        raise RetryScheduled(reason)
+
+    def process_exception(self, request, exception, spider):
+        if not isinstance(exception, self.exceptions_to_retry):
+            return None
+        self.record(request, spider, error=not request.meta.get('proxy'))
+        if request.meta.get('dont_retry', False):
+            return None
+        retry = self.retry(request, exception, spider)
+        if retry is None:
+            return None
+        self.schedule(retry, self.backoff(retry))
+        raise RetryScheduled(f"{type(exception).__name__}: {exception}")
+
+    def soft_block(self, request, response):
+        """Return why a 200 response looks like a block page, or None."""
+        check_empty = request.meta.get('soft_block_empty')
+        if check_empty is None:
+            check_empty = callback_name(request) in self.soft_block_empty_callbacks
+        if check_empty:
+            if not isinstance(response, TextResponse):
+                return 'not a text response'
+            if not response.body.strip():
+                return 'empty body'
+        if not isinstance(response, TextResponse):
+            return None
+        if self.soft_block_pattern is not None and len(response.body) <= self.soft_block_max_bytes:
+            match = self.soft_block_pattern.search(response.body)
+            if match:
+                return f"block page ({match.group(0).decode('utf-8', 'replace')})"
+        return None
+
+    def retry(self, request, reason, spider, max_retry_times=None):
+        retry = get_retry_request(
+            request,
+            spider=spider,
+            reason=reason,
+            max_retry_times=max_retry_times or request.meta.get('max_retry_times', self.max_retry_times),
+            priority_adjust=request.meta.get('priority_adjust', self.priority_adjust),
+        )
+        if retry is not None:
+            proxy = request.meta.get('proxy')
+            if proxy:
+                retry.meta['excluded_proxies'] = [*request.meta.get('excluded_proxies', ()), proxy]
+        return retry
+
+    def backoff(self, request, retry_after=None):
+        """Seconds to hold back a retry: exponential in its retry count, jittered."""
+        ceiling = min(self.backoff_base * 2 ** (request.meta.get('retry_times', 1) - 1), self.backoff_max)
+        delay = random.uniform(ceiling / 2, ceiling)
+        if retry_after:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        domain = urlparse_cached(request).hostname or ''
+        return max(delay, self.breaker.paused_for(domain))
+
+    def record(self, request, spider, error):
+        domain = urlparse_cached(request).hostname or ''
+        pause = self.breaker.record(domain, error)
+        if pause:
+            self.inc_stat('retry/breaker_trips')
+            spider.logger.warning(
+                f"{domain}: too many failed requests, pausing the domain for {pause:g}s"
+            )
+
+    def schedule(self, request, delay):
+        from twisted.internet import reactor
+
+        # The copy still carries the last attempt's proxy and send time; left
+        # in place, a hold of the copy would be charged to that proxy and to
+        # the domain's throttle as if the request had been sent and failed
+        request.meta.pop('proxy', None)
+        request.meta.pop('adaptive_throttle_sent', None)
+        self.scheduled.add(reactor.callLater(delay, self.send, request))
+
+    def send(self, request):
+        self.scheduled = {call for call in self.scheduled if call.active()}
+        self.crawler.engine.crawl(request)
+
+    def spider_idle(self, spider):
+        self.scheduled = {call for call in self.scheduled if call.active()}
+        if self.scheduled:
+            raise DontCloseSpider
+
+    def spider_closed(self, spider, reason):
+        dropped = [call for call in self.scheduled if call.active()]
+        for call in dropped:
+            call.cancel()
+        self.scheduled.clear()
+        if dropped:
+            spider.logger.info(f"Dropped {len(dropped)} retries still waiting when the spider closed")
+
+    def inc_stat(self, key):
+        if self.stats is not None:
+            self.stats.inc_value(key)
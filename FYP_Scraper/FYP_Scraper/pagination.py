@@ -0,0 +1,54 @@
+# FYP_Scraper/FYP_Scraper/pagination.py
+
+
+class PaginationWindow:
+    """
+    Keeps several listing offsets of an offset-paginated endpoint in flight.
+
+    Instead of requesting offset N + page_size only after offset N has been
+    parsed, the spider asks fill() for up to `size` offsets at a time and
+    reports every parsed page through done(). The first short or empty page
+    (or a stop() call) marks the end of the listing: no offsets past it are
+    handed out again, and responses for offsets already in flight beyond it
+    are recognised by past_end() and ignored.
+    """
+
+    def __init__(self, page_size, size=1, start=0):
+        self.page_size = page_size
+        self.size = max(size, 1)
+        self.next_offset = start
+        self.end = None  # offset of the last page, once known
+        self.in_flight = set()
+
+    @classmethod
+    def from_settings(cls, settings, page_size, start=0, concurrency=None):
+        # Never ask for more pages at once than the per-domain concurrency
+        # limit (or the site's own download slot) would let through anyway
+        size = min(
+            settings.getint('PAGINATION_WINDOW', 4),
+            concurrency or settings.getint('CONCURRENT_REQUESTS_PER_DOMAIN', 8),
+        )
+        return cls(page_size, size=size, start=start)
+
+    def fill(self):
+        """Return the offsets to request now to keep the window full."""
+        offsets = []
+        while len(self.in_flight) < self.size and not self.past_end(self.next_offset):
+            offsets.append(self.next_offset)
+            self.in_flight.add(self.next_offset)
+            self.next_offset += self.page_size
+        return offsets
+
+    def done(self, offset, last_page=False):
+        """Record that the page at offset was parsed (or failed)."""
+        self.in_flight.discard(offset)
+        if last_page:
+            self.stop(offset)
+
+    def stop(self, offset):
+        """Treat offset as the last page of the listing."""
+        if self.end is None or offset < self.end:
+            self.end = offset
+
+    def past_end(self, offset):
+        return self.end is not None and offset > self.end
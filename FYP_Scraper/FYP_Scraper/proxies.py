@@ -0,0 +1,108 @@
+# FYP_Scraper/FYP_Scraper/proxies.py
+
+import random
+import time
+
+
+class ProxyState:
+    """Health of a single proxy: smoothed latency and success rate."""
+
+    def __init__(self, url, latency, success_rate):
+        self.url = url
+        self.latency = latency
+        self.success_rate = success_rate
+        self.failure_streak = 0
+        self.quarantines = 0  # consecutive quarantines, drives the backoff
+        self.quarantined_until = 0.0
+        self.requests = 0
+
+    @property
+    def weight(self):
+        # Fast, reliable proxies get picked more often; the latency floor
+        # keeps one suspiciously fast proxy from taking all the traffic
+        return self.success_rate / max(self.latency, 0.05)
+
+
+class ProxyPool:
+    """
+    Latency-weighted proxy selection with quarantine of failing proxies.
+
+    Each proxy starts from the latency and uptime published in the proxy
+    list and is then updated from what the crawl actually observes: an
+    exponentially weighted moving average (EWMA) of download latency, and an
+    EWMA of the success rate. A proxy that fails max_failures times in a row
+    is quarantined for quarantine_base seconds, doubling on every further
+    quarantine up to quarantine_max; it is re-admitted once that time has
+    passed and its backoff resets on the first success.
+    """
+
+    def __init__(self, alpha=0.3, max_failures=3, quarantine_base=60, quarantine_max=1800,
+                 clock=time.monotonic):
+        self.alpha = alpha
+        self.max_failures = max_failures
+        self.quarantine_base = quarantine_base
+        self.quarantine_max = quarantine_max
+        self.clock = clock
+        self.proxies = {}
+        self.total_quarantines = 0
+
+    def add(self, url, latency=1.0, success_rate=0.5):
+        """Add a proxy with initial latency (seconds) and success rate (0-1)."""
+        success_rate = min(max(success_rate, 0.05), 1.0)
+        self.proxies[url] = ProxyState(url, max(latency, 0.0), success_rate)
+
+    def __len__(self):
+        return len(self.proxies)
+
+    def available(self):
+        now = self.clock()
+        return [proxy for proxy in self.proxies.values() if proxy.quarantined_until <= now]
+
+    def choose(self, exclude=()):
+        """
+        Pick a proxy URL, weighted by health, or None if the pool is empty.
+        Proxies in `exclude` (e.g. the ones a retried request already
+        failed through) are only used when nothing else is available.
+        """
+        candidates = self.available()
+        if exclude:
+            candidates = [proxy for proxy in candidates if proxy.url not in exclude] or candidates
+        if not candidates:
+            if not self.proxies:
+                return None
+            # Everything is quarantined: use the proxy that comes back first
+            # rather than sending requests without a proxy
+            proxy = min(self.proxies.values(), key=lambda p: p.quarantined_until)
+        else:
+            proxy = random.choices(candidates, weights=[p.weight for p in candidates])[0]
+        proxy.requests += 1
+        return proxy.url
+
+    def record_success(self, url, latency=None):
+        proxy = self.proxies.get(url)
+        if proxy is None:
+            return
+        if latency is not None:
+            proxy.latency += self.alpha * (latency - proxy.latency)
+        proxy.success_rate += self.alpha * (1.0 - proxy.success_rate)
+        proxy.failure_streak = 0
+        proxy.quarantines = 0
+
+    def record_failure(self, url):
+        """Record a failed request; returns True if the proxy got quarantined."""
+        proxy = self.proxies.get(url)
+        if proxy is None:
+            return False
+        proxy.success_rate = max(proxy.success_rate * (1.0 - self.alpha), 0.01)
+        proxy.failure_streak += 1
+        if proxy.failure_streak < self.max_failures:
+            return False
+        backoff = min(self.quarantine_base * 2 ** proxy.quarantines, self.quarantine_max)
+        proxy.quarantined_until = self.clock() + backoff
+        proxy.quarantines += 1
+        proxy.failure_streak = 0
+        self.total_quarantines += 1
+        return True
+
+    def best(self, count=5):
+        return sorted(self.proxies.values(), key=lambda p: p.weight, reverse=True)[:count]
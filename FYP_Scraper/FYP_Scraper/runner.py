@@ -0,0 +1,128 @@
+"""
+Run every news crawl concurrently in one process and one reactor.
+
+Usage (from the directory containing scrapy.cfg):
+
+    python -m FYP_Scraper.runner
+    python -m FYP_Scraper.runner --only ajax_post_pagination urdupoint
+    python -m FYP_Scraper.runner --exclude dunya_news
+
+All crawlers share one MongoDB client pool (see FYP_Scraper.mongo) and
+DomainPolitenessMiddleware keeps crawlers that hit the same site from adding
+up their request rates. A failing crawl is logged and reported in the summary
+without affecting the others; the exit code is non-zero if any crawl failed
+or left items in its MongoDB spool (see MongoDBPipeline).
+"""
+
+import argparse
+import logging
+import sys
+import time
+
+from scrapy.crawler import CrawlerProcess
+from scrapy.utils.project import get_project_settings
+
+logger = logging.getLogger(__name__)
+
+# (label, spider name, spider arguments)
+CRAWLS = [
+    # City42, Nawaiwaqt, Daily Pakistan and 24 Urdu in one crawl; see
+    # spiders/ajax_post_pagination.py
+    ("ajax_post_pagination", "ajax_post_pagination", {}),
+    ("urdupoint", "urdupoint_multi_category", {"selected_category": "all"}),
+    ("dunya_news", "dunya_news", {}),
+]
+
+
+def select_crawls(only=None, exclude=None):
+    selected = []
+    for label, spider_name, kwargs in CRAWLS:
+        names = {label, spider_name}
+        if only and not names & set(only):
+            continue
+        if exclude and names & set(exclude):
+            continue
+        selected.append((label, spider_name, kwargs))
+    return selected
+
+
+class RunSummary:
+    def __init__(self):
+        self.results = {}
+
+    def started(self, label):
+        self.results[label] = {'started': time.monotonic()}
+
+    def finished(self, result, label, crawler):
+        stats = crawler.stats.get_stats() if crawler.stats else {}
+        self.results[label].update({
+            'elapsed': time.monotonic() - self.results[label]['started'],
+            'finish_reason': stats.get('finish_reason', 'unknown'),
+            'items': stats.get('item_scraped_count', 0),
+            'new': stats.get('mongodb/upserted', 0),
+            'errors': stats.get('log_count/ERROR', 0),
+            # Spooled items that never reached MongoDB
+            'failed': bool(stats.get('spool/pending')),
+        })
+        if stats.get('spool/pending'):
+            logger.error(f"Crawl {label} left {stats['spool/pending']} items unwritten in its spool")
+        return result
+
+    def failed(self, failure, label):
+        logger.error(f"Crawl {label} failed: {failure.getErrorMessage()}")
+        self.results[label].update({
+            'elapsed': time.monotonic() - self.results[label]['started'],
+            'finish_reason': f"failed: {failure.getErrorMessage()}",
+            'items': 0,
+            'new': 0,
+            'errors': 1,
+            'failed': True,
+        })
+
+    def log(self, wall_time):
+        lines = [
+            "=" * 80,
+            "CRAWL SUMMARY",
+            f"{'crawl':<22}{'reason':<24}{'items':>8}{'new':>8}{'errors':>8}{'time':>10}",
+        ]
+        for label, result in self.results.items():
+            lines.append(
+                f"{label:<22}{str(result.get('finish_reason'))[:23]:<24}{result.get('items', 0):>8}"
+                f"{result.get('new', 0):>8}{result.get('errors', 0):>8}{result.get('elapsed', 0):>9.0f}s"
+            )
+        total_items = sum(result.get('items', 0) for result in self.results.values())
+        lines.append(f"Total items: {total_items}, wall time: {wall_time:.0f}s")
+        lines.append("=" * 80)
+        logger.info("\n".join(lines))
+
+    @property
+    def any_failed(self):
+        return any(result.get('failed') for result in self.results.values())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run all news crawls in one process")
+    parser.add_argument('--only', nargs='+', help="Crawl labels or spider names to run")
+    parser.add_argument('--exclude', nargs='+', help="Crawl labels or spider names to skip")
+    args = parser.parse_args(argv)
+
+    settings = get_project_settings()
+    settings.set('DOMAIN_POLITENESS_ENABLED', True, priority='cmdline')
+    process = CrawlerProcess(settings)
+    summary = RunSummary()
+
+    for label, spider_name, kwargs in select_crawls(args.only, args.exclude):
+        crawler = process.create_crawler(spider_name)
+        summary.started(label)
+        d = process.crawl(crawler, **kwargs)
+        d.addCallback(summary.finished, label, crawler)
+        d.addErrback(summary.failed, label)
+
+    started = time.monotonic()
+    process.start()
+    summary.log(time.monotonic() - started)
+    return 1 if summary.any_failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
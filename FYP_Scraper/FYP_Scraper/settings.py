@@ -46,25 +46,91 @@ COOKIES_ENABLED = False
 
 # Enable or disable spider middlewares
 # See https://docs.scrapy.org/en/latest/topics/spider-middleware.html
-#SPIDER_MIDDLEWARES = {
-#    "FYP_Scraper.middlewares.FypScraperSpiderMiddleware": 543,
-#}
+SPIDER_MIDDLEWARES = {
+    'FYP_Scraper.middlewares.KnownUrlFilterMiddleware': 550,
+    'FYP_Scraper.middlewares.CallbackTimingMiddleware': 950,
+}
+
+# Skip article requests for URLs already stored in news_db.{source}_raw
+KNOWN_URLS_ENABLED = True
+KNOWN_URLS_CALLBACKS = ['parse_article', 'parse_news']  # Callbacks that download articles
+KNOWN_URLS_REFRESH_DAYS = 0  # Re-download articles last crawled more than N days ago (0 = never)
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
 DOWNLOADER_MIDDLEWARES = {
     'scrapy.downloadermiddlewares.useragent.UserAgentMiddleware': None,
-    'scrapy.downloadermiddlewares.retry.RetryMiddleware': 500,
+    'scrapy.downloadermiddlewares.retry.RetryMiddleware': None,
+    'FYP_Scraper.middlewares.BackoffRetryMiddleware': 500,
     'scrapy.downloadermiddlewares.httpproxy.HttpProxyMiddleware': None,
     'FYP_Scraper.middlewares.RandomProxyMiddleware': 750,
+    # After the proxy is picked, so limits are judged per proxy route
+    'FYP_Scraper.middlewares.AdaptiveThrottleMiddleware': 760,
     'FYP_Scraper.middlewares.RandomUserAgentMiddleware': 400,
+    'FYP_Scraper.middlewares.DomainPolitenessMiddleware': 450,
+    # Ahead of politeness delays, retries and proxies, so cache hits skip them
+    'scrapy.downloadermiddlewares.httpcache.HttpCacheMiddleware': 420,
 }
 
+# Space requests to one domain across all crawlers sharing a process, by the
+# delay of each crawler's downloader slot for it (set by FYP_Scraper.runner; a
+# single `scrapy crawl` relies on its downloader slots alone)
+DOMAIN_POLITENESS_ENABLED = False
+
+# Proxy pool (RandomProxyMiddleware): proxies are weighted by smoothed latency
+# and success rate; PROXY_MAX_FAILURES failures in a row quarantine a proxy
+# for PROXY_QUARANTINE_BASE seconds, doubling up to PROXY_QUARANTINE_MAX
+PROXY_LIST_FILE = 'Free_Proxy_List.csv'
+PROXY_EWMA_ALPHA = 0.3
+PROXY_MAX_FAILURES = 3
+PROXY_QUARANTINE_BASE = 60
+PROXY_QUARANTINE_MAX = 1800
+PROXY_FAILURE_HTTP_CODES = [407, 408, 502, 503, 504, 522, 524]
+# Responses that, through a proxy, mean the proxy's address is blocked or
+# broken rather than the site struggling: they count against the proxy, not
+# the domain's throttle and circuit breaker
+PROXY_BLOCK_HTTP_CODES = [403, 407]
+
+# Number of User-Agent strings RandomUserAgentMiddleware draws at startup
+USER_AGENT_POOL_SIZE = 50
+
 
-# Retry settings
+# Retry settings (BackoffRetryMiddleware): retries wait
+# RETRY_BACKOFF_BASE * 2 ** (n - 1) seconds (jittered, at most
+# RETRY_BACKOFF_MAX or the site's Retry-After) and go out through another
+# proxy with another User-Agent
 RETRY_ENABLED = True
 RETRY_TIMES = 5  # Number of retries for each request
 RETRY_HTTP_CODES = [500, 502, 503, 504, 522, 524, 408, 429, 403]
+RETRY_BACKOFF_BASE = 2
+RETRY_BACKOFF_MAX = 120
+# Soft blocks: small 200 pages matching one of these patterns (captchas, WAF
+# challenges), and for the callbacks below (or requests with meta
+# soft_block_empty) empty or non-text 200 responses. Listing callbacks are
+# left out: an empty listing page is how pagination ends.
+RETRY_SOFT_BLOCK_TIMES = 2
+RETRY_SOFT_BLOCK_EMPTY_CALLBACKS = ['parse_article', 'parse_news']
+RETRY_SOFT_BLOCK_MAX_BYTES = 32768
+RETRY_SOFT_BLOCK_PATTERNS = [
+    r'captcha',
+    r'<title>\s*Just a moment\.\.\.',
+    r'cf-chl-|/cdn-cgi/challenge-platform/',
+    r'Attention Required! \| Cloudflare',
+    r'<title>\s*Access Denied',
+    r'Incapsula incident ID|_Incapsula_Resource',
+    r'Sucuri WebSite Firewall',
+    r'DDoS-Guard',
+    r'unusual traffic from your computer',
+]
+# Circuit breaker: a domain whose last RETRY_BREAKER_WINDOW responses are
+# RETRY_BREAKER_THRESHOLD or more failures (with at least
+# RETRY_BREAKER_MIN_REQUESTS of them) is paused for RETRY_BREAKER_COOLDOWN
+# seconds, doubling on each trip in a row up to RETRY_BREAKER_MAX_COOLDOWN
+RETRY_BREAKER_WINDOW = 20
+RETRY_BREAKER_MIN_REQUESTS = 10
+RETRY_BREAKER_THRESHOLD = 0.5
+RETRY_BREAKER_COOLDOWN = 60
+RETRY_BREAKER_MAX_COOLDOWN = 900
 
 # Download delay settings
 DOWNLOAD_DELAY = 2  # Add a 2 second delay between requests
@@ -74,18 +140,131 @@ RANDOMIZE_DOWNLOAD_DELAY = True  # Randomize the delay
 CONCURRENT_REQUESTS = 16  # Adjust based on your needs
 CONCURRENT_REQUESTS_PER_DOMAIN = 8
 
+# Per-domain AIMD throttling (AdaptiveThrottleMiddleware): the delay and
+# concurrency above (or a spider's DOWNLOAD_SLOTS) are only starting points.
+# Healthy responses add up to one request in flight per round and
+# ADAPTIVE_THROTTLE_RATE_STEP requests/second to the rate (1 / delay);
+# backoff codes, download errors and latency above
+# ADAPTIVE_THROTTLE_LATENCY_FACTOR times its usual level scale both by
+# ADAPTIVE_THROTTLE_BACKOFF_FACTOR. Through a proxy, PROXY_BLOCK_HTTP_CODES
+# and connection errors count against the proxy only.
+ADAPTIVE_THROTTLE_ENABLED = True
+ADAPTIVE_THROTTLE_MIN_CONCURRENCY = 1
+ADAPTIVE_THROTTLE_MAX_CONCURRENCY = 16
+ADAPTIVE_THROTTLE_MIN_DELAY = 0.25
+ADAPTIVE_THROTTLE_MAX_DELAY = 60
+ADAPTIVE_THROTTLE_RATE_STEP = 0.05
+ADAPTIVE_THROTTLE_BACKOFF_FACTOR = 0.5
+ADAPTIVE_THROTTLE_LATENCY_FACTOR = 2.0
+ADAPTIVE_THROTTLE_BACKOFF_HTTP_CODES = [403, 429, 500, 502, 503, 504, 522, 524]
+
+# Listing pages of the ajax_post_pagination spiders requested ahead of the
+# one being parsed (capped by CONCURRENT_REQUESTS_PER_DOMAIN)
+PAGINATION_WINDOW = 4
+
+# Publication dates to crawl (YYYY-MM-DD, empty = open). Overridden per run
+# with -a since=... -a until=...; listing dates outside the window skip the
+# article request, and a listing page entirely before CRAWL_SINCE ends it
+CRAWL_SINCE = '2015-01-01'
+CRAWL_UNTIL = None
+
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
-#EXTENSIONS = {
-#    "scrapy.extensions.telnet.TelnetConsole": None,
-#}
+EXTENSIONS = {
+    'FYP_Scraper.extensions.IncrementalStopController': 500,
+    'FYP_Scraper.extensions.CrawlMetrics': 510,
+}
+
+# Stop paginating once listings reach the newest article seen by the last
+# successful run (high-water marks live in news_db.crawl_state)
+INCREMENTAL_STOP_ENABLED = True
+
+# Latency histograms (CrawlMetrics): downloads per domain and proxy, spider
+# callbacks, MongoDB writes. Written at close to .scrapy/METRICS_DIR as
+# <spider>.prom (Prometheus text format) and/or <spider>.json, and
+# summarised in news_db.crawl_runs
+METRICS_ENABLED = True
+METRICS_DIR = 'metrics'
+METRICS_FORMATS = ['prometheus', 'json']
+METRICS_MONGO_ENABLED = True
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 ITEM_PIPELINES = {
+    'FYP_Scraper.pipelines.StoryClusterPipeline': 250,
     'FYP_Scraper.pipelines.MongoDBPipeline': 300,
+    'FYP_Scraper.pipelines.PartitionedExportPipeline': 400,
 }
 
+# Columnar export for analytics (PartitionedExportPipeline): files under
+# EXPORT_DIR/<format>/source=<source>/month=<YYYY-MM>/, Parquet row groups of
+# at most EXPORT_ROW_GROUP_SIZE rows, a new part file every
+# EXPORT_MAX_FILE_BYTES. Parquet needs pyarrow; 'jsonl' is also available.
+EXPORT_ENABLED = True
+EXPORT_DIR = 'exports'
+EXPORT_FORMATS = ['parquet']
+EXPORT_ROW_GROUP_SIZE = 10000
+EXPORT_MAX_FILE_BYTES = 128 * 1024 * 1024
+EXPORT_MAX_BUFFERED_ROWS = 50000  # Rows held in memory across all partitions
+EXPORT_PARQUET_COMPRESSION = 'zstd'
+
+# Near-duplicate story clustering (StoryClusterPipeline): MinHash signatures of
+# STORY_INDEX_BANDS * STORY_INDEX_ROWS values over word shingles, banded into
+# a persistent LSH index. Articles more than ~(1/bands)**(1/rows) similar
+# (0.55 here) share a story_cluster_id. Changing these needs a new index file.
+# Cluster ids are hashes of the first article's url, so an index rebuilt from
+# scratch never reuses an id stored in MongoDB; the CI workflow caches the
+# file between runs so clusters keep growing.
+STORY_INDEX_PATH = 'story_index.sqlite'
+STORY_INDEX_BANDS = 20
+STORY_INDEX_ROWS = 5
+STORY_INDEX_SHINGLE_SIZE = 3
+STORY_INDEX_COMMIT_EVERY = 500  # New articles per SQLite transaction
+
+# MongoDB bulk-write mode: buffer upserts per {source}_raw collection and
+# flush them as unordered bulk_write batches instead of one round-trip per item.
+# Only used while MONGODB_SPOOL_ENABLED is off: the spool's sync batches
+# (MONGODB_SPOOL_SYNC_BATCH) are bulk writes already. Off by default because
+# items move on once buffered, before their batch is written: a failed write
+# only shows in the log and mongodb/errors, and the exports and item_scraped
+# counts include items that were never stored
+MONGODB_BULK_ENABLED = False
+MONGODB_BULK_SIZE = 100  # Flush once a collection has this many pending writes
+MONGODB_BULK_MAX_AGE = 5  # Flush pending writes older than this many seconds
+
+# Weather observations (WeatherMongoDBPipeline): a time-series collection in
+# weather_db keyed by location, written with one insert_many per batch
+WEATHER_MONGODB_COLLECTION = 'weather_observations'
+WEATHER_BATCH_SIZE = 500
+WEATHER_BATCH_MAX_AGE = 5
+
+# Local-first writes: items are appended to a SQLite spool in
+# .scrapy/MONGODB_SPOOL_DIR (one fsync per MONGODB_SPOOL_COMMIT_EVERY items or
+# sync tick) and a background loop syncs them to MongoDB in batches, retrying
+# with exponential backoff. Items still spooled at close (or after a crash)
+# are synced by the next run that finds the spool (the CI workflow caches
+# .scrapy/spool); leftovers are logged as errors and fail the runner.
+# Replaces bulk mode when enabled.
+MONGODB_SPOOL_ENABLED = True
+MONGODB_SPOOL_DIR = 'spool'
+MONGODB_SPOOL_COMMIT_EVERY = 50
+MONGODB_SPOOL_SYNC_INTERVAL = 1.0  # Seconds between sync batches
+MONGODB_SPOOL_SYNC_BATCH = 500
+MONGODB_SPOOL_RETRY_MAX = 300  # Longest backoff between failed syncs, seconds
+MONGODB_SPOOL_DRAIN_TIMEOUT = 60  # Seconds close_spider keeps syncing
+
+# Articles whose title, content and date hash (content_hash) matches the
+# stored one are not rewritten; edited ones keep the last
+# MONGODB_MAX_REVISIONS replaced hashes in their revisions list
+MONGODB_MAX_REVISIONS = 10
+
+# MongoDB writes run on a worker pool off the reactor thread. When more than
+# MONGODB_MAX_PENDING_WRITES writes are in flight, new items wait for a slot,
+# which backs off the downloader until the database catches up.
+# Set MONGODB_WRITE_THREADS = 0 to write inline on the reactor thread.
+MONGODB_WRITE_THREADS = 4
+MONGODB_MAX_PENDING_WRITES = 16
+
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
 #AUTOTHROTTLE_ENABLED = True
@@ -101,11 +280,26 @@ ITEM_PIPELINES = {
 
 # Enable and configure HTTP caching (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html#httpcache-middleware-settings
-#HTTPCACHE_ENABLED = True
-#HTTPCACHE_EXPIRATION_SECS = 0
-#HTTPCACHE_DIR = "httpcache"
-#HTTPCACHE_IGNORE_HTTP_CODES = []
-#HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.FilesystemCacheStorage"
+HTTPCACHE_ENABLED = True
+HTTPCACHE_DIR = "httpcache"
+HTTPCACHE_STORAGE = "FYP_Scraper.httpcache.SQLiteCacheStorage"
+HTTPCACHE_POLICY = "FYP_Scraper.httpcache.CallbackTTLPolicy"
+# Seconds a cached response stays fresh, by spider callback: listings change
+# every few minutes, published articles hardly ever. Stale entries are
+# revalidated with ETag/Last-Modified when the site sent them.
+HTTPCACHE_CALLBACK_TTLS = {
+    'parse': 15 * 60,
+    'parse_ajax': 15 * 60,
+    'parse_archive': 15 * 60,
+    'parse_article': 30 * 24 * 3600,
+    'parse_news': 30 * 24 * 3600,
+}
+# Sites mark pages no-store/no-cache by default; the TTLs above decide instead
+HTTPCACHE_IGNORE_RESPONSE_CACHE_CONTROLS = ['no-cache', 'no-store']
+# Eviction, run when a spider opens and closes
+HTTPCACHE_SQLITE_MAX_AGE = 60 * 24 * 3600
+HTTPCACHE_SQLITE_MAX_BYTES = 512 * 1024 * 1024
+HTTPCACHE_SQLITE_COMPRESSION_LEVEL = 6
 
 # Set settings whose default value is deprecated to a future-proof value
 FEED_EXPORT_ENCODING = "utf-8"
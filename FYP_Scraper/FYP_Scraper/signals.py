@@ -0,0 +1,15 @@
+# FYP_Scraper/FYP_Scraper/signals.py
+"""
+Project signals, sent through crawler.signals like Scrapy's own.
+
+callback_timed(spider, callback, duration)
+    CallbackTimingMiddleware: seconds a spider callback spent producing the
+    output of one response.
+
+mongodb_write_finished(pipeline, operation, latency, succeeded)
+    BaseMongoDBPipeline: one blocking MongoDB call (a single upsert, a bulk
+    batch or a spool sync) finished after `latency` seconds.
+"""
+
+callback_timed = object()
+mongodb_write_finished = object()
@@ -1,12 +1,14 @@
 import scrapy
 from scrapy.http import FormRequest, Request
-from datetime import datetime
-from FYP_Scraper.items import NewsArticleItem
+from FYP_Scraper.dates import URDU_MONTHS, DateWindow, parse_local
+from FYP_Scraper.items import ArticleCategoriesItem, NewsArticleItem
+from FYP_Scraper.matching import KeywordMatcher
 import re
 from scrapy.exceptions import CloseSpider
 
 class UrduPointMultiCategorySpider(scrapy.Spider):
     name = "urdupoint_multi_category"
+    source = "urdupoint"
     allowed_domains = ["urdupoint.com"]
     ajax_url = "https://www.urdupoint.com/daily/ajax_lmore.php"
 
@@ -23,13 +25,26 @@ class UrduPointMultiCategorySpider(scrapy.Spider):
         ]
 
         if not selected_category:
-            raise CloseSpider("No category provided. Use -a selected_category=<name>")
-
-        self.category = next((cat for cat in self.all_categories if cat["name"] == selected_category), None)
-        if not self.category:
-            raise CloseSpider(f"Invalid category: {selected_category}")
-
-        self.page = 1
+            raise CloseSpider("No category provided. Use -a selected_category=<name>, a comma-separated list or all")
+
+        # "all" or "murder,suicide" paginates several category listings at
+        # once and downloads each article only once
+        if selected_category == "all":
+            self.categories = list(self.all_categories)
+        else:
+            names = [name.strip() for name in selected_category.split(",") if name.strip()]
+            self.categories = [cat for cat in self.all_categories if cat["name"] in names]
+            invalid = set(names) - {cat["name"] for cat in self.categories}
+            if invalid:
+                raise CloseSpider(f"Invalid category: {', '.join(sorted(invalid))}")
+
+        # url -> names of the category listings the article appeared on
+        self.article_categories = {}
+        # url -> matcher labels (categories, geopolitical, location) of every
+        # parsed article, kept or not
+        self.article_matches = {}
+        # urls of the articles whose items were yielded
+        self.kept_articles = set()
 
         self.geopolitical_keywords = ["امریکہ", "ایران", "اسرائیل", "غزہ", "حماس", "یوکرین", "جنگ", "روس", "فلسطین", "نیتن یاہو", "طالبان", "افغانستان", "بھارت", "سرحد", "عالمی", "بیرون ملک", "بین الاقوامی"]
 
@@ -49,16 +64,30 @@ class UrduPointMultiCategorySpider(scrapy.Spider):
             "گلگت", "سکردو", "ہنزہ", "چلاس", "باغ", "راولا کوٹ", "میرپور", "کوٹلی", "نیلم"
         ]
 
+        # All keyword lists compiled once so each article is scanned a single time
+        self.matcher = KeywordMatcher({
+            **{cat["name"]: cat["keywords"] for cat in self.categories},
+            "geopolitical": self.geopolitical_keywords,
+            "location": self.pakistan_locations,
+        })
+
     def start_requests(self):
-        yield FormRequest(
+        self.date_window = DateWindow.from_spider(self)
+        for category in self.categories:
+            yield self.listing_request(category, page=1)
+
+    def listing_request(self, category, page):
+        return FormRequest(
             url=self.ajax_url,
-            formdata={"act": "get_more_tag_news", "tid": self.category["tid"], "m": str(self.page)},
+            formdata={"act": "get_more_tag_news", "tid": category["tid"], "m": str(page)},
             callback=self.parse_ajax,
-            meta={"keywords": self.category["keywords"]},
+            meta={"category": category, "page": page},
             dont_filter=True
         )
 
     def parse_ajax(self, response):
+        category = response.meta["category"]
+        page = response.meta["page"]
         if not response.text.strip().startswith('{'):
             self.logger.warning("Non-JSON response. Skipping page.")
             return
@@ -72,10 +101,13 @@ class UrduPointMultiCategorySpider(scrapy.Spider):
             self.logger.info("No more articles.")
             return
 
+        listing_urls = []
+        listing_dates = []
         for article in articles:
             url = article.css("a::attr(href)").get()
             if not url:
                 continue
+            listing_urls.append(url)
 
             date_parts = article.css("div.item_date *::text").getall()
             date_str = " ".join(t.strip() for t in date_parts if t.strip())
@@ -84,57 +116,87 @@ class UrduPointMultiCategorySpider(scrapy.Spider):
                 continue
 
             day, month_urdu, year = match.groups()
-            month_map = {
-                "جنوری": "Jan", "فروری": "Feb", "مارچ": "Mar", "اپریل": "Apr",
-                "مئی": "May", "جون": "Jun", "جولائی": "Jul", "اگست": "Aug",
-                "ستمبر": "Sep", "اکتوبر": "Oct", "نومبر": "Nov", "دسمبر": "Dec"
-            }
-            date_final = f"{day} {month_map.get(month_urdu, 'Unknown')} {year}"
-            try:
-                parsed_date = datetime.strptime(date_final, "%d %b %Y")
-            except ValueError:
+            date_final = f"{day} {URDU_MONTHS.get(month_urdu, 'Unknown')} {year}"
+            parsed_date = parse_local(date_final)
+            if not parsed_date:
                 continue
+            listing_dates.append(parsed_date)
 
-            if parsed_date < datetime(2015, 1, 1):
+            if parsed_date not in self.date_window:
+                self.crawler.stats.inc_value("date_window/articles_skipped")
                 continue
 
             reported_time = next((t.strip() for t in date_parts if ":" in t.strip()), "N/A")
+            meta = {
+                "url": url,
+                "date": date_final,
+                "reported_time": reported_time,
+            }
+
+            if url in self.article_categories:
+                # Already requested from another category's listing
+                if category["name"] not in self.article_categories[url]:
+                    self.article_categories[url].add(category["name"])
+                    yield from self.late_category(url, category["name"], meta)
+                continue
+            self.article_categories[url] = {category["name"]}
 
-            yield Request(
-                url=url,
-                callback=self.parse_article,
-                meta={
-                    "url": url,
-                    "date": date_final,
-                    "reported_time": reported_time,
-                    "category": self.category["name"],
-                    "keywords": self.category["keywords"]
-                },
-                dont_filter=True
-            )
-
-        self.page += 1
-        yield from self.start_requests()
+            yield Request(url=url, callback=self.parse_article, meta=meta)
+
+        # Listings run newest first: a page entirely before the window ends it
+        if listing_dates and all(self.date_window.too_old(date) for date in listing_dates):
+            self.logger.info(f"{category['name']}: page {page} is older than {self.date_window.since}")
+            self.crawler.stats.inc_value("date_window/listings_stopped")
+            return
+
+        controller = getattr(self, 'stop_controller', None)
+        key = f"{self.source}:{category['name']}"
+        if controller and not controller.observe_listing(self, listing_urls, page=page, dates=listing_dates, key=key):
+            return
+
+        yield self.listing_request(category, page + 1)
+
+    def late_category(self, url, name, meta):
+        # The article was parsed before this listing reached it, so it was
+        # judged without the category
+        matches = self.article_matches.get(url, ())
+        if name not in matches:
+            return
+        if url in self.kept_articles:
+            # Its item went out without the category: add it to the stored document
+            yield ArticleCategoriesItem(url=url, source=self.source, categories=[name])
+        elif "geopolitical" not in matches and "location" in matches:
+            # Rejected only because none of its earlier listings matched: parse
+            # it again (once; listings reaching it meanwhile are in
+            # article_categories by then)
+            del self.article_matches[url]
+            yield Request(url=url, callback=self.parse_article, meta=meta, dont_filter=True)
 
     def parse_article(self, response):
         url = response.meta["url"]
         date = response.meta["date"]
         reported_time = response.meta["reported_time"]
-        category = response.meta["category"]
-        keywords = response.meta["keywords"]
 
         title = response.css("h1.urdu::text").get(default="N/A").strip()
         raw_content = response.css("div.detail_txt.urdu *::text").getall()
         content = " ".join(t.strip() for t in raw_content if t.strip())
         content = re.sub(r'googletag\.cmd\.push\([^)]*\);', '', content)
 
-        if not any(k in title or k in content for k in keywords):
+        hits = self.matcher.find(f"{title}\n{content}")
+        self.article_matches[url] = set(hits)
+
+        # Every category whose listing carried this article and whose
+        # keywords appear in it
+        listed = self.article_categories.get(url, set())
+        categories = [cat["name"] for cat in self.categories if cat["name"] in listed and cat["name"] in hits]
+        if not categories:
             return
-        if any(k in title or k in content for k in self.geopolitical_keywords):
+        if "geopolitical" in hits:
             return
-        if not any(loc in title or loc in content for loc in self.pakistan_locations):
+        if "location" not in hits:
             return
 
+        self.kept_articles.add(url)
         item = NewsArticleItem()
         item["url"] = url
         item["date"] = date
@@ -142,5 +204,8 @@ class UrduPointMultiCategorySpider(scrapy.Spider):
         item["content"] = content
         item["source"] = "urdupoint"
         item["reported_time"] = reported_time
-        item["category"] = category
+        item["category"] = categories[0]
+        item["categories"] = categories
+        item["matched_keywords"] = list(dict.fromkeys(k for name in categories for k in hits[name]))
+        item["matched_locations"] = hits["location"]
         yield item
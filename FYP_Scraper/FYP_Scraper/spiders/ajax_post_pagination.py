@@ -0,0 +1,420 @@
+import scrapy
+from scrapy.exceptions import CloseSpider
+from scrapy.http import FormRequest, Request, TextResponse
+import re
+from FYP_Scraper.dates import DateWindow, parse_local, to_utc
+from FYP_Scraper.items import ArticleCategoriesItem, NewsArticleItem
+from FYP_Scraper.middlewares import RetryScheduled
+from FYP_Scraper.pagination import PaginationWindow
+
+# City42, Nawaiwaqt, Daily Pakistan and 24 Urdu run the same CMS: category
+# listings are paged through POST /ajax_post_pagination with
+# post_per_page / post_listing_limit_offset / category_name. Each site is
+# described here; adding a category is one more entry in its list.
+#
+#   ajax_url          pagination endpoint
+#   listing_url       category page ({category}) that renders the first page
+#                     itself; AJAX pagination then starts at page_size
+#   categories        category_name values to crawl
+#   page_size         post_per_page
+#   form              extra form fields sent with every page
+#   headers           extra headers sent with every page
+#   entries           CSS for one listing entry; a page with fewer entries
+#                     than page_size is the last one
+#   links             CSS for article links (first selector that matches;
+#                     inside each entry when entries is set)
+#   url_date          regex reading the publication date from article URLs
+#                     (groups joined by spaces); links without one are skipped,
+#                     links outside the crawl's DateWindow are not requested
+#   stop_when_all_seen  end the listing on a page whose links were all seen
+#                     (the endpoint repeats its last page)
+#   title, content, date  CSS for the article fields (first that matches)
+#   content_separator joins the content paragraphs
+#   reported_time     take the time after "|" in the date text
+#   download_slot     per-domain DOWNLOAD_SLOTS entry (concurrency, delay); the
+#                     starting point AdaptiveThrottleMiddleware adjusts from
+PROFILES = {
+    "city42": {
+        "source": "city42",
+        "ajax_url": "https://www.city42.tv/ajax_post_pagination",
+        "categories": ["crimes"],
+        "page_size": 28,
+        "form": {"directory_name": "categories_pages", "template_name": "lazy_loading", "show_authors": "1"},
+        "entries": "article",
+        "links": ["a::attr(href)"],
+        "title": ["h2.zm-post-title::text"],
+        "content": ["div.zm-post-dis div.zm-post-content p::text"],
+        "content_separator": "\n",
+        "date": ["a.detail-page-date::text"],
+        "reported_time": True,
+    },
+    "nawaiwaqt": {
+        "source": "nawaiwaqt",
+        "ajax_url": "https://www.nawaiwaqt.com.pk/ajax_post_pagination",
+        "categories": ["crime-court"],
+        "page_size": 28,
+        "form": {"directory_name": "categories_pages", "template_name": "lazy_loading", "show_authors": "1"},
+        "entries": "article",
+        "links": ["a::attr(href)"],
+        "title": ["h1.detail-page-main-title::text"],
+        "content": ["div.news-detail-content-class p::text"],
+        "content_separator": "\n",
+        "date": ["div.jeg_meta_date::text"],
+        "reported_time": False,
+    },
+    "daily_pakistan": {
+        "source": "daily_pakistan",
+        "ajax_url": "https://dailypakistan.com.pk/ajax_post_pagination",
+        "listing_url": "https://dailypakistan.com.pk/{category}",
+        "categories": ["crime-and-justice"],
+        "page_size": 36,
+        "form": {"directory_name": "categories_pages", "template_name": "lazy_loading"},
+        "headers": {"Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8"},
+        "links": ["div.post-title.prr-post-1-tt-div a::attr(href)"],
+        "url_date": r"/(\d{2})-([A-Za-z]{3})-(\d{4})/\d+$",
+        "title": ["h1::text"],
+        "content": ["div.news-detail-content-class p:not(:empty)::text"],
+        "content_separator": " ",
+        "date": ["div.large-post-meta span::text"],
+        "reported_time": True,
+    },
+    "24_news": {
+        "source": "24_news",
+        "ajax_url": "https://www.24urdu.com/ajax_post_pagination",
+        "listing_url": "https://www.24urdu.com/{category}",
+        "categories": ["crime-and-punishment"],
+        "page_size": 20,
+        "form": {"directory_name": "categories_pages", "template_name": "lazy_loading"},
+        "headers": {
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+            "X-Requested-With": "XMLHttpRequest",
+            "Origin": "https://www.24urdu.com",
+        },
+        "links": ["article a::attr(href)", "div.col-md-6 a::attr(href)", "div.rp-inner a::attr(href)"],
+        "stop_when_all_seen": True,
+        "title": ["h1::text", "div.rp-inner h4::text"],
+        "content": ["div.detail_page_content p::text", "div.entry-content p::text"],
+        "content_separator": " ",
+        "date": ["span.auth-rp-date::text", "span.date::text"],
+        "reported_time": True,
+        "download_slot": {"concurrency": 1, "delay": 3},
+    },
+}
+
+
+def profile_domain(profile):
+    return re.match(r"https?://([^/]+)", profile["ajax_url"]).group(1)
+
+
+class Listing:
+    """Pagination state of one site category."""
+
+    def __init__(self, site, profile, category):
+        self.site = site
+        self.profile = profile
+        self.category = category
+        self.window = None  # created once the first page is known
+
+    @property
+    def key(self):
+        # The first category keeps the plain source key its spider used
+        # before categories were configurable, so stop marks carry over
+        if self.category == self.profile["categories"][0]:
+            return self.profile["source"]
+        return f"{self.profile['source']}:{self.category}"
+
+
+class AjaxPostPaginationSpider(scrapy.Spider):
+    """
+    Crawls the crime categories of every site in PROFILES from one spider,
+    so all listings share one scheduler and Scrapy's per-domain slots.
+
+        scrapy crawl ajax_post_pagination
+        scrapy crawl ajax_post_pagination -a sites=city42,24_news
+        scrapy crawl ajax_post_pagination -a categories=crimes,crime-court
+        scrapy crawl ajax_post_pagination -a since=2025-01-01 -a until=2025-06-30
+
+    Each listing keeps a PaginationWindow of pages in flight, articles are
+    downloaded once even when several listings carry them, and items are
+    stored under their site's source. A listing that reaches an article
+    after it was parsed sends its category as an ArticleCategoriesItem.
+
+    Listings run newest first, so a listing ends on the first page whose
+    URL dates are all before `since`, or whose article turns out to be.
+    Articles dated outside [since, until] by their URL are never requested.
+    """
+
+    name = "ajax_post_pagination"
+    profiles = PROFILES
+    sites = list(PROFILES)
+    custom_settings = {
+        "DOWNLOAD_SLOTS": {
+            profile_domain(profile): profile["download_slot"]
+            for profile in PROFILES.values()
+            if "download_slot" in profile
+        },
+    }
+
+    def __init__(self, sites=None, categories=None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if sites:
+            names = [name.strip() for name in sites.split(",") if name.strip()]
+            invalid = set(names) - set(self.profiles)
+            if invalid:
+                raise CloseSpider(f"Unknown site: {', '.join(sorted(invalid))}")
+            self.sites = names
+        wanted = {name.strip() for name in categories.split(",")} if categories else None
+
+        self.listings = {}
+        for site in self.sites:
+            profile = self.profiles[site]
+            for category in profile["categories"]:
+                if wanted is None or category in wanted:
+                    self.listings[(site, category)] = Listing(site, profile, category)
+        if not self.listings:
+            raise CloseSpider("No listings selected")
+
+        # Sources whose stored articles and stop marks this crawl uses
+        self.sources = list(dict.fromkeys(self.profiles[site]["source"] for site in self.sites))
+        # url -> categories of the listings the article appeared on
+        self.article_categories = {}
+        # url -> url of the item yielded for the article
+        self.parsed_articles = {}
+        self.scraped_count = 0
+        self.skipped_count = 0
+
+    def start_requests(self):
+        self.date_window = DateWindow.from_spider(self)
+        for listing in self.listings.values():
+            profile = listing.profile
+            if "listing_url" in profile:
+                yield Request(
+                    profile["listing_url"].format(category=listing.category),
+                    callback=self.parse_ajax,
+                    errback=self.listing_failed,
+                    meta={"site": listing.site, "category": listing.category, "offset": 0},
+                )
+            else:
+                yield from self.start_pagination(listing, start=0)
+
+    def start_pagination(self, listing, start):
+        slot = listing.profile.get("download_slot", {})
+        listing.window = PaginationWindow.from_settings(
+            self.settings, page_size=listing.profile["page_size"], start=start, concurrency=slot.get("concurrency"),
+        )
+        for offset in listing.window.fill():
+            yield self.listing_request(listing, offset)
+
+    def listing_request(self, listing, offset):
+        profile = listing.profile
+        formdata = {
+            "post_per_page": str(profile["page_size"]),
+            "post_listing_limit_offset": str(offset),
+            "category_name": listing.category,
+            **profile.get("form", {}),
+        }
+        headers = dict(profile.get("headers", {}))
+        if "listing_url" in profile:
+            headers["Referer"] = profile["listing_url"].format(category=listing.category)
+        return FormRequest(
+            url=profile["ajax_url"],
+            formdata=formdata,
+            headers=headers,
+            callback=self.parse_ajax,
+            errback=self.listing_failed,
+            meta={"site": listing.site, "category": listing.category, "offset": offset},
+            dont_filter=True,
+        )
+
+    def parse_ajax(self, response):
+        listing = self.listings[(response.meta["site"], response.meta["category"])]
+        offset = response.meta["offset"]
+        if listing.window and listing.window.past_end(offset):
+            return
+
+        links, entries = self.listing_links(response, listing.profile)
+        dates = None
+        url_date = listing.profile.get("url_date")
+        if url_date:
+            dated = [(link, self.url_date(link, url_date)) for link in links]
+            dated = [(link, date) for link, date in dated if date]
+            links = [link for link, _ in dated]
+            dates = [date for _, date in dated]
+
+        new_links = [link for link in links if link not in self.article_categories]
+        before_window = bool(dates) and all(self.date_window.too_old(date) for date in dates)
+        last_page = (
+            not links
+            or (entries is not None and entries < listing.profile["page_size"])
+            or (listing.profile.get("stop_when_all_seen") and not new_links)
+            or before_window
+        )
+        if before_window:
+            self.logger.info(f"{listing.key}: page at offset {offset} is older than {self.date_window.since}")
+            self.crawler.stats.inc_value("date_window/listings_stopped")
+        elif last_page:
+            self.logger.info(f"{listing.key}: last listing page at offset {offset}")
+
+        for index, link in enumerate(links):
+            if dates and dates[index] not in self.date_window:
+                self.crawler.stats.inc_value("date_window/articles_skipped")
+                continue
+            if link in self.article_categories:
+                # Already requested from another page or listing
+                if listing.category not in self.article_categories[link]:
+                    self.article_categories[link].add(listing.category)
+                    if link in self.parsed_articles:
+                        # Its item went out without this category
+                        yield ArticleCategoriesItem(
+                            url=self.parsed_articles[link],
+                            source=listing.profile["source"],
+                            categories=[listing.category],
+                        )
+                continue
+            self.article_categories[link] = {listing.category}
+            yield Request(
+                link,
+                callback=self.parse_article,
+                meta={"site": listing.site, "category": listing.category, "url": link, "offset": offset},
+            )
+
+        if listing.window is None:
+            # The category page itself was the first page
+            reached = self.reached_previous_run(listing, links, offset, dates)
+            if not links or before_window or reached:
+                return
+            yield from self.start_pagination(listing, start=listing.profile["page_size"])
+            return
+
+        listing.window.done(offset, last_page=last_page)
+        if self.reached_previous_run(listing, links, offset, dates):
+            listing.window.stop(offset)
+        for next_offset in listing.window.fill():
+            yield self.listing_request(listing, next_offset)
+
+    def listing_links(self, response, profile):
+        """Return (article URLs in page order, entry count or None)."""
+        if not isinstance(response, TextResponse) or not response.body:
+            self.logger.info(f"Non-HTML listing response: {response.url}")
+            return [], None
+        entries = None
+        links = []
+        if "entries" in profile:
+            selected = response.css(profile["entries"])
+            entries = len(selected)
+            for entry in selected:
+                link = next((entry.css(css).get() for css in profile["links"] if entry.css(css)), None)
+                if link:
+                    links.append(link)
+        else:
+            for css in profile["links"]:
+                links = response.css(css).getall()
+                if links:
+                    break
+        links = [response.urljoin(link) for link in links if link]
+        return list(dict.fromkeys(links)), entries
+
+    def url_date(self, url, pattern):
+        match = re.search(pattern, url)
+        return parse_local(" ".join(match.groups())) if match else None
+
+    def reached_previous_run(self, listing, links, offset, dates):
+        controller = getattr(self, "stop_controller", None)
+        if not controller:
+            return False
+        return not controller.observe_listing(self, links, page=offset, dates=dates, key=listing.key)
+
+    def listing_failed(self, failure):
+        if failure.check(RetryScheduled):
+            # The page will come back through parse_ajax or here
+            return
+        request = failure.request
+        listing = self.listings[(request.meta["site"], request.meta["category"])]
+        offset = request.meta["offset"]
+        self.logger.error(f"{listing.key}: listing page at offset {offset} failed: {failure.getErrorMessage()}")
+        if listing.window is None:
+            # Without the category page, page through everything after it
+            yield from self.start_pagination(listing, start=listing.profile["page_size"])
+            return
+        listing.window.done(offset)
+        for next_offset in listing.window.fill():
+            yield self.listing_request(listing, next_offset)
+
+    def first(self, response, selectors):
+        for css in selectors:
+            value = response.css(css).get()
+            if value and value.strip():
+                return value.strip()
+        return None
+
+    def parse_article(self, response):
+        profile = self.profiles[response.meta["site"]]
+
+        title = self.first(response, profile["title"])
+        if not title:
+            self.logger.warning(f"Skipped (no title): {response.url}")
+            self.skipped_count += 1
+            return
+
+        paragraphs = []
+        for css in profile["content"]:
+            paragraphs = [p.strip() for p in response.css(css).getall() if p.strip()]
+            if paragraphs:
+                break
+        if not paragraphs:
+            self.logger.warning(f"Skipped (no content): {response.url}")
+            self.skipped_count += 1
+            return
+
+        date_value = "N/A"
+        reported_time_value = "N/A"
+        date_text = self.first(response, profile["date"])
+        if date_text:
+            parts = [part.strip() for part in date_text.split("|")]
+            date_value = parts[0]
+            if profile.get("reported_time") and len(parts) > 1:
+                reported_time_value = parts[1]
+
+        local = parse_local(date_value, reported_time_value if reported_time_value != "N/A" else None)
+        if local and local not in self.date_window:
+            self.logger.info(f"Skipped article from {date_value}: {response.url}")
+            if self.date_window.too_old(local):
+                self.stop_listing_before(response.meta)
+            return
+        if not local and date_value != "N/A":
+            self.logger.warning(f"Unrecognised date {date_value!r}: {response.url}")
+        published = to_utc(local) if local else None
+
+        listed = self.article_categories.get(response.meta["url"]) or {response.meta["category"]}
+        categories = [category for category in profile["categories"] if category in listed]
+
+        item = NewsArticleItem()
+        item["title"] = title
+        item["content"] = profile["content_separator"].join(paragraphs)
+        item["url"] = response.url
+        item["date"] = date_value
+        item["reported_time"] = reported_time_value
+        item["source"] = profile["source"]
+        item["category"] = categories[0] if categories else response.meta["category"]
+        item["categories"] = categories or [response.meta["category"]]
+        item["published_at"] = published
+        self.parsed_articles[response.meta["url"]] = response.url
+        self.scraped_count += 1
+        yield item
+
+    def stop_listing_before(self, meta):
+        # Listings run newest first: pages after the one that carried an
+        # article older than the window can only hold older ones
+        listing = self.listings[(meta["site"], meta["category"])]
+        offset = meta.get("offset", 0)
+        if listing.window is None or listing.window.past_end(offset) or listing.window.end == offset:
+            return
+        listing.window.stop(offset)
+        self.logger.info(f"{listing.key}: article on page at offset {offset} is older than {self.date_window.since}")
+        self.crawler.stats.inc_value("date_window/listings_stopped")
+
+    def closed(self, reason):
+        self.logger.info(f"Articles scraped: {self.scraped_count}, skipped: {self.skipped_count} ({reason})")
+        skipped = self.crawler.stats.get_value("date_window/articles_skipped", 0)
+        if skipped:
+            self.logger.info(f"Article requests outside {self.date_window}: {skipped}")
@@ -1,17 +1,51 @@
+import re
 import scrapy
 from datetime import datetime, timedelta
-from w3lib.html import remove_tags
+from FYP_Scraper.dates import DateWindow, parse_local, published_at
+from FYP_Scraper.extraction import ParagraphExtractor
 from FYP_Scraper.items import NewsArticleItem
 from scrapy.loader import ItemLoader
 
+_TIME = re.compile(r"\d{1,2}:\d{2}(?::\d{2})?(?:\s*[AaPp][Mm])?")
+
+
+def split_published(text):
+    """
+    Split an article's time element ("12 Mar 2025 02:20 PM", "02:20 PM")
+    into (date text or None, time text or None).
+    """
+    text = " ".join((text or "").split())
+    match = _TIME.search(text)
+    time_text = match.group(0) if match else None
+    date_text = (text[:match.start()] + text[match.end():] if match else text).strip(" |,-")
+    return (date_text if parse_local(date_text) else None), time_text
+
+
 class DunyaNewsSpider(scrapy.Spider):
     name = "dunya_news"
+    source = "dunya_news"
     allowed_domains = ["dunya.com.pk"]
     ajax_url = "https://dunya.com.pk/newweb/modules/ajax_news_archive.php"
+    # <p> tags directly under <article> plus the highlighted summary
+    # paragraphs, leaving out the .installApp banner
+    content_extractor = ParagraphExtractor(
+        "article",
+        skip_classes=["installApp"],
+        include_classes=["border", "p-3", "text-primary", "shadow-sm", "my-2"],
+    )
 
     def start_requests(self):
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=30)
+        # The archive is requested one day at a time for the last 30 days,
+        # narrowed to the crawl's date window
+        window = DateWindow.from_spider(self)
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        end_date = today
+        if window.until:
+            last_day = (window.until - timedelta(seconds=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+            end_date = min(end_date, last_day)
+        start_date = today - timedelta(days=30)
+        if window.since:
+            start_date = max(start_date, window.since)
         current_date = end_date
 
         while current_date >= start_date:
@@ -43,23 +77,22 @@ class DunyaNewsSpider(scrapy.Spider):
         title = response.css("h2.taza-tareen-story-title::text").get()
         loader.add_value("title", title)
 
-        # Select <p> tags directly under <article>, or with specific class, excluding .installApp descendants
-        content_elements = response.css("article > p, article p.border.p-3.text-primary.shadow-sm.my-2").getall()
-        # Filter out <p> tags that are descendants of .installApp
-        content_elements = [c for c in content_elements if not response.css("article .installApp p").re(response.xpath(f"//p[contains(., '{remove_tags(c)}')]").get())]
-        content = " ".join(remove_tags(c).strip() for c in content_elements if c)
+        content = self.content_extractor.extract(response)
         loader.add_value("content", content)
 
-        date = response.meta["date"]
+        # The article's own publication time; the archive day it was listed
+        # under only stands in for a missing or unreadable date
+        date, reported_time = split_published(response.css("time.font-weight-bold.text-dark::text").get())
+        date = date or response.meta["date"]
+        reported_time = reported_time or "N/A"
         loader.add_value("date", date)
-
-        reported_time = response.css("time.font-weight-bold.text-dark::text").get()
-        reported_time = "N/A"
         loader.add_value("reported_time", reported_time)
 
         loader.add_value("url", response.url)
         loader.add_value("source", "dunya_news")
         loader.add_value("category", "N/A")
 
-        yield loader.load_item()
+        item = loader.load_item()
+        item["published_at"] = published_at(date, reported_time)
+        yield item
 # scrapy crawl dunya -o dunyaNews.csv --loglevel DEBUG
\ No newline at end of file
@@ -0,0 +1,233 @@
+import calendar
+from datetime import datetime, timezone
+import json
+import re
+
+import scrapy
+
+from FYP_Scraper.dates import TIME_FORMATS
+from FYP_Scraper.items import WeatherDataItem
+
+_DATA_VAR = re.compile(r'\bvar\s+data\s*=\s*')
+_TIME = re.compile(r'(\d{1,2}:\d{2}(?:\s*[ap]\.?m\.?)?)', re.IGNORECASE)
+_DAY_MONTH = re.compile(r'(\w+),\s*(\d+)\s+(\w+)')
+_TEMPERATURE = re.compile(r'(-?\d+(?:\.\d+)?)\s*°\s*([CF])')
+_HUMIDITY = re.compile(r'(\d+)\s*%')
+_PRESSURE = re.compile(r'(\d+(?:\.\d+)?)\s*(mbar|hPa|"Hg|inHg)')
+_SPEED = re.compile(r'(\d+(?:\.\d+)?)\s*(km/h|mph|m/s|knots)')
+_DISTANCE = re.compile(r'(\d+(?:\.\d+)?)\s*(km|mi)\b')
+
+
+def embedded_data(text):
+    """Return the `var data = {...}` object of a timeanddate page, or None."""
+    match = _DATA_VAR.search(text)
+    if not match:
+        return None
+    try:
+        data, _ = json.JSONDecoder().raw_decode(text, match.end())
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def clock_time(text):
+    """"05:00", "5:00 am" -> "05:00" (the format of the Selenium spider's rows)."""
+    match = _TIME.search(text or '')
+    if not match:
+        return None
+    value = match.group(1).replace('.', '').upper()
+    for time_format in TIME_FORMATS:
+        try:
+            return datetime.strptime(value, time_format).strftime('%H:%M')
+        except ValueError:
+            continue
+    return None
+
+
+def _number(value):
+    return f"{value:g}" if isinstance(value, float) else str(value)
+
+
+class TimeAndDateWeatherSpider(scrapy.Spider):
+    """
+    Hourly historic weather of one city and month from timeanddate.com,
+    with plain requests and no browser.
+
+    The historic page embeds the month's observations as JSON
+    (`var data = {... "detail": [...]}`) for its charts, so one request
+    gives the whole month. If a page has no such data, every day of the
+    month is requested with `hd=YYYYMMDD` and read from the static
+    observations table (#wt-his) instead. Rows are yielded in the same
+    format as the old Selenium spider (timeanddate_weather_selenium):
+    temperatures as "9", "93%", "1020 mbar", "7 km/h" / "No wind".
+
+    A saved page can be parsed with -a url=file:///path/to/page.html
+    (month and year still give the dates of its rows).
+    """
+
+    name = "timeanddate_weather"
+    allowed_domains = ["www.timeanddate.com"]
+    custom_settings = {
+        # Weather rows only go to the weather collection; MongoDBPipeline
+        # would drop them as articles without a title
+        'ITEM_PIPELINES': {'FYP_Scraper.pipelines.WeatherMongoDBPipeline': 300},
+    }
+
+    def __init__(self, month='12', year='2015', location='gujranwala', country='pakistan', url=None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.month = str(month).strip()
+        self.year = str(year).strip()
+        self.location = location
+        self.country = country
+        self.url = url
+
+    @property
+    def historic_url(self):
+        return (f"https://www.timeanddate.com/weather/{self.country}/{self.location}/historic"
+                f"?month={self.month}&year={self.year}")
+
+    def start_requests(self):
+        self.logger.info(f"Scraping weather data for {self.location}, {self.country} {self.month}/{self.year}")
+        if self.url:
+            yield scrapy.Request(self.url, callback=self.parse, meta={'allow_offsite': True})
+        else:
+            yield scrapy.Request(self.historic_url, callback=self.parse)
+
+    def parse(self, response):
+        location = self.page_location(response)
+        data = embedded_data(response.text)
+        rows = (data or {}).get('detail') or []
+        items = [item for item in (self.detail_item(row, data, response, location) for row in rows) if item]
+        if items:
+            self.logger.info(f"Found {len(items)} observations in the page data of {response.url}")
+            yield from items
+            return
+
+        if response.meta.get('day') or self.url:
+            yield from self.parse_table(response, location)
+            return
+        self.logger.info(f"No page data in {response.url}; requesting the month day by day")
+        days = calendar.monthrange(int(self.year), int(self.month))[1]
+        for day in range(1, days + 1):
+            yield scrapy.Request(
+                f"{self.historic_url}&hd={self.year}{int(self.month):02d}{day:02d}",
+                callback=self.parse,
+                meta={'day': day},
+            )
+
+    def page_location(self, response):
+        heading = ' '.join(response.css('h1 ::text').getall()).strip()
+        # "Past Weather in Gujranwala, Pakistan — December 2015"
+        match = re.search(r'\bin\s+(.+?)(?:\s+[—–-]\s+|$)', heading)
+        if match:
+            return match.group(1).strip()
+        return f"{self.location.title()}, {self.country.title()}"
+
+    def detail_item(self, row, data, response, location):
+        """One observation of the embedded data as a WeatherDataItem."""
+        if not isinstance(row, dict):
+            return None
+        text = ' '.join(str(row.get(key) or '') for key in ('ts', 'ds'))
+        time = clock_time(row.get('ts')) or clock_time(row.get('ds'))
+        day = None
+        match = re.search(r'\b(\d{1,2})\s+[A-Z][a-z]+\b', str(row.get('ds') or ''))
+        if match:
+            day = int(match.group(1))
+        if (time is None or day is None) and isinstance(row.get('date'), (int, float)):
+            # Milliseconds of the location's wall-clock time
+            stamp = datetime.fromtimestamp(row['date'] / 1000, timezone.utc)
+            time = time or stamp.strftime('%H:%M')
+            day = day or stamp.day
+        if time is None or day is None:
+            self.logger.debug(f"Skipping observation without a date or time: {text}")
+            return None
+
+        units = data.get('units') or {}
+        temperature_unit = (units.get('temp') or '°C').strip()
+        speed_unit = (units.get('wind') or 'km/h').strip()
+        pressure_unit = (units.get('baro') or 'mbar').strip()
+        distance_unit = 'mi' if speed_unit == 'mph' else 'km'
+
+        def temperature(value):
+            if value is None:
+                return 'N/A'
+            return _number(value) if temperature_unit == '°C' else f"{_number(value)} {temperature_unit}"
+
+        wind = row.get('wind')
+        return self.make_item(
+            response,
+            location,
+            day=day,
+            time=time,
+            temperature_high=temperature(row.get('temp')),
+            temperature_low=temperature(row.get('templow', row.get('temp'))),
+            weather_condition=str(row.get('desc') or 'N/A'),
+            wind_speed='N/A' if wind is None else ('No wind' if not wind else f"{_number(wind)} {speed_unit}"),
+            humidity='N/A' if row.get('hum') is None else f"{_number(row['hum'])}%",
+            pressure='N/A' if row.get('baro') is None else f"{_number(row['baro'])} {pressure_unit}",
+            visibility='N/A' if row.get('vis') is None else f"{_number(row['vis'])} {distance_unit}",
+        )
+
+    def parse_table(self, response, location):
+        """Rows of the static observations table of a single day."""
+        day = response.meta.get('day')
+        found = 0
+        for row in response.css('table#wt-his tr'):
+            heading = ' '.join(row.css('th ::text').getall())
+            time = clock_time(heading)
+            if time is None:
+                continue
+            cells = [' '.join(' '.join(cell.css('::text').getall()).split()) for cell in row.css('td')]
+            text = ' | '.join(cells)
+            # Only the first row of a day carries its date ("Tue, 1 Dec")
+            match = _DAY_MONTH.search(heading)
+            if match:
+                day = int(match.group(2))
+            if day is None:
+                continue
+
+            temperature = _TEMPERATURE.search(text)
+            if temperature is None:
+                temperature_text = 'N/A'
+            elif temperature.group(2) == 'C':
+                temperature_text = temperature.group(1)
+            else:
+                temperature_text = f"{temperature.group(1)} °F"
+            # Cells: icon, temperature, condition, wind, direction, humidity, pressure, visibility
+            condition = cells[2] if len(cells) > 2 and cells[2] else 'N/A'
+            wind_cell = cells[3] if len(cells) > 3 else ''
+            speed = _SPEED.search(wind_cell)
+            humidity = _HUMIDITY.search(text)
+            pressure = _PRESSURE.search(text)
+            visibility = _DISTANCE.search(cells[-1]) if cells else None
+            found += 1
+            yield self.make_item(
+                response,
+                location,
+                day=day,
+                time=time,
+                temperature_high=temperature_text,
+                temperature_low=temperature_text,
+                weather_condition=condition,
+                wind_speed=f"{speed.group(1)} {speed.group(2)}" if speed else (wind_cell or 'N/A'),
+                humidity=f"{humidity.group(1)}%" if humidity else 'N/A',
+                pressure=f"{pressure.group(1)} {pressure.group(2)}" if pressure else 'N/A',
+                visibility=f"{visibility.group(1)} {visibility.group(2)}" if visibility else 'N/A',
+            )
+        if not found:
+            self.logger.warning(f"No weather observations found in {response.url}")
+
+    def make_item(self, response, location, day, time, **fields):
+        month_name = calendar.month_abbr[int(self.month)]
+        return WeatherDataItem(
+            unique_id=f"{self.location}_{self.year}_{self.month}_{day}_{time.replace(':', '')}",
+            date=f"{day} {month_name}",
+            time=time,
+            day_number=str(day),
+            location=location,
+            month=self.month,
+            year=self.year,
+            url=response.url,
+            scraped_at=datetime.now().isoformat(),
+            **fields,
+        )
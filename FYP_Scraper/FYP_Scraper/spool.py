@@ -0,0 +1,92 @@
+# FYP_Scraper/FYP_Scraper/spool.py
+
+import os
+import sqlite3
+import threading
+import time
+
+
+class ItemSpool:
+    """
+    Durable local queue of documents waiting to be written to MongoDB.
+
+    Documents are appended (BSON-encoded, so dates survive) to a SQLite
+    table in WAL mode with synchronous=FULL, and committed in groups: every
+    `commit_every` appends or whenever commit() is called, so one fsync
+    covers many items. A document stays in the spool until delete() is
+    called for it after a successful write; whatever is left when the
+    process stops, crashes included, is read back by the next run.
+
+    Methods may be called from any thread (MongoDBPipeline runs them on its
+    write pool); a lock keeps them one at a time.
+    """
+
+    def __init__(self, path, commit_every=50):
+        self.path = path
+        self.commit_every = commit_every
+        self.db = None
+        self.uncommitted = 0
+        self.lock = threading.RLock()
+
+    def open(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self.db = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=FULL')
+        self.db.execute(
+            'CREATE TABLE IF NOT EXISTS spool ('
+            ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+            ' collection TEXT NOT NULL,'
+            ' document BLOB NOT NULL,'
+            ' spooled_at REAL NOT NULL)'
+        )
+        self.db.execute('BEGIN')
+
+    def append(self, collection_name, document):
+        # bson comes with pymongo, which is only imported where it is used
+        import bson
+
+        encoded = bson.encode(document)
+        with self.lock:
+            self.db.execute(
+                'INSERT INTO spool (collection, document, spooled_at) VALUES (?, ?, ?)',
+                (collection_name, encoded, time.time()),
+            )
+            self.uncommitted += 1
+            if self.uncommitted >= self.commit_every:
+                self.commit()
+
+    def commit(self):
+        with self.lock:
+            if self.uncommitted:
+                self.db.execute('COMMIT')
+                self.db.execute('BEGIN')
+                self.uncommitted = 0
+
+    def peek(self, limit):
+        """Return up to limit (id, collection, document) of the oldest entries."""
+        import bson
+        from bson.codec_options import CodecOptions
+
+        with self.lock:
+            rows = self.db.execute(
+                'SELECT id, collection, document FROM spool ORDER BY id LIMIT ?', (limit,)
+            ).fetchall()
+        options = CodecOptions(tz_aware=True)
+        return [(row_id, collection, bson.decode(document, options)) for row_id, collection, document in rows]
+
+    def delete(self, ids):
+        with self.lock:
+            self.db.executemany('DELETE FROM spool WHERE id = ?', [(row_id,) for row_id in ids])
+            self.uncommitted += 1
+            self.commit()
+
+    def __len__(self):
+        with self.lock:
+            return self.db.execute('SELECT COUNT(*) FROM spool').fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.db.execute('COMMIT')
+            self.db.close()
+            self.db = None
@@ -0,0 +1,256 @@
+# FYP_Scraper/FYP_Scraper/stories.py
+"""
+Near-duplicate story detection across sources.
+
+The same incident is usually reported by several of the sites, each copy
+stored in its own {source}_raw collection. StoryIndex gives every article a
+story cluster id so downstream processing can treat the copies as one
+story:
+
+- the title and content are normalised (diacritics, tatweel and Arabic
+  letter variants folded, Urdu digits turned into ASCII) and split into
+  overlapping word shingles, hashed from the words' crc32 values;
+- a MinHash signature of `bands * rows` values is computed with numpy;
+- each band of the signature is hashed into one 64-bit key (LSH). Two
+  articles whose shingle sets have a Jaccard similarity of about
+  (1 / bands) ** (1 / rows) or more (0.55 with 20 bands of 5 rows) share
+  at least one band key with high probability.
+
+The band keys live in a SQLite file (WAL mode), so nothing is loaded at
+startup: each article costs one indexed lookup for its band keys and the
+index grows run after run. An article joins the oldest cluster any of its
+band keys point to; clusters are never merged afterwards.
+
+A cluster's id is a 63-bit hash of the url of the article that started
+it, not a counter kept in the file. Ids are therefore the same wherever
+the index is built: losing the file (a fresh CI runner, an evicted
+cache) only costs matches against older articles, and can never hand out
+an id that already belongs to a different story in MongoDB.
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+import numpy as np
+
+_VARIANTS = {
+    '\u064a': '\u06cc', '\u0649': '\u06cc',  # Arabic yeh, alef maksura -> Farsi yeh
+    '\u0643': '\u06a9',  # Arabic kaf -> keheh
+    '\u0647': '\u06c1', '\u06c3': '\u06c1', '\u0629': '\u06c1',  # heh, teh marbuta -> heh goal
+    **{chr(0x06F0 + digit): str(digit) for digit in range(10)},
+    **{chr(0x0660 + digit): str(digit) for digit in range(10)},
+}
+# Tatweel and the Arabic diacritics (harakat, superscript alef, Quranic
+# marks) are dropped; any other punctuation separates words
+_VARIANTS.update((chr(code), '') for code in [0x0640, 0x0670, *range(0x064B, 0x0660), *range(0x06D6, 0x06EE)])
+# One regex pass finds everything to replace: much cheaper than
+# str.translate or a \w+ tokenizer over a whole article
+_NORMALIZE = re.compile('[^\\w\\s]|[' + ''.join(_VARIANTS) + ']')
+
+# Multipliers combining the hashes of consecutive words into a shingle hash
+_SHINGLE_MIX = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0x27D4EB2F165667C5], dtype=np.uint64)
+
+
+def cluster_id_of(url):
+    """Id of the cluster started by the article at url (fits a signed 64-bit int)."""
+    return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'big') >> 1
+
+
+def normalize(text):
+    """Fold the spelling variants the sites use for the same Urdu words."""
+    return _NORMALIZE.sub(lambda match: _VARIANTS.get(match.group(0), ' '), text).lower()
+
+
+def shingles(text, size=3):
+    """
+    Return the distinct 64-bit hashes of the word `size`-grams of text.
+
+    Each word is hashed once with crc32 and the hashes of `size`
+    consecutive words are mixed with numpy, instead of hashing every
+    joined n-gram string.
+    """
+    words = normalize(text).split()
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+    cache = {}
+    hashes = np.fromiter(
+        (cache[word] if word in cache else cache.setdefault(word, zlib.crc32(word.encode('utf-8'))) for word in words),
+        dtype=np.uint64, count=len(words),
+    )
+    size = min(size, len(hashes), len(_SHINGLE_MIX))
+    count = len(hashes) - size + 1
+    grams = np.zeros(count, dtype=np.uint64)
+    for position in range(size):
+        grams += hashes[position:position + count] * _SHINGLE_MIX[position]
+    return np.unique(grams)
+
+
+class MinHasher:
+    """MinHash signatures and LSH band keys for texts."""
+
+    def __init__(self, bands=20, rows=5, shingle_size=3, seed=1):
+        self.bands = bands
+        self.rows = rows
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        num_perm = bands * rows
+        # Multiply-shift hash functions h(x) = (a * x + b) >> 32 with odd a,
+        # in wrapping 64-bit arithmetic (no modulo, which numpy does slowly)
+        self.a = rng.integers(1, 1 << 63, size=(num_perm, 1), dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 1 << 63, size=(num_perm, 1), dtype=np.uint64)
+        # Per-row multipliers that mix a band's values into one key
+        self.mix = rng.integers(1, 1 << 63, size=(bands, rows), dtype=np.uint64) | np.uint64(1)
+        self.band_salt = rng.integers(0, 1 << 63, size=bands, dtype=np.uint64)
+
+    def signature(self, text):
+        """Return the MinHash signature of text, or None when it has no words."""
+        hashes = shingles(text, self.shingle_size)
+        if not hashes.size:
+            return None
+        values = self.a * hashes  # (num_perm, shingles), updated in place
+        values += self.b
+        values >>= np.uint64(32)
+        return values.min(axis=1)
+
+    def band_keys(self, signature):
+        """Return one signed 64-bit key per band (wrapping arithmetic is intended)."""
+        bands = signature.reshape(self.bands, self.rows)
+        keys = (bands * self.mix).sum(axis=1, dtype=np.uint64) ^ self.band_salt
+        return keys.view(np.int64).tolist()
+
+    def params(self):
+        return {'bands': self.bands, 'rows': self.rows, 'shingle_size': self.shingle_size}
+
+
+class StoryIndex:
+    """
+    Persistent LSH index assigning story cluster ids to articles.
+
+    Tables:
+        stories(url, cluster_id, source)      articles already assigned
+        bands(band_key, cluster_id, created)  first cluster seen with a band
+                                              key and when it was started (ns)
+        meta(key, value)                      MinHash parameters, seed and id
+                                              scheme; a file built with other
+                                              ones is rejected
+
+    Writes are committed every `commit_every` new articles and on close().
+    One instance is shared by every crawler using the same file, see
+    get_index().
+    """
+
+    def __init__(self, path, bands=20, rows=5, shingle_size=3, seed=1, commit_every=500, cache_mb=64):
+        self.path = path
+        self.hasher = MinHasher(bands=bands, rows=rows, shingle_size=shingle_size, seed=seed)
+        self.seed = seed
+        self.commit_every = commit_every
+        self.cache_mb = cache_mb
+        self.db = None
+        self.uncommitted = 0
+
+    def open(self):
+        self.db = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.execute(f'PRAGMA cache_size=-{self.cache_mb * 1024}')
+        self.db.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        self.db.execute(
+            'CREATE TABLE IF NOT EXISTS stories ('
+            ' url TEXT PRIMARY KEY,'
+            ' cluster_id INTEGER NOT NULL,'
+            ' source TEXT) WITHOUT ROWID'
+        )
+        self.db.execute(
+            'CREATE TABLE IF NOT EXISTS bands ('
+            ' band_key INTEGER PRIMARY KEY,'
+            ' cluster_id INTEGER NOT NULL,'
+            ' created INTEGER NOT NULL)'
+        )
+        params = {**self.hasher.params(), 'seed': self.seed, 'cluster_ids': 'url_hash'}
+        stored = dict(self.db.execute('SELECT key, value FROM meta'))
+        if not stored:
+            self.db.executemany('INSERT INTO meta VALUES (?, ?)', [(key, str(value)) for key, value in params.items()])
+        elif stored != {key: str(value) for key, value in params.items()}:
+            self.db.close()
+            raise ValueError(f"{self.path} was built with {stored}, not {params}")
+        self.db.execute('BEGIN')
+
+    def assign(self, url, text, source=None):
+        """
+        Return (cluster_id, duplicate) for an article, or (None, False) when
+        its text has no words. `duplicate` is True when the article joined a
+        cluster that already held another one.
+        """
+        row = self.db.execute('SELECT cluster_id FROM stories WHERE url = ?', (url,)).fetchone()
+        if row:
+            return row[0], False
+
+        signature = self.hasher.signature(text)
+        if signature is None:
+            return None, False
+        keys = self.hasher.band_keys(signature)
+        placeholders = ','.join('?' * len(keys))
+        found = self.db.execute(
+            f'SELECT cluster_id, created FROM bands WHERE band_key IN ({placeholders}) ORDER BY created LIMIT 1', keys
+        ).fetchone()
+        if found is None:
+            cluster_id, created = cluster_id_of(url), time.time_ns()
+        else:
+            cluster_id, created = found
+
+        self.db.executemany(
+            'INSERT OR IGNORE INTO bands VALUES (?, ?, ?)', [(key, cluster_id, created) for key in keys]
+        )
+        self.db.execute('INSERT INTO stories VALUES (?, ?, ?)', (url, cluster_id, source))
+        self.uncommitted += 1
+        if self.uncommitted >= self.commit_every:
+            self.commit()
+        return cluster_id, found is not None
+
+    def commit(self):
+        self.db.execute('COMMIT')
+        self.db.execute('BEGIN')
+        self.uncommitted = 0
+
+    def size(self):
+        return self.db.execute('SELECT COUNT(*) FROM stories').fetchone()[0]
+
+    def close(self):
+        self.db.execute('COMMIT')
+        self.db.close()
+        self.db = None
+
+
+# One open index per file for the whole process: SQLite allows a single
+# writer, and the runner starts several crawlers at once
+_indexes = {}  # path -> [index, reference count]
+_indexes_lock = threading.Lock()
+
+
+def get_index(path, **kwargs):
+    """Return the process-wide StoryIndex for path; pair with release_index()."""
+    with _indexes_lock:
+        entry = _indexes.get(path)
+        if entry is None:
+            index = StoryIndex(path, **kwargs)
+            index.open()
+            entry = _indexes[path] = [index, 0]
+        entry[1] += 1
+        return entry[0]
+
+
+def release_index(index):
+    """Drop one reference to a shared index, closing it with the last one."""
+    with _indexes_lock:
+        entry = _indexes.get(index.path)
+        if entry is None or entry[0] is not index:
+            index.close()
+            return
+        entry[1] -= 1
+        if entry[1] <= 0:
+            del _indexes[index.path]
+            index.close()
@@ -0,0 +1,160 @@
+# FYP_Scraper/FYP_Scraper/throttle.py
+
+import time
+from collections import deque
+
+
+class SlotLimits:
+    """Current limits and latency averages of one download slot (domain)."""
+
+    def __init__(self, concurrency, delay):
+        self.concurrency = float(concurrency)
+        self.delay = float(delay)
+        self.fast_latency = {}  # route (proxy or "direct") -> short EWMA
+        self.slow_latency = {}  # route -> long EWMA, the route's usual latency
+        self.samples = {}
+        self.last_backoff = float('-inf')
+        self.backoffs = 0
+
+
+class AIMDController:
+    """
+    Additive-increase/multiplicative-decrease limits per download slot.
+
+    Every healthy response raises a slot's concurrency by
+    concurrency_step / concurrency (about one more request in flight per
+    round of responses) and its request rate (1 / delay) by rate_step
+    requests per second, up to 1 / min_delay. A backoff (429/403/5xx, a
+    timeout, or latency rising above latency_factor times its usual level)
+    multiplies both by backoff_factor, honouring Retry-After. Working on
+    the rate rather than the delay lets a slot that backed off to a long
+    delay recover in a few responses instead of crawling back a fixed step
+    at a time. Responses to requests sent before the last backoff are
+    ignored, so one burst of errors from requests already in flight backs
+    off once, not once per request.
+
+    Latency is averaged per route: a slow proxy is compared with its own
+    history, not with direct requests to the same site.
+    """
+
+    def __init__(self, min_concurrency=1, max_concurrency=16, min_delay=0.25, max_delay=60,
+                 concurrency_step=1.0, rate_step=0.05, backoff_factor=0.5, latency_factor=2.0,
+                 fast_alpha=0.3, slow_alpha=0.05, warmup=5, clock=time.monotonic):
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.min_delay = max(min_delay, 0.01)  # keeps the rate finite
+        self.max_delay = max_delay
+        self.concurrency_step = concurrency_step
+        self.rate_step = rate_step
+        self.backoff_factor = backoff_factor
+        self.latency_factor = latency_factor
+        self.fast_alpha = fast_alpha
+        self.slow_alpha = slow_alpha
+        self.warmup = warmup
+        self.clock = clock
+        self.slots = {}
+
+    def limits(self, key, concurrency, delay):
+        """Return the limits of a slot, starting from its configured values."""
+        limits = self.slots.get(key)
+        if limits is None:
+            limits = self.slots[key] = SlotLimits(
+                min(max(concurrency, self.min_concurrency), self.max_concurrency),
+                min(max(delay, self.min_delay), self.max_delay),
+            )
+        return limits
+
+    def record_success(self, key, route, latency, sent_at):
+        """
+        Record a healthy response; returns "latency" if its latency triggered
+        a backoff, otherwise None.
+        """
+        limits = self.slots[key]
+        if sent_at < limits.last_backoff:
+            return None
+        if latency is not None:
+            fast = limits.fast_latency.get(route, latency)
+            slow = limits.slow_latency.get(route, latency)
+            limits.fast_latency[route] = fast = fast + self.fast_alpha * (latency - fast)
+            limits.slow_latency[route] = slow = slow + self.slow_alpha * (latency - slow)
+            limits.samples[route] = samples = limits.samples.get(route, 0) + 1
+            if samples >= self.warmup and fast > slow * self.latency_factor:
+                # Start the short average over, so the next backoff needs
+                # several slow responses again
+                limits.fast_latency[route] = slow
+                self.back_off(limits)
+                return 'latency'
+        limits.concurrency = min(limits.concurrency + self.concurrency_step / limits.concurrency, self.max_concurrency)
+        limits.delay = max(1 / (1 / limits.delay + self.rate_step), self.min_delay)
+        return None
+
+    def record_failure(self, key, sent_at, retry_after=None):
+        """Record a response or error that calls for a backoff; returns True if it backed off."""
+        limits = self.slots[key]
+        if sent_at < limits.last_backoff:
+            return False
+        self.back_off(limits, retry_after)
+        return True
+
+    def back_off(self, limits, retry_after=None):
+        limits.concurrency = max(limits.concurrency * self.backoff_factor, self.min_concurrency)
+        delay = limits.delay / self.backoff_factor
+        if retry_after:
+            delay = max(delay, retry_after)
+        limits.delay = min(delay, self.max_delay)
+        limits.last_backoff = self.clock()
+        limits.backoffs += 1
+
+
+class CircuitBreaker:
+    """
+    Pauses a domain whose recent requests mostly fail.
+
+    The last `window` outcomes of each domain are kept; once at least
+    `min_requests` are in and the share of errors reaches `threshold`, the
+    breaker trips and the domain is paused for `cooldown` seconds, doubling
+    on every trip in a row up to `max_cooldown`. After a pause the outcomes
+    start over; a full window below the threshold resets the doubling.
+    Outcomes arriving while a domain is paused (requests that were already
+    in flight) are ignored.
+    """
+
+    def __init__(self, window=20, min_requests=10, threshold=0.5, cooldown=60, max_cooldown=900,
+                 clock=time.monotonic):
+        self.window = window
+        self.min_requests = min(min_requests, window)
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.clock = clock
+        self.outcomes = {}  # key -> deque of True (error) / False
+        self.paused_until = {}
+        self.trips = {}
+
+    def paused_for(self, key):
+        """Seconds left in the domain's pause, or 0."""
+        return max(self.paused_until.get(key, 0.0) - self.clock(), 0.0)
+
+    def record(self, key, error):
+        """Record one outcome; returns the pause in seconds if it tripped the breaker."""
+        if self.paused_for(key):
+            return None
+        outcomes = self.outcomes.get(key)
+        if outcomes is None:
+            outcomes = self.outcomes[key] = deque(maxlen=self.window)
+        outcomes.append(error)
+        errors = sum(outcomes)
+        if len(outcomes) >= self.min_requests and errors >= self.threshold * len(outcomes):
+            trips = self.trips.get(key, 0)
+            pause = min(self.cooldown * 2 ** trips, self.max_cooldown)
+            self.paused_until[key] = self.clock() + pause
+            self.trips[key] = trips + 1
+            outcomes.clear()
+            return pause
+        if len(outcomes) == self.window:
+            self.trips.pop(key, None)
+        return None
+
+    def error_rate(self, key):
+        outcomes = self.outcomes.get(key)
+        return sum(outcomes) / len(outcomes) if outcomes else 0.0
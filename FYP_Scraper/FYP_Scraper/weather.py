@@ -0,0 +1,149 @@
+# FYP_Scraper/FYP_Scraper/weather.py
+"""
+Typed weather observations for WeatherMongoDBPipeline.
+
+The weather spiders keep timeanddate.com's text ("18 °C", "65%",
+"1017 mbar", "7 km/h", "No wind", "N/A"). observation() turns a scraped
+row into the document stored in the weather time-series collection:
+numbers in fixed units (°C, %, hPa, km/h, km), a UTC `timestamp` built
+from year, month, day_number and the local time of the row, and
+`location` as the series key. Values that are missing or unreadable are
+left out rather than stored as strings.
+
+Observation times are local to the location. The crawled locations are
+all in Pakistan, so they are read as PKT.
+"""
+
+from datetime import datetime, timezone
+import re
+
+from FYP_Scraper.dates import PKT, TIME_FORMATS
+
+_NUMBER = r'([-−]?\d+(?:\.\d+)?)'
+_TEMPERATURE = re.compile(_NUMBER + r'\s*°?\s*([CF])?\b', re.IGNORECASE)
+_PERCENT = re.compile(_NUMBER + r'\s*(%)?')
+_PRESSURE = re.compile(_NUMBER + r'\s*(mbar|hPa|inHg|mmHg)?', re.IGNORECASE)
+_SPEED = re.compile(_NUMBER + r'\s*(km/h|mph|m/s|kt|knots)?', re.IGNORECASE)
+_DISTANCE = re.compile(_NUMBER + r'\s*(km|mi)?\b', re.IGNORECASE)
+
+# Factors to the stored unit; a value without a unit is taken to be in it
+PRESSURE_TO_HPA = {'mbar': 1.0, 'hpa': 1.0, 'inhg': 33.8639, 'mmhg': 1.33322}
+SPEED_TO_KMH = {'km/h': 1.0, 'mph': 1.609344, 'm/s': 3.6, 'kt': 1.852, 'knots': 1.852}
+DISTANCE_TO_KM = {'km': 1.0, 'mi': 1.609344}
+
+
+def _match(pattern, text):
+    if text is None:
+        return None
+    match = pattern.search(str(text))
+    if not match:
+        return None
+    return float(match.group(1).replace('−', '-')), (match.group(2) or '').lower()
+
+
+def temperature_c(text):
+    parsed = _match(_TEMPERATURE, text)
+    if parsed is None:
+        return None
+    value, unit = parsed
+    if unit == 'f':
+        value = (value - 32) * 5 / 9
+    return round(value, 1)
+
+
+def humidity_pct(text):
+    parsed = _match(_PERCENT, text)
+    return parsed[0] if parsed else None
+
+
+def pressure_hpa(text):
+    parsed = _match(_PRESSURE, text)
+    if parsed is None:
+        return None
+    value, unit = parsed
+    return round(value * PRESSURE_TO_HPA.get(unit, 1.0), 1)
+
+
+def wind_speed_kmh(text):
+    if text is not None and str(text).strip().lower() in ('no wind', 'calm'):
+        return 0.0
+    parsed = _match(_SPEED, text)
+    if parsed is None:
+        return None
+    value, unit = parsed
+    return round(value * SPEED_TO_KMH.get(unit, 1.0), 1)
+
+
+def visibility_km(text):
+    parsed = _match(_DISTANCE, text)
+    if parsed is None:
+        return None
+    value, unit = parsed
+    return round(value * DISTANCE_TO_KM.get(unit, 1.0), 1)
+
+
+def _int(value):
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def observed_at(year, month, day, time_text):
+    """UTC instant of a row: its date plus its local time ("14:30", "2:30 pm")."""
+    year, month, day = _int(year), _int(month), _int(day)
+    if None in (year, month, day) or not time_text:
+        return None
+    text = ' '.join(str(time_text).split())
+    for time_format in TIME_FORMATS:
+        try:
+            parsed = datetime.strptime(text, time_format)
+        except ValueError:
+            continue
+        try:
+            local = datetime(year, month, day, parsed.hour, parsed.minute, tzinfo=PKT)
+        except ValueError:  # no such day
+            return None
+        return local.astimezone(timezone.utc)
+    return None
+
+
+def _scraped_at(value):
+    if isinstance(value, datetime):
+        scraped = value
+    else:
+        try:
+            scraped = datetime.fromisoformat(str(value))
+        except ValueError:
+            return None
+    # A naive time is the scraping machine's local time
+    return scraped.astimezone(timezone.utc)
+
+
+def observation(row):
+    """
+    Return the time-series document of a scraped weather row (a dict), or
+    None when it has no usable timestamp.
+    """
+    timestamp = observed_at(row.get('year'), row.get('month'), row.get('day_number'), row.get('time'))
+    if timestamp is None:
+        return None
+    condition = (row.get('weather_condition') or '').strip()
+    document = {
+        'timestamp': timestamp,
+        'location': row.get('location'),
+        'unique_id': row.get('unique_id'),
+        'temperature_high_c': temperature_c(row.get('temperature_high')),
+        'temperature_low_c': temperature_c(row.get('temperature_low')),
+        'humidity_pct': humidity_pct(row.get('humidity')),
+        'wind_speed_kmh': wind_speed_kmh(row.get('wind_speed')),
+        'pressure_hpa': pressure_hpa(row.get('pressure')),
+        'visibility_km': visibility_km(row.get('visibility')),
+        'weather_condition': condition if condition and condition != 'N/A' else None,
+        'year': _int(row.get('year')),
+        'month': _int(row.get('month')),
+        'day_number': _int(row.get('day_number')),
+        'url': row.get('url'),
+        'scraped_at': _scraped_at(row['scraped_at']) if row.get('scraped_at') else None,
+    }
+    return {key: value for key, value in document.items() if value is not None}
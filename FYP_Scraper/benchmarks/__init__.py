@@ -0,0 +1,5 @@
+# Offline benchmarks for the FYP_Scraper project.
+#
+# Run them from the FYP_Scraper directory (next to scrapy.cfg), e.g.
+#
+#     python -m benchmarks.bench_mongo_bulk
@@ -0,0 +1,71 @@
+"""
+Per-article cost of extracting a Dunya News article body.
+
+Compares the old parse_news content filter (one XPath contains() query per
+paragraph plus a regex over the .installApp paragraphs) with the single-pass
+ParagraphExtractor on synthetic Dunya article pages of increasing length:
+
+    python -m benchmarks.bench_dunya_extract
+    python -m benchmarks.bench_dunya_extract --paragraphs 20 80 320 --number 20
+"""
+
+import argparse
+import random
+import timeit
+
+from scrapy.http import HtmlResponse
+from w3lib.html import remove_tags
+
+from FYP_Scraper.spiders.dunya_news import DunyaNewsSpider
+
+WORDS = (
+    "پولیس کے مطابق ملزمان نے شہری کو اسلحے کے زور پر لوٹ لیا اور موقع سے فرار ہو گئے "
+    "واقعے کا مقدمہ درج کر کے تفتیش شروع کر دی گئی ہے جبکہ علاقے میں ناکہ بندی کر دی گئی"
+).split()
+
+
+def make_page(rng, paragraphs):
+    body = ['<p class="border p-3 text-primary shadow-sm my-2">خلاصہ: ' + " ".join(rng.choices(WORDS, k=25)) + '</p>']
+    for index in range(paragraphs):
+        # Unique text per paragraph, as in a real article
+        body.append(f"<p>{index} " + " ".join(rng.choices(WORDS, k=40)) + "</p>")
+        if index == paragraphs // 2:
+            body.append('<div class="installApp"><p>دنیا نیوز کی ایپ ڈاؤن لوڈ کریں</p></div>')
+    html = (
+        '<html><body><h2 class="taza-tareen-story-title">عنوان</h2>'
+        f'<article>{"".join(body)}</article></body></html>'
+    )
+    return HtmlResponse(url="https://dunya.com.pk/index.php/crime/1", body=html.encode("utf-8"), encoding="utf-8")
+
+
+def old_content(response):
+    content_elements = response.css("article > p, article p.border.p-3.text-primary.shadow-sm.my-2").getall()
+    content_elements = [c for c in content_elements if not response.css("article .installApp p").re(response.xpath(f"//p[contains(., '{remove_tags(c)}')]").get())]
+    return " ".join(remove_tags(c).strip() for c in content_elements if c)
+
+
+def new_content(response):
+    return DunyaNewsSpider.content_extractor.extract(response)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--paragraphs', type=int, nargs='+', default=[10, 40, 160, 640])
+    parser.add_argument('--number', type=int, default=10, help="Parses per timing")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    print(f"{'paragraphs':>10}{'old (ms)':>12}{'new (ms)':>12}{'speedup':>10}")
+    for paragraphs in args.paragraphs:
+        response = make_page(rng, paragraphs)
+        # Each timing gets a fresh response so selector caches do not carry over
+        responses = [HtmlResponse(url=response.url, body=response.body, encoding="utf-8") for _ in range(2 * args.number)]
+        old = iter(responses[:args.number])
+        new = iter(responses[args.number:])
+        old_time = timeit.timeit(lambda: old_content(next(old)), number=args.number) / args.number
+        new_time = timeit.timeit(lambda: new_content(next(new)), number=args.number) / args.number
+        print(f"{paragraphs:>10}{old_time * 1000:>12.2f}{new_time * 1000:>12.2f}{old_time / new_time:>9.0f}x")
+
+
+if __name__ == '__main__':
+    main()
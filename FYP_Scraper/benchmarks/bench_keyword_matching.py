@@ -0,0 +1,104 @@
+"""
+Microbenchmark for UrduPoint article filtering.
+
+Compares the old three any() passes of substring checks (category keywords,
+geopolitical terms, Pakistani locations, each over title and content) with
+KeywordMatcher's single scan, using the spider's real keyword lists on
+synthetic Urdu crime reports of typical and long length:
+
+    python -m benchmarks.bench_keyword_matching
+"""
+
+import argparse
+import random
+import timeit
+
+from FYP_Scraper import matching
+from FYP_Scraper.matching import KeywordMatcher
+from FYP_Scraper.spiders.UrduPoint import UrduPointMultiCategorySpider
+
+SENTENCES = [
+    "پولیس کے مطابق واقعہ رات گئے پیش آیا جب نامعلوم افراد موٹر سائیکل پر سوار ہو کر آئے۔",
+    "اہل علاقہ نے بتایا کہ فائرنگ کی آواز سن کر لوگ گھروں سے باہر نکل آئے۔",
+    "مقتول کی لاش پوسٹ مارٹم کے لیے ہسپتال منتقل کر دی گئی ہے۔",
+    "ایس ایچ او نے کہا کہ مقدمہ درج کر کے تفتیش شروع کر دی گئی ہے اور جلد ملزمان کو گرفتار کر لیا جائے گا۔",
+    "ورثاء نے مطالبہ کیا ہے کہ واقعے میں ملوث افراد کو قرار واقعی سزا دی جائے۔",
+    "ابتدائی تحقیقات کے مطابق معاملہ پرانی دشمنی کا شاخسانہ معلوم ہوتا ہے۔",
+    "علاقے میں خوف و ہراس پھیل گیا اور شہریوں نے سیکیورٹی بڑھانے کا مطالبہ کیا۔",
+    "پولیس نے جائے وقوعہ سے شواہد اکٹھے کر لیے ہیں اور سی سی ٹی وی فوٹیج حاصل کی جا رہی ہے۔",
+]
+
+
+def make_article(rng, sentences, location, keyword):
+    body = [rng.choice(SENTENCES) for _ in range(sentences)]
+    # Put the hits near the end, where the old any() passes find them last
+    body.insert(len(body) - 2, f"یہ واقعہ {location} کے نواحی علاقے میں {keyword} کی واردات کے دوران پیش آیا۔")
+    title = f"{location} میں {keyword} کی واردات، ملزم فرار"
+    return title, " ".join(body)
+
+
+def old_filter(spider, keywords, title, content):
+    if not any(k in title or k in content for k in keywords):
+        return False
+    if any(k in title or k in content for k in spider.geopolitical_keywords):
+        return False
+    if not any(loc in title or loc in content for loc in spider.pakistan_locations):
+        return False
+    return True
+
+
+def new_filter(matcher, category, title, content):
+    hits = matcher.find(f"{title}\n{content}")
+    return category in hits and "geopolitical" not in hits and "location" in hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--articles', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    spider = UrduPointMultiCategorySpider(selected_category="all")
+    category = spider.categories[0]
+    patterns = {
+        **{cat["name"]: cat["keywords"] for cat in spider.categories},
+        "geopolitical": spider.geopolitical_keywords,
+        "location": spider.pakistan_locations,
+    }
+    matchers = {}
+    if matching.ahocorasick is not None:
+        matchers["automaton (pyahocorasick)"] = KeywordMatcher(patterns)
+    backend, matching.ahocorasick = matching.ahocorasick, None
+    matchers["automaton (pure Python)"] = KeywordMatcher(patterns)
+    matching.ahocorasick = backend
+
+    rng = random.Random(42)
+    for label, sentences in (("typical", 12), ("long", 60)):
+        articles = [
+            make_article(rng, sentences, rng.choice(spider.pakistan_locations[-20:]), category["keywords"][-1])
+            for _ in range(args.articles)
+        ]
+        average = sum(len(title) + len(content) for title, content in articles) / len(articles)
+        print(f"{label} articles: {args.articles} x ~{average:.0f} chars")
+
+        def run_old():
+            return [old_filter(spider, category["keywords"], title, content) for title, content in articles]
+
+        expected = run_old()
+        timings = {"any() passes (old)": min(timeit.repeat(run_old, number=1, repeat=args.repeat))}
+        for name, matcher in matchers.items():
+            def run_new(matcher=matcher):
+                return [new_filter(matcher, category["name"], title, content) for title, content in articles]
+
+            assert run_new() == expected, f"{name} disagrees with the old filter"
+            timings[name] = min(timeit.repeat(run_new, number=1, repeat=args.repeat))
+
+        baseline = timings["any() passes (old)"]
+        for name, elapsed in timings.items():
+            per_article = elapsed / args.articles * 1e6
+            print(f"  {name:<28}{per_article:10.1f} us/article  {baseline / elapsed:6.2f}x")
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+"""
+Benchmark MongoDBPipeline's per-item upserts against bulk-write mode.
+
+Each mode writes a batch of new articles, then re-crawls the same URLs with
+--edited of them changed: unchanged articles are skipped by their
+content_hash, edited ones are rewritten with a revision entry.
+
+By default the pipeline talks to a mongomock stand-in that sleeps for a
+simulated network round-trip on every call, which is what dominates writes to
+Atlas. Pass --uri to run against a real local mongod instead:
+
+    python -m benchmarks.bench_mongo_bulk --items 2000 --latency-ms 40
+    python -m benchmarks.bench_mongo_bulk --uri mongodb://localhost:27017
+"""
+
+import argparse
+import logging
+import time
+
+import pymongo
+import scrapy
+from twisted.internet import defer, task
+
+from FYP_Scraper.items import NewsArticleItem
+from FYP_Scraper.pipelines import MongoDBPipeline
+
+
+class LatencyCollection:
+    """mongomock collection wrapper charging one round-trip per call."""
+
+    def __init__(self, collection, latency):
+        self.collection = collection
+        self.latency = latency
+
+    def create_index(self, *args, **kwargs):
+        time.sleep(self.latency)
+        return self.collection.create_index(*args, **kwargs)
+
+    def find(self, *args, **kwargs):
+        time.sleep(self.latency)
+        return list(self.collection.find(*args, **kwargs))
+
+    def update_one(self, *args, **kwargs):
+        time.sleep(self.latency)
+        return self.collection.update_one(*args, **kwargs)
+
+    def bulk_write(self, requests, ordered=True):
+        # mongomock's bulk_write does not accept operations built by
+        # pymongo>=4.11, so apply them one by one while still charging a
+        # single round-trip for the whole batch like a real server would
+        time.sleep(self.latency)
+        upserted_ids = {}
+        for index, request in enumerate(requests):
+            result = self.collection.update_one(request._filter, request._doc, upsert=request._upsert)
+            if result.upserted_id is not None:
+                upserted_ids[index] = result.upserted_id
+        return BulkResult(upserted_ids)
+
+
+class BulkResult:
+    def __init__(self, upserted_ids):
+        self.upserted_ids = upserted_ids
+
+
+class LatencyDatabase:
+    def __init__(self, database, latency):
+        self.database = database
+        self.latency = latency
+        self.collections = {}
+
+    def __getitem__(self, name):
+        if name not in self.collections:
+            self.collections[name] = LatencyCollection(self.database[name], self.latency)
+        return self.collections[name]
+
+
+class LatencyClient:
+    def __init__(self, latency):
+        import mongomock
+        self.client = mongomock.MongoClient()
+        self.latency = latency
+
+    def __getitem__(self, name):
+        return LatencyDatabase(self.client[name], self.latency)
+
+    def close(self):
+        self.client.close()
+
+
+class BenchmarkPipeline(MongoDBPipeline):
+    def __init__(self, uri, latency, client=None, **kwargs):
+        super().__init__(mongo_uri=uri or 'mongodb://localhost:27017', **kwargs)
+        self.use_real_server = bool(uri)
+        self.latency = latency
+        self.shared_client = client
+
+    def create_client(self):
+        # The re-crawl pass reuses the first pass's (mongomock) data
+        if self.shared_client is not None:
+            return self.shared_client
+        if self.use_real_server:
+            return pymongo.MongoClient(self.mongo_uri)
+        return LatencyClient(self.latency)
+
+
+class CountingStats:
+    def __init__(self):
+        self.values = {}
+
+    def inc_value(self, key, count=1, start=0):
+        self.values[key] = self.values.get(key, start) + count
+
+
+def make_items(count, run_id, edited=0):
+    items = []
+    for i in range(count):
+        item = NewsArticleItem()
+        item['url'] = f"https://example.com/{run_id}/article/{i}"
+        item['title'] = f"خبر نمبر {i}"
+        item['content'] = "لاہور میں پولیس نے ملزم کو گرفتار کر لیا۔ " * 40
+        if i < edited:
+            item['content'] += " تازہ ترین اطلاعات کے مطابق ملزم کو عدالت میں پیش کر دیا گیا۔"
+        item['date'] = "01 Jan, 2025"
+        item['source'] = 'benchmark'
+        item['category'] = 'N/A'
+        item['reported_time'] = 'N/A'
+        items.append(item)
+    return items
+
+
+@defer.inlineCallbacks
+def run(mode, args, items, client=None):
+    stats = CountingStats()
+    pipeline = BenchmarkPipeline(
+        args.uri,
+        args.latency_ms / 1000,
+        client=client,
+        bulk_enabled=(mode == 'bulk'),
+        bulk_size=args.batch_size,
+        bulk_max_age=3600,
+        write_threads=args.threads,
+        max_pending_writes=args.max_pending,
+        stats=stats,
+    )
+    spider = scrapy.Spider(name='benchmark')
+
+    pipeline.open_spider(spider)
+    if args.uri:
+        pipeline.db = pipeline.client[args.database]
+    started = time.perf_counter()
+    results = [defer.maybeDeferred(pipeline.process_item, item, spider) for item in items]
+    # close_spider flushes whatever is still buffered in bulk mode
+    yield pipeline.close_spider(spider)
+    yield defer.DeferredList(results, consumeErrors=True)
+    elapsed = time.perf_counter() - started
+    return elapsed, stats.values, pipeline.client
+
+
+@defer.inlineCallbacks
+def main(reactor):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=1000)
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--latency-ms', type=float, default=20.0, help="Simulated round-trip for the mongomock stand-in")
+    parser.add_argument('--uri', help="Benchmark against this MongoDB server instead of mongomock")
+    parser.add_argument('--database', default='benchmark_db', help="Database used with --uri")
+    parser.add_argument('--threads', type=int, default=4, help="MONGODB_WRITE_THREADS (0 writes inline)")
+    parser.add_argument('--max-pending', type=int, default=16, help="MONGODB_MAX_PENDING_WRITES")
+    parser.add_argument('--edited', type=float, default=0.1, help="Fraction of articles changed on re-crawl")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    target = args.uri or f"mongomock with {args.latency_ms:g} ms simulated RTT"
+    print(f"Writing {args.items} items to {target} with {args.threads} write threads")
+    print("-" * 60)
+
+    results = {}
+    for mode in ('per-item', 'bulk'):
+        run_id = f"{mode}-{time.time_ns()}"
+        elapsed, stats, client = yield run(mode, args, make_items(args.items, run_id))
+        results[mode] = args.items / elapsed
+        print(f"{mode:>9}: {elapsed:8.2f}s  {results[mode]:10.1f} items/sec  {stats}")
+        recrawl = make_items(args.items, run_id, edited=int(args.items * args.edited))
+        elapsed, stats, _ = yield run(mode, args, recrawl, client=client if not args.uri else None)
+        print(f"{'re-crawl':>9}: {elapsed:8.2f}s  {args.items / elapsed:10.1f} items/sec  {stats}")
+
+    print("-" * 60)
+    print(f"Speed-up: {results['bulk'] / results['per-item']:.1f}x")
+
+
+if __name__ == '__main__':
+    task.react(main)
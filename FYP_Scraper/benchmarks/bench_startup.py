@@ -0,0 +1,123 @@
+"""
+Startup cost of each spider: how long the project takes to import, and how
+long a fresh `scrapy crawl` process takes to get its first request through
+the downloader middlewares.
+
+Every run is a new interpreter, like the cron job's crawl processes. The
+first request is answered locally by a probe middleware and the spider is
+closed right away, so nothing is downloaded. Mongo-backed components (item
+pipelines, the known-URL filter and the incremental stop controller) are
+switched off unless --with-mongo is given, since they need network access:
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 5 --spider city42 --spider dunya_news
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROBE = 'benchmarks.bench_startup.FirstRequestProbe'
+
+
+class FirstRequestProbe:
+    """Downloader middleware that times the first request and stops the crawl."""
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+        self.seen = False
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler)
+
+    def process_request(self, request, spider):
+        from scrapy.exceptions import IgnoreRequest
+
+        if not self.seen:
+            self.seen = True
+            started = float(os.environ['BENCH_STARTUP_T0'])
+            print(json.dumps({'first_request': time.time() - started}), flush=True)
+            self.crawler.engine.close_spider(spider, 'benchmark')
+        raise IgnoreRequest
+
+
+def child(spider_name, with_mongo):
+    """Run inside the measured process: import the project, crawl one request."""
+    started = time.perf_counter()
+    from scrapy.crawler import CrawlerProcess
+    from scrapy.utils.project import get_project_settings
+    from scrapy.spiderloader import SpiderLoader
+
+    import FYP_Scraper.extensions  # noqa: F401
+    import FYP_Scraper.middlewares  # noqa: F401
+    import FYP_Scraper.pipelines  # noqa: F401
+
+    settings = get_project_settings()
+    spider_cls = SpiderLoader.from_settings(settings).load(spider_name)
+    print(json.dumps({'import': time.perf_counter() - started}), flush=True)
+
+    settings.set('LOG_ENABLED', False, priority='cmdline')
+    # DOWNLOADER_MIDDLEWARES_BASE is merged with the project's and the
+    # spider's own DOWNLOADER_MIDDLEWARES, so the probe runs for every spider
+    base = settings.getdict('DOWNLOADER_MIDDLEWARES_BASE')
+    settings.set('DOWNLOADER_MIDDLEWARES_BASE', {**base, PROBE: 1000}, priority='cmdline')
+    if not with_mongo:
+        settings.set('ITEM_PIPELINES', {}, priority='cmdline')
+        settings.set('KNOWN_URLS_ENABLED', False, priority='cmdline')
+        settings.set('INCREMENTAL_STOP_ENABLED', False, priority='cmdline')
+
+    from FYP_Scraper.runner import select_crawls
+
+    kwargs = next((kwargs for _, name, kwargs in select_crawls(only=[spider_name])), {})
+    process = CrawlerProcess(settings)
+    process.crawl(spider_cls, **kwargs)
+    process.start()
+
+
+def measure(spider_name, with_mongo):
+    env = dict(os.environ, BENCH_STARTUP_T0=repr(time.time()))
+    command = [sys.executable, '-m', 'benchmarks.bench_startup', '--child', spider_name]
+    if with_mongo:
+        command.append('--with-mongo')
+    output = subprocess.run(command, env=env, capture_output=True, text=True, check=True).stdout
+    result = {}
+    for line in output.splitlines():
+        if line.startswith('{'):
+            result.update(json.loads(line))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--spider', action='append', help="Spider or runner label to measure (repeatable; default: every crawl the runner starts)")
+    parser.add_argument('--runs', type=int, default=3, help="Processes started per spider; the median is reported")
+    parser.add_argument('--with-mongo', action='store_true', help="Keep the Mongo-backed components enabled")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.with_mongo)
+        return
+
+    # The crawls the runner starts, with the spider arguments it passes
+    from FYP_Scraper.runner import select_crawls
+
+    spiders = [name for _, name, _ in select_crawls(only=args.spider)]
+
+    print(f"{'spider':<28}{'import (ms)':>14}{'first request (ms)':>22}")
+    for name in spiders:
+        runs = [measure(name, args.with_mongo) for _ in range(args.runs)]
+        imports = [run['import'] for run in runs if 'import' in run]
+        firsts = [run['first_request'] for run in runs if 'first_request' in run]
+        import_ms = f"{statistics.median(imports) * 1000:.0f}" if imports else "-"
+        first_ms = f"{statistics.median(firsts) * 1000:.0f}" if firsts else "no request"
+        print(f"{name:<28}{import_ms:>14}{first_ms:>22}")
+
+
+if __name__ == '__main__':
+    main()
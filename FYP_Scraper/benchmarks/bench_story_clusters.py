@@ -0,0 +1,139 @@
+"""
+Story clustering (FYP_Scraper.stories) at a realistic index size.
+
+Builds a StoryIndex of synthetic Urdu articles (1M by default), then
+reports the time to open it, the per-article assign() latency for unseen
+articles and for edited copies of stored ones, how many copies land in
+their original's cluster (recall) and how many unrelated articles are
+wrongly clustered:
+
+    python -m benchmarks.bench_story_clusters
+    python -m benchmarks.bench_story_clusters --articles 100000 --path /tmp/stories.sqlite
+
+An existing --path holding at least --articles articles is reused, so the
+build is paid once.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from FYP_Scraper.stories import StoryIndex
+
+LETTERS = list("ابپتٹثجچحخدڈذرڑزژسشصضطظعغفقکگلمنوہھءیے")
+
+
+def make_vocabulary(size, seed=7):
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(2, 8, size=size)
+    return np.array([''.join(rng.choice(LETTERS, size=length)) for length in lengths])
+
+
+def make_article(vocabulary, number):
+    # Article `number` is always the same text, so copies can be regenerated
+    rng = np.random.default_rng(number)
+    words = vocabulary[rng.integers(0, len(vocabulary), size=rng.integers(120, 400))]
+    return ' '.join(words)
+
+
+def edit(vocabulary, text, fraction, seed):
+    """Replace `fraction` of the words, as a rewrite by another source would."""
+    rng = np.random.default_rng(seed)
+    words = text.split()
+    for position in rng.choice(len(words), size=max(1, int(len(words) * fraction)), replace=False):
+        words[position] = vocabulary[rng.integers(0, len(vocabulary))]
+    return ' '.join(words)
+
+
+def build(index, vocabulary, start, count):
+    started = time.perf_counter()
+    for number in range(start, start + count):
+        index.assign(f"https://example.com/{number}", make_article(vocabulary, number), 'bench')
+        done = number - start + 1
+        if done % 100000 == 0:
+            elapsed = time.perf_counter() - started
+            print(f"  {start + done:>9} articles  {done / elapsed:8.0f} articles/s")
+    index.commit()
+    return time.perf_counter() - started
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return (
+        statistics.median(samples) * 1e6,
+        samples[int(len(samples) * 0.99)] * 1e6,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--articles', type=int, default=1_000_000)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--edit', type=float, default=0.05, help='fraction of words changed in copies')
+    parser.add_argument('--vocabulary', type=int, default=20000)
+    parser.add_argument('--path', help='index file to build or reuse (default: a temporary file)')
+    args = parser.parse_args()
+
+    vocabulary = make_vocabulary(args.vocabulary)
+    tmpdir = None
+    path = args.path
+    if not path:
+        tmpdir = tempfile.TemporaryDirectory()
+        path = os.path.join(tmpdir.name, 'stories.sqlite')
+
+    index = StoryIndex(path, commit_every=10000)
+    index.open()
+    stored = index.size()
+    if stored < args.articles:
+        print(f"Building index: {stored} -> {args.articles} articles")
+        elapsed = build(index, vocabulary, stored, args.articles - stored)
+        print(f"  built in {elapsed:.0f}s ({(args.articles - stored) / elapsed:.0f} articles/s)")
+    index.close()
+
+    started = time.perf_counter()
+    index = StoryIndex(path)
+    index.open()
+    open_time = time.perf_counter() - started
+    size = index.size()
+    print(f"Index: {size} articles, {os.path.getsize(path) / 2**20:.0f} MB, opened in {open_time * 1000:.1f} ms")
+
+    # Query articles are added to the index too; a per-run prefix keeps
+    # them new when --path is reused
+    run = time.time_ns()
+    rng = np.random.default_rng(run)
+    unseen, copies = [], []
+    false_positives = 0
+    for query in range(args.queries):
+        text = make_article(vocabulary, 10**12 + int(rng.integers(0, 10**12)))
+        started = time.perf_counter()
+        _, duplicate = index.assign(f"https://example.com/new/{run}/{query}", text)
+        unseen.append(time.perf_counter() - started)
+        false_positives += duplicate
+
+    recalled = 0
+    for query in range(args.queries):
+        number = int(rng.integers(0, args.articles))
+        original, _ = index.assign(f"https://example.com/{number}", '')
+        text = edit(vocabulary, make_article(vocabulary, number), args.edit, seed=query)
+        started = time.perf_counter()
+        cluster_id, _ = index.assign(f"https://example.com/copy/{run}/{query}", text)
+        copies.append(time.perf_counter() - started)
+        recalled += cluster_id == original
+    index.close()
+
+    for label, samples in (("unseen articles", unseen), (f"copies ({args.edit:.0%} edited)", copies)):
+        median, p99 = percentiles(samples)
+        print(f"  assign() {label:<24} median {median:7.0f} us   p99 {p99:7.0f} us")
+    print(f"  copies in their original's cluster: {recalled / args.queries:.1%}")
+    print(f"  unseen articles clustered with another: {false_positives / args.queries:.2%}")
+
+    if tmpdir:
+        tmpdir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
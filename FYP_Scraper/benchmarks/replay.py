@@ -0,0 +1,400 @@
+"""
+Offline replay benchmark for the spiders' parse callbacks.
+
+Record real responses once per spider (listing pages and articles, with the
+callback and request meta they were parsed with), then replay them through
+the callbacks with no network, Mongo or reactor involved:
+
+    python -m benchmarks.replay record city42 --max-pages 60
+    python -m benchmarks.replay record urdupoint_multi_category -a selected_category=all
+    python -m benchmarks.replay run
+    python -m benchmarks.replay run --spider dunya_news --repeat 10 --json results.json
+    python -m benchmarks.replay compare main HEAD
+
+`run` reports items/sec per spider and, per callback, latency percentiles
+and the peak memory allocated while parsing one response (tracemalloc, in a
+separate pass so tracing does not skew the timings). `compare` checks both
+commits out into temporary git worktrees, replays the same fixtures against
+each and flags callbacks that got slower by more than --threshold.
+
+Fixtures are gzipped JSON lines in benchmarks/fixtures/<spider>.jsonl.gz: a
+header line with the spider name and arguments, then one line per response.
+A small set is committed for every spider; benchmarks/fixtures/README.md
+describes the layout and how to re-record them.
+"""
+
+import argparse
+import base64
+import gzip
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(PROJECT_DIR, 'benchmarks', 'fixtures')
+RECORDER = 'benchmarks.replay.FixtureRecorder'
+
+# Request meta that describes the transfer rather than what the callback
+# needs to parse the response
+SKIPPED_META = {
+    'download_slot', 'download_latency', 'download_timeout', 'download_maxsize',
+    'download_warnsize', 'proxy', 'depth', 'retry_times', 'redirect_times',
+    'redirect_ttl', 'redirect_urls', 'redirect_reasons', 'cached_response',
+}
+
+
+def fixture_path(fixtures_dir, spider_name):
+    return os.path.join(fixtures_dir, f'{spider_name}.jsonl.gz')
+
+
+class FixtureRecorder:
+    """
+    Downloader middleware writing the 200 responses a spider parses to its
+    fixture file, at most FIXTURE_PER_CALLBACK per callback.
+    """
+
+    def __init__(self, path, spider_kwargs, per_callback):
+        self.path = path
+        self.spider_kwargs = spider_kwargs
+        self.per_callback = per_callback
+        self.counts = {}
+        self.file = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        from scrapy import signals
+
+        recorder = cls(
+            crawler.settings['FIXTURE_PATH'],
+            crawler.settings.getdict('FIXTURE_SPIDER_KWARGS'),
+            crawler.settings.getint('FIXTURE_PER_CALLBACK', 25),
+        )
+        crawler.signals.connect(recorder.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(recorder.spider_closed, signal=signals.spider_closed)
+        return recorder
+
+    def spider_opened(self, spider):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.file = gzip.open(self.path, 'wt', encoding='utf-8')
+        self.write({'spider': spider.name, 'kwargs': self.spider_kwargs, 'recorded_at': time.time()})
+
+    def spider_closed(self, spider):
+        self.file.close()
+        spider.logger.info(f"Recorded {sum(self.counts.values())} responses to {self.path}: {self.counts}")
+
+    def write(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def process_response(self, request, response, spider):
+        callback = getattr(request.callback, '__name__', 'parse' if request.callback is None else None)
+        if response.status != 200 or callback is None or self.counts.get(callback, 0) >= self.per_callback:
+            return response
+        self.counts[callback] = self.counts.get(callback, 0) + 1
+        self.write({
+            'callback': callback,
+            'request': {
+                'url': request.url,
+                'method': request.method,
+                'body': base64.b64encode(request.body).decode('ascii'),
+                'meta': serializable_meta(request.meta),
+            },
+            'url': response.url,
+            'status': response.status,
+            'headers': {
+                key.decode('latin-1'): [value.decode('latin-1') for value in values]
+                for key, values in response.headers.items()
+            },
+            'body': base64.b64encode(response.body).decode('ascii'),
+        })
+        return response
+
+
+def serializable_meta(meta):
+    kept = {}
+    for key, value in meta.items():
+        if key in SKIPPED_META or key.startswith('_'):
+            continue
+        try:
+            json.dumps(value)
+        except (TypeError, ValueError):
+            continue
+        kept[key] = value
+    return kept
+
+
+def record(args):
+    from scrapy.crawler import CrawlerProcess
+    from scrapy.utils.project import get_project_settings
+
+    kwargs = dict(arg.split('=', 1) for arg in args.arg)
+    settings = get_project_settings()
+    # Record from the network with nothing filtered out or cached, and keep
+    # the recorder after HttpCompressionMiddleware (590) so bodies are stored
+    # decompressed
+    base = settings.getdict('DOWNLOADER_MIDDLEWARES_BASE')
+    overrides = {
+        'DOWNLOADER_MIDDLEWARES_BASE': {**base, RECORDER: 580},
+        'FIXTURE_PATH': fixture_path(args.fixtures, args.spider),
+        'FIXTURE_SPIDER_KWARGS': kwargs,
+        'FIXTURE_PER_CALLBACK': args.per_callback,
+        'CLOSESPIDER_PAGECOUNT': args.max_pages,
+        'ITEM_PIPELINES': {},
+        'HTTPCACHE_ENABLED': False,
+        'KNOWN_URLS_ENABLED': False,
+        'INCREMENTAL_STOP_ENABLED': False,
+    }
+    for name, value in overrides.items():
+        settings.set(name, value, priority='cmdline')
+    process = CrawlerProcess(settings)
+    process.crawl(args.spider, **kwargs)
+    process.start()
+
+
+def load_fixture(path):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        records = [json.loads(line) for line in f if line.strip()]
+    return header, records
+
+
+def build_response(spider, record):
+    from scrapy.http import Headers, Request
+    from scrapy.responsetypes import responsetypes
+
+    callback = getattr(spider, record['callback'], None)
+    if callback is None:
+        return None, None
+    request = Request(
+        record['request']['url'],
+        method=record['request']['method'],
+        body=base64.b64decode(record['request']['body']),
+        meta=record['request']['meta'],
+        callback=callback,
+        dont_filter=True,
+    )
+    headers = Headers(record['headers'])
+    body = base64.b64decode(record['body'])
+    respcls = responsetypes.from_args(headers=headers, url=record['url'], body=body)
+    response = respcls(url=record['url'], status=record['status'], headers=headers, body=body, request=request)
+    return callback, response
+
+
+def open_spider(header):
+    from scrapy.crawler import Crawler
+    from scrapy.spiderloader import SpiderLoader
+    from scrapy.utils.project import get_project_settings
+
+    settings = get_project_settings()
+    spidercls = SpiderLoader.from_settings(settings).load(header['spider'])
+    spider = spidercls.from_crawler(Crawler(spidercls, settings), **header['kwargs'])
+    # Spiders set up their pagination state while building the first requests
+    if hasattr(spider, 'start_requests'):
+        for _ in spider.start_requests():
+            pass
+    return spider
+
+
+def replay_once(header, records, samples, trace=False):
+    """Parse every fixture response once with a fresh spider."""
+    from scrapy.http import Request
+    from scrapy.utils.misc import arg_to_iter
+
+    spider = open_spider(header)
+    items = requests = 0
+    for record in records:
+        callback, response = build_response(spider, record)
+        if callback is None:
+            samples.setdefault('missing', {}).setdefault(record['callback'], 0)
+            samples['missing'][record['callback']] += 1
+            continue
+        if trace:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        output = list(arg_to_iter(callback(response)))
+        elapsed = time.perf_counter() - started
+        if trace:
+            peak = tracemalloc.get_traced_memory()[1] - before
+            samples['memory'].setdefault(record['callback'], []).append(peak)
+            continue
+        samples['time'].setdefault(record['callback'], []).append(elapsed)
+        for result in output:
+            if isinstance(result, Request):
+                requests += 1
+            else:
+                items += 1
+    return items, requests
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+def run_fixture(path, repeat):
+    header, records = load_fixture(path)
+    samples = {'time': {}, 'memory': {}}
+    items = requests = 0
+    for _ in range(repeat):
+        found_items, found_requests = replay_once(header, records, samples)
+        items += found_items
+        requests += found_requests
+
+    tracemalloc.start()
+    try:
+        replay_once(header, records, samples, trace=True)
+    finally:
+        tracemalloc.stop()
+
+    total_time = sum(sum(times) for times in samples['time'].values())
+    result = {
+        'responses': len(records),
+        'items': items // repeat,
+        'requests': requests // repeat,
+        'items_per_sec': items / total_time if total_time else 0.0,
+        'callbacks': {},
+    }
+    for callback, times in samples['time'].items():
+        memory = samples['memory'].get(callback, [0])
+        result['callbacks'][callback] = {
+            'calls': len(times) // repeat,
+            'p50_ms': percentile(times, 0.50) * 1000,
+            'p90_ms': percentile(times, 0.90) * 1000,
+            'p99_ms': percentile(times, 0.99) * 1000,
+            'peak_kib': statistics.median(memory) / 1024,
+        }
+    if samples.get('missing'):
+        result['missing_callbacks'] = samples['missing']
+    return header['spider'], result
+
+
+def fixture_files(fixtures_dir, spiders=None):
+    if not os.path.isdir(fixtures_dir):
+        return []
+    paths = sorted(
+        os.path.join(fixtures_dir, name) for name in os.listdir(fixtures_dir) if name.endswith('.jsonl.gz')
+    )
+    if spiders:
+        paths = [path for path in paths if os.path.basename(path)[:-len('.jsonl.gz')] in spiders]
+    return paths
+
+
+def print_results(results):
+    print(f"{'spider':<26}{'callback':<16}{'calls':>7}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'peak KiB':>10}{'items/s':>10}")
+    for spider, result in results.items():
+        for index, (callback, stats) in enumerate(sorted(result['callbacks'].items())):
+            rate = f"{result['items_per_sec']:.0f}" if index == 0 else ''
+            print(
+                f"{spider if index == 0 else '':<26}{callback:<16}{stats['calls']:>7}"
+                f"{stats['p50_ms']:>9.2f}{stats['p90_ms']:>9.2f}{stats['p99_ms']:>9.2f}"
+                f"{stats['peak_kib']:>10.1f}{rate:>10}"
+            )
+        for callback, count in result.get('missing_callbacks', {}).items():
+            print(f"{'':<26}{callback:<16} missing in this tree, {count} responses skipped")
+
+
+def run(args):
+    logging.basicConfig(level=logging.WARNING)
+    paths = fixture_files(args.fixtures, args.spider)
+    if not paths:
+        sys.exit(f"No fixtures in {args.fixtures}; record some with `python -m benchmarks.replay record <spider>`")
+    results = dict(run_fixture(path, args.repeat) for path in paths)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    else:
+        print_results(results)
+
+
+def run_at_revision(revision, args, output):
+    toplevel = subprocess.run(
+        ['git', 'rev-parse', '--show-toplevel'], cwd=PROJECT_DIR, capture_output=True, text=True, check=True,
+    ).stdout.strip()
+    with tempfile.TemporaryDirectory() as tmp:
+        worktree = os.path.join(tmp, 'tree')
+        subprocess.run(['git', 'worktree', 'add', '--detach', '--quiet', worktree, revision], cwd=toplevel, check=True)
+        try:
+            project_dir = os.path.join(worktree, os.path.relpath(PROJECT_DIR, toplevel))
+            # Run this file (not the revision's copy, which may predate it)
+            # against the spiders and settings checked out in the worktree
+            command = [
+                sys.executable, os.path.abspath(__file__), 'run',
+                '--fixtures', os.path.abspath(args.fixtures),
+                '--repeat', str(args.repeat),
+                '--json', output,
+            ]
+            for spider in args.spider or []:
+                command += ['--spider', spider]
+            env = dict(os.environ, PYTHONPATH=project_dir, SCRAPY_SETTINGS_MODULE='FYP_Scraper.settings')
+            subprocess.run(command, cwd=project_dir, env=env, check=True)
+        finally:
+            subprocess.run(['git', 'worktree', 'remove', '--force', worktree], cwd=toplevel, check=True)
+    with open(output, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        base = run_at_revision(args.base, args, os.path.join(tmp, 'base.json'))
+        head = run_at_revision(args.head, args, os.path.join(tmp, 'head.json'))
+
+    print(f"{'spider':<26}{'callback':<16}{args.base[:10]:>12}{args.head[:10]:>12}{'change':>9}")
+    regressions = 0
+    for spider in sorted(set(base) & set(head)):
+        rows = [('items/s', base[spider]['items_per_sec'], head[spider]['items_per_sec'], -1)]
+        for callback in sorted(set(base[spider]['callbacks']) & set(head[spider]['callbacks'])):
+            rows.append((
+                f'{callback} p50',
+                base[spider]['callbacks'][callback]['p50_ms'],
+                head[spider]['callbacks'][callback]['p50_ms'],
+                1,
+            ))
+        for index, (label, old, new, direction) in enumerate(rows):
+            change = (new - old) / old if old else 0.0
+            regressed = change * direction > args.threshold
+            regressions += regressed
+            print(
+                f"{spider if index == 0 else '':<26}{label:<16}{old:>12.2f}{new:>12.2f}"
+                f"{change:>+9.1%}{'  <- regression' if regressed else ''}"
+            )
+    if regressions:
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = commands.add_parser('record', help="Crawl a spider and record its responses")
+    record_parser.add_argument('spider')
+    record_parser.add_argument('-a', dest='arg', action='append', default=[], help="Spider argument NAME=VALUE")
+    record_parser.add_argument('--per-callback', type=int, default=25, help="Responses kept per callback")
+    record_parser.add_argument('--max-pages', type=int, default=100, help="Stop the crawl after this many responses")
+
+    for name, help_text in (('run', "Replay fixtures and report timings"),
+                            ('compare', "Replay fixtures against two commits")):
+        sub = commands.add_parser(name, help=help_text)
+        sub.add_argument('--spider', action='append', help="Only replay this spider's fixture (repeatable)")
+        sub.add_argument('--repeat', type=int, default=5, help="Timed passes over each fixture")
+        if name == 'run':
+            sub.add_argument('--json', help="Write the results to this file instead of printing them")
+        else:
+            sub.add_argument('base')
+            sub.add_argument('head', nargs='?', default='HEAD')
+            sub.add_argument('--threshold', type=float, default=0.10,
+                             help="Relative slowdown reported as a regression (exit status 1)")
+
+    for sub in commands.choices.values():
+        sub.add_argument('--fixtures', default=FIXTURES_DIR, help="Fixture directory")
+    args = parser.parse_args()
+    {'record': record, 'run': run, 'compare': compare}[args.command](args)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 """
-Test script for the Selenium-based weather spider
+Runs the timeanddate weather spider for one month:
+
+    python run_weather_spider.py 12 2015
 """
 
 import subprocess
@@ -16,7 +18,7 @@ def run_weather_spider(month, year):
     
     # Build the command
     cmd = [
-        'scrapy', 'crawl', 'timeanddate_weather_selenium',
+        'scrapy', 'crawl', 'timeanddate_weather',
         '-a', f'month={month}',
         '-a', f'year={year}',
         '-s', 'LOG_LEVEL=INFO'
@@ -62,7 +64,7 @@ if __name__ == "__main__":
     if len(sys.argv) >= 3:
         year = sys.argv[2]
     
-    print(f"Weather Data Scraper - Selenium Version")
+    print(f"Weather Data Scraper")
     print(f"Target: Gujranwala, Pakistan")
     print(f"Period: {month}/{year}")
     print("=" * 60)
@@ -0,0 +1,104 @@
+# Shared fixtures for the FYP_Scraper tests.
+#
+# Install the test dependencies (requirements-dev.txt, next to
+# requirements.txt) and run the tests from the FYP_Scraper directory
+# (next to scrapy.cfg):
+#
+#     pip install -r ../requirements-dev.txt
+#     python -m pytest tests
+
+from scrapy.utils.reactor import install_reactor
+
+# Scrapy's default reactor, installed before anything imports another one
+install_reactor('twisted.internet.asyncioreactor.AsyncioSelectorReactor')
+
+import mongomock  # noqa: E402
+import pytest  # noqa: E402
+import scrapy  # noqa: E402
+from scrapy.utils.test import get_crawler  # noqa: E402
+from twisted.internet import defer  # noqa: E402
+
+
+class Stats:
+    """The part of Scrapy's stats collector the pipelines and middlewares use."""
+
+    def __init__(self):
+        self.values = {}
+
+    def inc_value(self, key, count=1, start=0):
+        self.values[key] = self.values.get(key, start) + count
+
+    def set_value(self, key, value):
+        self.values[key] = value
+
+    def get_value(self, key, default=None):
+        return self.values.get(key, default)
+
+    def __bool__(self):
+        return True
+
+
+@pytest.fixture
+def stats():
+    return Stats()
+
+
+@pytest.fixture
+def spider():
+    return scrapy.Spider(name='test')
+
+
+@pytest.fixture
+def crawler():
+    """A crawler with the project settings, for building middlewares."""
+    from scrapy.utils.project import get_project_settings
+
+    settings = get_project_settings().copy_to_dict()
+    # Nothing that connects to MongoDB
+    settings.update({'EXTENSIONS': {}, 'KNOWN_URLS_ENABLED': False})
+    crawler = get_crawler(scrapy.Spider, settings)
+    crawler.stats = Stats()
+    return crawler
+
+
+def _bulk_write(self, requests, ordered=True, **kwargs):
+    # mongomock's bulk_write does not accept operations built by
+    # pymongo>=4.11: apply them one by one, reporting failures the way an
+    # unordered server-side batch does
+    import pymongo
+
+    write_errors = []
+    for index, request in enumerate(requests):
+        try:
+            self.update_one(request._filter, request._doc, upsert=request._upsert)
+        except pymongo.errors.DuplicateKeyError as e:
+            write_errors.append({'index': index, 'code': 11000, 'errmsg': str(e)})
+            if ordered:
+                break
+    if write_errors:
+        raise pymongo.errors.BulkWriteError({'writeErrors': write_errors})
+
+
+@pytest.fixture
+def mongo_client(monkeypatch):
+    monkeypatch.setattr(mongomock.collection.Collection, 'bulk_write', _bulk_write)
+    return mongomock.MongoClient()
+
+
+def open_pipeline(pipeline, spider, client):
+    """Open a MongoDB pipeline against a mongomock client."""
+    pipeline.create_client = lambda: client
+    pipeline.open_spider(spider)
+    return pipeline
+
+
+def result_of(d):
+    """The result of a Deferred that has already fired (or d if it is not one)."""
+    if not isinstance(d, defer.Deferred):
+        return d
+    results = []
+    d.addBoth(results.append)
+    assert results, "Deferred has not fired"
+    if hasattr(results[0], 'raiseException'):
+        results[0].raiseException()
+    return results[0]
@@ -0,0 +1,78 @@
+import pytest
+from scrapy.http import HtmlResponse, Request
+
+from FYP_Scraper.items import ArticleCategoriesItem, NewsArticleItem
+from FYP_Scraper.spiders.ajax_post_pagination import AjaxPostPaginationSpider
+
+ARTICLE = 'https://news.example/crime/12-Mar-2025/1'
+
+PROFILE = {
+    "source": "example",
+    "ajax_url": "https://news.example/ajax_post_pagination",
+    "categories": ["crimes", "court"],
+    "page_size": 2,
+    "entries": "article",
+    "links": ["a::attr(href)"],
+    "title": ["h1::text"],
+    "content": ["div.content p::text"],
+    "content_separator": "\n",
+    "date": ["span.date::text"],
+    "reported_time": True,
+}
+
+
+class ExampleSpider(AjaxPostPaginationSpider):
+    profiles = {"example": PROFILE}
+    sites = ["example"]
+
+
+@pytest.fixture
+def spider(crawler):
+    spider = ExampleSpider.from_crawler(crawler)
+    # Starts every listing's pagination window
+    list(spider.start_requests())
+    return spider
+
+
+def listing_page(spider, category, links):
+    request = spider.listing_request(spider.listings[("example", category)], 0)
+    body = ''.join(f'<article><a href="{link}">x</a></article>' for link in links)
+    return HtmlResponse(request.url, body=body, encoding='utf-8', request=request)
+
+
+def article_page(request):
+    body = (
+        '<h1>لاہور میں ڈکیتی</h1><span class="date">12 Mar, 2025 | 10:15 AM</span>'
+        '<div class="content"><p>پولیس نے ملزم کو گرفتار کر لیا</p></div>'
+    )
+    return HtmlResponse(request.url, body=body, encoding='utf-8', request=request)
+
+
+def article_requests(results):
+    return [result for result in results if isinstance(result, Request) and result.callback.__name__ == 'parse_article']
+
+
+def test_listings_before_the_article_share_its_item(spider):
+    [request] = article_requests(spider.parse_ajax(listing_page(spider, "court", [ARTICLE])))
+    # The second listing finds it already requested
+    assert article_requests(spider.parse_ajax(listing_page(spider, "crimes", [ARTICLE]))) == []
+
+    [item] = spider.parse_article(article_page(request))
+    assert isinstance(item, NewsArticleItem)
+    assert item["categories"] == ["crimes", "court"]
+    assert item["category"] == "crimes"
+
+
+def test_listing_after_the_article_sends_its_category(spider):
+    [request] = article_requests(spider.parse_ajax(listing_page(spider, "crimes", [ARTICLE])))
+    [item] = spider.parse_article(article_page(request))
+    assert item["categories"] == ["crimes"]
+
+    results = list(spider.parse_ajax(listing_page(spider, "court", [ARTICLE])))
+    assert article_requests(results) == []
+    [late] = [result for result in results if isinstance(result, ArticleCategoriesItem)]
+    assert dict(late) == {"url": ARTICLE, "source": "example", "categories": ["court"]}
+
+    # A later page of either listing repeating it sends nothing more
+    results = list(spider.parse_ajax(listing_page(spider, "court", [ARTICLE])))
+    assert not any(isinstance(result, ArticleCategoriesItem) for result in results)
@@ -0,0 +1,74 @@
+import gc
+
+import pytest
+from scrapy.http import HtmlResponse, Request
+
+from FYP_Scraper.middlewares import CallbackTimingMiddleware
+from FYP_Scraper.signals import callback_timed
+
+
+class NewsSpider:
+    def parse_article(self, response):
+        pass
+
+
+@pytest.fixture
+def timed(crawler):
+    timed = []
+
+    def collect(callback, duration, **kwargs):
+        timed.append((callback, duration))
+
+    crawler.signals.connect(collect, signal=callback_timed, weak=False)
+    return timed
+
+
+def response_for(url):
+    request = Request(url, callback=NewsSpider().parse_article)
+    return HtmlResponse(url, body=b'<html></html>', request=request)
+
+
+def run(coroutine):
+    # The outputs below never wait on anything, so no event loop is needed
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise AssertionError("coroutine is waiting on something")
+
+
+def test_sync_output_is_timed(crawler, spider, timed):
+    middleware = CallbackTimingMiddleware(crawler)
+    response = response_for('https://city42.tv/news/1')
+    middleware.process_spider_input(response, spider)
+
+    assert list(middleware.process_spider_output(response, iter([1, 2]), spider)) == [1, 2]
+    [(callback, duration)] = timed
+    assert callback == 'parse_article'
+    assert duration > 0
+    assert len(middleware.started) == 0
+
+
+def test_async_output_is_timed(crawler, spider, timed):
+    middleware = CallbackTimingMiddleware(crawler)
+    response = response_for('https://city42.tv/news/2')
+    middleware.process_spider_input(response, spider)
+
+    async def result():
+        yield 1
+        yield 2
+
+    async def collect():
+        return [output async for output in middleware.process_spider_output_async(response, result(), spider)]
+
+    assert run(collect()) == [1, 2]
+    [(callback, duration)] = timed
+    assert callback == 'parse_article'
+    assert duration > 0
+
+
+def test_dropped_responses_leave_nothing_behind(crawler, spider):
+    middleware = CallbackTimingMiddleware(crawler)
+    middleware.process_spider_input(response_for('https://city42.tv/news/3'), spider)
+    gc.collect()
+    assert len(middleware.started) == 0
@@ -0,0 +1,50 @@
+import time
+
+import pytest
+from scrapy.core.downloader import Slot
+from scrapy.http import HtmlResponse, Request
+from scrapy.utils.httpobj import urlparse_cached
+from twisted.internet import task
+
+from FYP_Scraper import middlewares
+from FYP_Scraper.middlewares import AdaptiveThrottleMiddleware, DomainPolitenessMiddleware
+
+
+class Downloader:
+    """The part of Scrapy's downloader the middlewares read slots from."""
+
+    def __init__(self):
+        self.slots = {}
+
+    def get_slot_key(self, request):
+        return request.meta.get('download_slot') or urlparse_cached(request).hostname
+
+
+def test_politeness_follows_the_adaptive_slot_delay(crawler, spider, monkeypatch):
+    clock = task.Clock()
+    monkeypatch.setattr(time, 'monotonic', clock.seconds)
+    monkeypatch.setattr(middlewares, '_domain_next_request', {})
+    downloader = Downloader()
+    crawler.engine = type('Engine', (), {'downloader': downloader})()
+    politeness = DomainPolitenessMiddleware(crawler)
+    throttle = AdaptiveThrottleMiddleware.from_crawler(crawler)
+    delay = crawler.settings.getfloat('DOWNLOAD_DELAY')
+
+    # Before the downloader has a slot for the domain: the configured delay
+    first = Request('https://city42.tv/news/0')
+    assert politeness.reserve(first) == 0
+    downloader.slots['city42.tv'] = slot = Slot(1, delay, False)
+    first.meta['download_slot'] = 'city42.tv'
+    throttle.request_reached_downloader(first, spider)
+
+    for number in range(1, 31):
+        request = Request(f'https://city42.tv/news/{number}', meta={'download_slot': 'city42.tv'})
+        throttle.request_reached_downloader(request, spider)
+        request.meta['download_latency'] = 0.2
+        throttle.process_response(request, HtmlResponse(request.url, body=b'<html></html>', request=request), spider)
+    assert slot.delay < delay
+
+    clock.advance(delay)
+    assert politeness.reserve(Request('https://city42.tv/news/31')) == 0
+    # Spaced by the lowered delay, not DOWNLOAD_DELAY
+    assert politeness.reserve(Request('https://city42.tv/news/32')) == pytest.approx(slot.delay)
@@ -0,0 +1,53 @@
+from datetime import datetime, timezone
+
+import pytest
+from scrapy.http import HtmlResponse, Request
+
+from FYP_Scraper.spiders.dunya_news import DunyaNewsSpider, split_published
+
+URL = 'https://dunya.com.pk/index.php/crime/823114_news'
+
+
+def article(time_element):
+    body = (
+        '<html><body><h2 class="taza-tareen-story-title">لاہور: ڈکیتی کی واردات</h2>'
+        f'<div class="d-flex">{time_element}</div>'
+        '<article><p>پولیس نے ملزم کو گرفتار کر لیا</p></article></body></html>'
+    )
+    # Listed in the archive of the day before it was published
+    request = Request(URL, meta={'date': '2025-03-11'})
+    return HtmlResponse(URL, body=body.encode('utf-8'), encoding='utf-8', request=request)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('12 Mar 2025 02:20 PM', ('12 Mar 2025', '02:20 PM')),
+    ('Mar 12, 2025 | 14:20', ('Mar 12, 2025', '14:20')),
+    ('02:20 PM', (None, '02:20 PM')),
+    ('12 Mar 2025', ('12 Mar 2025', None)),
+    ('Updated', (None, None)),
+    (None, (None, None)),
+])
+def test_split_published(text, expected):
+    assert split_published(text) == expected
+
+
+def test_article_keeps_its_own_publication_time():
+    [item] = DunyaNewsSpider().parse_news(
+        article('<time class="font-weight-bold text-dark">12 Mar 2025 02:20 PM</time>')
+    )
+    assert item['date'] == '12 Mar 2025'
+    assert item['reported_time'] == '02:20 PM'
+    assert item['published_at'] == datetime(2025, 3, 12, 9, 20, tzinfo=timezone.utc)
+
+
+def test_time_only_uses_the_archive_day():
+    [item] = DunyaNewsSpider().parse_news(article('<time class="font-weight-bold text-dark">02:20 PM</time>'))
+    assert item['date'] == '2025-03-11'
+    assert item['published_at'] == datetime(2025, 3, 11, 9, 20, tzinfo=timezone.utc)
+
+
+def test_missing_time_falls_back_to_the_archive_day():
+    [item] = DunyaNewsSpider().parse_news(article(''))
+    assert item['date'] == '2025-03-11'
+    assert item['reported_time'] == 'N/A'
+    assert item['published_at'] == datetime(2025, 3, 10, 19, 0, tzinfo=timezone.utc)
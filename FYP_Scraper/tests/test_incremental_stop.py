@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import pytest
+import scrapy
+from twisted.internet import defer, threads
+
+from FYP_Scraper import extensions
+from FYP_Scraper.extensions import IncrementalStopController
+from tests.conftest import result_of
+
+MARK = {'_id': 'urdupoint', 'newest_url': 'https://www.urdupoint.com/news-100.html', 'newest_date': datetime(2025, 3, 12)}
+
+
+class NewsSpider(scrapy.Spider):
+    name = 'news'
+    source = 'urdupoint'
+
+
+@pytest.fixture
+def crawl_state(mongo_client, monkeypatch):
+    monkeypatch.setattr(extensions, 'get_client', lambda uri: mongo_client)
+    monkeypatch.setattr(extensions, 'release_client', lambda client: None)
+    # Run the MongoDB work at once instead of on the reactor's thread pool
+    monkeypatch.setattr(threads, 'deferToThread', lambda f, *args: defer.maybeDeferred(f, *args))
+    collection = mongo_client['news_db']['crawl_state']
+    collection.insert_one(dict(MARK))
+    return collection
+
+
+def run(crawler, stats, urls, dates, **kwargs):
+    spider = NewsSpider.from_crawler(crawler, **kwargs)
+    controller = IncrementalStopController('mongodb://test', stats=stats)
+    result_of(controller.spider_opened(spider))
+    keep_going = True
+    stop_controller = getattr(spider, 'stop_controller', None)
+    if stop_controller:
+        keep_going = stop_controller.observe_listing(spider, urls, page=1, dates=dates)
+    result_of(controller.spider_closed(spider, 'finished'))
+    return keep_going
+
+
+def test_run_moves_the_high_water_mark(crawler, stats, crawl_state):
+    urls = ['https://www.urdupoint.com/news-101.html', MARK['newest_url']]
+    assert not run(crawler, stats, urls, [datetime(2025, 3, 13), datetime(2025, 3, 12)])
+
+    [mark] = crawl_state.find()
+    assert mark['newest_url'] == urls[0]
+    assert mark['newest_date'] == datetime(2025, 3, 13)
+
+
+def test_backfill_neither_stops_at_nor_moves_the_mark(crawler, stats, crawl_state):
+    urls = ['https://www.urdupoint.com/news-7.html', 'https://www.urdupoint.com/news-6.html']
+    assert run(crawler, stats, urls, [datetime(2024, 12, 31)], since='2024-12-01', until='2024-12-31')
+
+    [mark] = crawl_state.find()
+    assert mark == MARK
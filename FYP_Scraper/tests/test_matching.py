@@ -0,0 +1,52 @@
+import pytest
+
+from FYP_Scraper import matching
+from FYP_Scraper.matching import KeywordMatcher
+
+PATTERNS = {
+    "murder": ["قتل", "قتل کیس", "فائرنگ"],
+    "suicide": ["خودکشی"],
+    "robbery": ["ڈکیتی", "چوری"],
+    "thief": ["چور", "چوری"],
+    "location": ["لاہور", "ڈیرہ غازی خان", "غازی"],
+}
+
+
+@pytest.fixture(params=['c', 'python'])
+def matcher(request, monkeypatch):
+    if request.param == 'python':
+        monkeypatch.setattr(matching, 'ahocorasick', None)
+    elif matching.ahocorasick is None:
+        pytest.skip("pyahocorasick is not installed")
+    return KeywordMatcher(PATTERNS)
+
+
+def test_labels_and_first_appearance_order(matcher):
+    hits = matcher.find("لاہور میں فائرنگ، قتل کیس درج، فائرنگ کا دوسرا واقعہ")
+    assert hits == {
+        "location": ["لاہور"],
+        "murder": ["فائرنگ", "قتل", "قتل کیس"],
+    }
+
+
+def test_nested_and_overlapping_phrases(matcher):
+    # چوری contains چور; ڈیرہ غازی خان contains غازی
+    hits = matcher.find("ڈیرہ غازی خان میں چوری")
+    assert hits["location"] == ["غازی", "ڈیرہ غازی خان"]
+    assert hits["robbery"] == ["چوری"]
+    assert hits["thief"] == ["چور", "چوری"]
+
+
+def test_no_match(matcher):
+    assert matcher.find("موسم خوشگوار رہے گا") == {}
+    assert matcher.find("") == {}
+    assert matcher.find(None) == {}
+
+
+def test_backends_agree(monkeypatch):
+    if matching.ahocorasick is None:
+        pytest.skip("pyahocorasick is not installed")
+    text = "لاہور اور ڈیرہ غازی خان میں قتل، خودکشی اور چوری کی وارداتیں " * 3
+    expected = KeywordMatcher(PATTERNS).find(text)
+    monkeypatch.setattr(matching, 'ahocorasick', None)
+    assert KeywordMatcher(PATTERNS).find(text) == expected
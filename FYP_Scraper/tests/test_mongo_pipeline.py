@@ -0,0 +1,151 @@
+import pymongo
+import pytest
+
+from FYP_Scraper.items import ArticleCategoriesItem, NewsArticleItem
+from FYP_Scraper.pipelines import MongoDBPipeline
+from tests.conftest import open_pipeline, result_of
+
+URL = 'https://www.urdupoint.com/daily/livenews/2025-03-12/news-1.html'
+
+
+def article(**fields):
+    return NewsArticleItem(**{
+        'title': "لاہور میں فائرنگ",
+        'content': "پولیس نے ملزم کو گرفتار کر لیا",
+        'date': '12 March 2025',
+        'url': URL,
+        'source': 'urdupoint',
+        'category': 'murder',
+        'categories': ['murder'],
+        **fields,
+    })
+
+
+@pytest.fixture(params=['per-item', 'bulk', 'spool'])
+def pipeline(request, tmp_path, spider, mongo_client, stats):
+    pipeline = MongoDBPipeline(
+        'mongodb://test',
+        bulk_enabled=request.param == 'bulk',
+        spool_dir=str(tmp_path) if request.param == 'spool' else None,
+        write_threads=0,
+        stats=stats,
+    )
+    yield open_pipeline(pipeline, spider, mongo_client)
+
+
+def stored(mongo_client):
+    return list(mongo_client['news_db']['urdupoint_raw'].find({}, {'_id': 0}))
+
+
+def test_late_categories_are_added_to_the_stored_article(pipeline, spider, mongo_client, stats):
+    result_of(pipeline.process_item(article(), spider))
+    late = ArticleCategoriesItem(url=URL, source='urdupoint', categories=['suicide'])
+    assert result_of(pipeline.process_item(late, spider)) is late
+    # Sent again by a third listing: nothing left to add
+    result_of(pipeline.process_item(ArticleCategoriesItem(url=URL, source='urdupoint', categories=['suicide']), spider))
+    result_of(pipeline.close_spider(spider))
+
+    [document] = stored(mongo_client)
+    assert document['categories'] == ['murder', 'suicide']
+    assert document['title'] == "لاہور میں فائرنگ"
+    assert stats.values['mongodb/categories_added'] == 1
+
+
+def test_categories_never_create_an_article(pipeline, spider, mongo_client, stats):
+    late = ArticleCategoriesItem(url=URL, source='urdupoint', categories=['suicide'])
+    result_of(pipeline.process_item(late, spider))
+    result_of(pipeline.close_spider(spider))
+
+    assert stored(mongo_client) == []
+    assert 'mongodb/categories_added' not in stats.values
+
+
+def test_bulk_items_pass_once_buffered_and_are_written_in_batches(spider, mongo_client, stats):
+    pipeline = open_pipeline(
+        MongoDBPipeline('mongodb://test', bulk_enabled=True, bulk_size=100, write_threads=0, stats=stats),
+        spider, mongo_client,
+    )
+    items = [article(url=f"{URL}?page={number}", content=f"تفصیل {number}") for number in range(250)]
+    for item in items:
+        # Handed back at once, not when its batch is written
+        assert pipeline.process_item(item, spider) is item
+    assert stats.values['mongodb/bulk_flushes'] == 2
+    assert mongo_client['news_db']['urdupoint_raw'].count_documents({}) == 200
+
+    result_of(pipeline.close_spider(spider))
+    assert stats.values['mongodb/bulk_flushes'] == 3
+    assert stats.values['mongodb/upserted'] == 250
+    assert mongo_client['news_db']['urdupoint_raw'].count_documents({}) == 250
+
+
+def test_failed_bulk_batch_is_reported(spider, mongo_client, stats, caplog):
+    pipeline = open_pipeline(
+        MongoDBPipeline('mongodb://test', bulk_enabled=True, bulk_size=10, write_threads=0, stats=stats),
+        spider, mongo_client,
+    )
+
+    def unreachable(collection_name, documents):
+        raise pymongo.errors.ServerSelectionTimeoutError("no servers")
+
+    pipeline.write_batch = unreachable
+    for number in range(10):
+        pipeline.process_item(article(url=f"{URL}?page={number}"), spider)
+    result_of(pipeline.close_spider(spider))
+
+    assert stats.values['mongodb/errors'] == 10
+    assert any(record.levelname == 'ERROR' and '10 items were not stored' in record.getMessage()
+               for record in caplog.records)
+
+
+def crawl(mongo_client, spider, stats, items, **kwargs):
+    # A fresh pipeline per run, so stored hashes come from MongoDB, not the cache
+    pipeline = open_pipeline(MongoDBPipeline('mongodb://test', write_threads=0, stats=stats, **kwargs),
+                             spider, mongo_client)
+    for item in items:
+        result_of(pipeline.process_item(item, spider))
+    result_of(pipeline.close_spider(spider))
+
+
+@pytest.mark.parametrize('bulk_enabled', [False, True])
+def test_unchanged_articles_are_not_rewritten(spider, mongo_client, stats, bulk_enabled):
+    items = [article(url=f"{URL}?page={number}", content=f"تفصیل {number}") for number in range(5)]
+    crawl(mongo_client, spider, stats, items, bulk_enabled=bulk_enabled)
+    assert stats.values['mongodb/upserted'] == 5
+
+    collection = mongo_client['news_db']['urdupoint_raw']
+    stored_at = {doc['url']: doc['crawled_at'] for doc in collection.find()}
+    recrawl = [article(url=f"{URL}?page={number}", content=f"تفصیل {number}") for number in range(5)]
+    recrawl[0]['content'] = "تفصیل 0، تازہ ترین"
+    crawl(mongo_client, spider, stats, recrawl, bulk_enabled=bulk_enabled)
+
+    assert stats.values['mongodb/skipped_writes'] == 4
+    assert stats.values['mongodb/changed'] == 1
+    for doc in collection.find():
+        if doc['url'] == recrawl[0]['url']:
+            assert doc['content'] == "تفصیل 0، تازہ ترین"
+            [revision] = doc['revisions']
+            assert revision['content_hash'] != doc['content_hash']
+        else:
+            # Not written at all: crawled_at is still the first run's
+            assert doc['crawled_at'] == stored_at[doc['url']]
+            assert 'revisions' not in doc
+
+
+def test_unchanged_articles_are_touched_for_the_known_url_filter(spider, mongo_client, stats):
+    crawl(mongo_client, spider, stats, [article()])
+    crawl(mongo_client, spider, stats, [article(categories=['murder', 'suicide'])], touch_unchanged=True)
+
+    [document] = stored(mongo_client)
+    assert stats.values['mongodb/unchanged'] == 1
+    assert 'mongodb/skipped_writes' not in stats.values
+    assert document['categories'] == ['murder', 'suicide']
+
+
+def test_article_stored_without_a_hash_is_updated(spider, mongo_client, stats):
+    mongo_client['news_db']['urdupoint_raw'].insert_one({'url': URL, 'title': "پرانا عنوان"})
+    crawl(mongo_client, spider, stats, [article()])
+
+    [document] = stored(mongo_client)
+    assert stats.values['mongodb/updated'] == 1
+    assert document['title'] == "لاہور میں فائرنگ"
+    assert document['content_hash']
@@ -0,0 +1,49 @@
+from scrapy.settings import Settings
+
+from FYP_Scraper.pagination import PaginationWindow
+
+
+def test_window_keeps_size_pages_in_flight():
+    window = PaginationWindow(page_size=28, size=3)
+    assert window.fill() == [0, 28, 56]
+    # Full until a page is done
+    assert window.fill() == []
+
+    window.done(28)
+    assert window.fill() == [84]
+    window.done(0)
+    window.done(56)
+    assert window.fill() == [112, 140]
+
+
+def test_short_page_ends_the_listing():
+    window = PaginationWindow(page_size=20, size=4, start=20)
+    assert window.fill() == [20, 40, 60, 80]
+
+    window.done(40, last_page=True)
+    assert window.end == 40
+    # Pages already in flight past the end are ignored when they come back
+    assert window.past_end(60) and window.past_end(80)
+    assert not window.past_end(20)
+    window.done(20)
+    window.done(60)
+    assert window.fill() == []
+
+
+def test_stop_keeps_the_earliest_end():
+    window = PaginationWindow(page_size=10, size=2)
+    window.fill()
+    window.stop(10)
+    window.stop(30)
+    assert window.end == 10
+    window.stop(0)
+    assert window.end == 0
+    assert window.fill() == []
+
+
+def test_size_is_capped_by_domain_concurrency():
+    settings = Settings({'PAGINATION_WINDOW': 6, 'CONCURRENT_REQUESTS_PER_DOMAIN': 4})
+    assert PaginationWindow.from_settings(settings, page_size=28).size == 4
+    # A site's own download slot wins over the global per-domain limit
+    assert PaginationWindow.from_settings(settings, page_size=20, concurrency=1).size == 1
+    assert PaginationWindow.from_settings(Settings({'PAGINATION_WINDOW': 2}), page_size=36, start=36).fill() == [36, 72]
@@ -0,0 +1,106 @@
+import pytest
+import scrapy
+from scrapy.http import HtmlResponse, Request
+from twisted.internet import reactor, task
+
+from FYP_Scraper.middlewares import (
+    AdaptiveThrottleMiddleware,
+    BackoffRetryMiddleware,
+    RandomProxyMiddleware,
+    RetryScheduled,
+)
+from FYP_Scraper.proxies import ProxyPool
+
+
+class NewsSpider(scrapy.Spider):
+    name = 'news'
+
+    def parse_ajax(self, response):
+        pass
+
+    def parse_article(self, response):
+        pass
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = task.Clock()
+    monkeypatch.setattr(reactor, 'callLater', clock.callLater)
+    return clock
+
+
+@pytest.fixture
+def spider(crawler):
+    return NewsSpider.from_crawler(crawler)
+
+
+@pytest.fixture
+def retry(crawler):
+    return BackoffRetryMiddleware.from_crawler(crawler)
+
+
+def response_for(request, body=b'', status=200):
+    return HtmlResponse(request.url, status=status, body=body, encoding='utf-8', request=request)
+
+
+def test_breaker_hold_is_not_charged_to_proxy_or_throttle(crawler, spider, retry, clock):
+    pool = ProxyPool(max_failures=1)
+    pool.add('http://10.0.0.1:8080', latency=0.5, success_rate=0.9)
+    proxies = RandomProxyMiddleware(pool, stats=crawler.stats)
+    throttle = AdaptiveThrottleMiddleware.from_crawler(crawler)
+    sent = []
+    crawler.engine = type('Engine', (), {'crawl': staticmethod(sent.append)})()
+
+    # A retry copy still carrying its last attempt's proxy and send time
+    request = Request('https://city42.tv/news/1', callback=spider.parse_article, meta={
+        'proxy': 'http://10.0.0.1:8080', 'adaptive_throttle_sent': 1.0, 'download_slot': 'city42.tv',
+    })
+    for _ in range(retry.breaker.min_requests):
+        retry.record(request, spider, error=True)
+    assert retry.breaker.paused_for('city42.tv')
+
+    with pytest.raises(RetryScheduled) as raised:
+        retry.process_request(request, spider)
+    # Scrapy then runs every middleware's process_exception
+    assert throttle.process_exception(request, raised.value, spider) is None
+    proxies.process_exception(request, raised.value, spider)
+
+    assert pool.available(), "a healthy proxy was quarantined for a hold"
+    assert 'proxy_pool/failures' not in crawler.stats.values
+    assert 'adaptive_throttle/backoffs' not in crawler.stats.values
+    assert crawler.stats.values['retry/breaker_held'] == 1
+
+    clock.advance(retry.breaker.cooldown + 1)
+    held, = sent
+    assert 'proxy' not in held.meta and 'adaptive_throttle_sent' not in held.meta
+
+
+def test_listing_ending_with_an_empty_page_is_not_retried(spider, retry, clock):
+    request = Request('https://city42.tv/wp-admin/admin-ajax.php', method='POST', callback=spider.parse_ajax)
+    response = response_for(request)
+    assert retry.process_response(request, response, spider) is response
+    assert not clock.getDelayedCalls()
+
+
+def test_empty_article_page_is_retried_as_a_soft_block(crawler, spider, retry, clock):
+    request = Request('https://city42.tv/news/1', callback=spider.parse_article)
+    with pytest.raises(RetryScheduled, match='empty body'):
+        retry.process_response(request, response_for(request), spider)
+    assert crawler.stats.values['retry/soft_blocks'] == 1
+    assert len(clock.getDelayedCalls()) == 1
+
+
+def test_requests_opt_in_and_out_of_the_empty_check(spider, retry, clock):
+    listing = Request('https://city42.tv/page/2', callback=spider.parse_ajax, meta={'soft_block_empty': True})
+    with pytest.raises(RetryScheduled):
+        retry.process_response(listing, response_for(listing), spider)
+    article = Request('https://city42.tv/news/2', callback=spider.parse_article, meta={'soft_block_empty': False})
+    response = response_for(article)
+    assert retry.process_response(article, response, spider) is response
+
+
+def test_block_page_is_retried_for_any_callback(spider, retry, clock):
+    request = Request('https://city42.tv/page/3', callback=spider.parse_ajax)
+    body = b'<html><title>Just a moment...</title></html>'
+    with pytest.raises(RetryScheduled, match='block page'):
+        retry.process_response(request, response_for(request, body), spider)
@@ -0,0 +1,57 @@
+import pymongo
+
+from FYP_Scraper.items import NewsArticleItem
+from FYP_Scraper.pipelines import MongoDBPipeline
+from tests.conftest import open_pipeline, result_of
+
+
+def articles(count, source='city42'):
+    for number in range(count):
+        yield NewsArticleItem(
+            title=f"خبر {number}",
+            content=f"تفصیل {number}",
+            date='2025-03-12',
+            url=f"https://city42.tv/news/{number}",
+            source=source,
+        )
+
+
+def make_pipeline(tmp_path, spider, mongo_client, stats, **kwargs):
+    pipeline = MongoDBPipeline(
+        'mongodb://test', spool_dir=str(tmp_path), write_threads=0, stats=stats, **kwargs
+    )
+    return open_pipeline(pipeline, spider, mongo_client)
+
+
+def test_spooled_items_are_synced_at_close(tmp_path, spider, mongo_client, stats):
+    pipeline = make_pipeline(tmp_path, spider, mongo_client, stats)
+    for item in articles(120):
+        assert result_of(pipeline.process_item(item, spider)) is item
+    result_of(pipeline.close_spider(spider))
+
+    assert mongo_client['news_db']['city42_raw'].count_documents({}) == 120
+    assert stats.values['spool/appended'] == 120
+    assert stats.values['spool/synced'] == 120
+    assert stats.values['spool/pending'] == 0
+
+
+def test_unwritten_items_are_reported_and_resumed(tmp_path, spider, mongo_client, stats, caplog):
+    pipeline = make_pipeline(tmp_path, spider, mongo_client, stats, drain_timeout=0)
+
+    def unreachable(entries):
+        raise pymongo.errors.ServerSelectionTimeoutError("no servers")
+
+    pipeline.write_spooled = unreachable
+    for item in articles(10):
+        result_of(pipeline.process_item(item, spider))
+    result_of(pipeline.close_spider(spider))
+
+    assert stats.values['spool/pending'] == 10
+    assert any(record.levelname == 'ERROR' and 'left in' in record.getMessage() for record in caplog.records)
+    assert mongo_client['news_db']['city42_raw'].count_documents({}) == 0
+
+    # The next run that finds the spool file writes them
+    pipeline = make_pipeline(tmp_path, spider, mongo_client, stats)
+    result_of(pipeline.close_spider(spider))
+    assert mongo_client['news_db']['city42_raw'].count_documents({}) == 10
+    assert stats.values['spool/pending'] == 0
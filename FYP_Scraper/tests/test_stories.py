@@ -0,0 +1,51 @@
+from FYP_Scraper.stories import StoryIndex, cluster_id_of
+
+STORY = (
+    "لاہور میں پولیس نے ڈکیتی کی واردات میں ملوث تین ملزمان کو گرفتار کر لیا "
+    "ملزمان سے اسلحہ اور نقدی برآمد ہوئی جبکہ مقدمہ درج کر کے تفتیش شروع کر دی گئی"
+)
+OTHER = (
+    "کراچی میں بارش کے بعد سڑکوں پر پانی جمع ہو گیا شہریوں کو شدید مشکلات کا سامنا "
+    "کرنا پڑا اور ٹریفک کئی گھنٹے جام رہی"
+)
+
+
+def open_index(path):
+    index = StoryIndex(str(path))
+    index.open()
+    return index
+
+
+def test_copies_share_the_cluster_of_the_first_article(tmp_path):
+    index = open_index(tmp_path / 'stories.sqlite')
+    first, duplicate = index.assign('https://a.example/1', STORY, 'a')
+    assert (first, duplicate) == (cluster_id_of('https://a.example/1'), False)
+    assert index.assign('https://b.example/9', STORY + " پولیس", 'b') == (first, True)
+    other, duplicate = index.assign('https://b.example/10', OTHER, 'b')
+    assert other != first and not duplicate
+    index.close()
+
+
+def test_cluster_ids_survive_a_lost_index(tmp_path):
+    # A fresh runner starts with an empty index: ids must not restart and
+    # collide with the ones already stored in MongoDB
+    earlier = open_index(tmp_path / 'earlier.sqlite')
+    stored = {earlier.assign(f'https://a.example/{n}', text)[0] for n, text in enumerate([STORY, OTHER])}
+    earlier.close()
+
+    fresh = open_index(tmp_path / 'fresh.sqlite')
+    cluster_id, _ = fresh.assign('https://c.example/new', OTHER + " آج")
+    assert cluster_id not in stored
+    assert 0 < cluster_id < 2 ** 63
+    fresh.close()
+
+
+def test_index_grows_across_runs(tmp_path):
+    index = open_index(tmp_path / 'stories.sqlite')
+    first, _ = index.assign('https://a.example/1', STORY)
+    index.close()
+
+    index = open_index(tmp_path / 'stories.sqlite')
+    assert index.assign('https://b.example/2', STORY) == (first, True)
+    assert index.size() == 2
+    index.close()
@@ -0,0 +1,82 @@
+import os
+
+import pytest
+from scrapy.http import HtmlResponse, Request
+
+from FYP_Scraper.items import WeatherDataItem
+from FYP_Scraper.spiders.timeanddate_weather import TimeAndDateWeatherSpider
+from FYP_Scraper.weather import observation
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+@pytest.fixture
+def spider():
+    return TimeAndDateWeatherSpider(month='12', year='2015')
+
+
+def saved_page(name, url, meta=None):
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        body = f.read()
+    return HtmlResponse(url, body=body, encoding='utf-8', request=Request(url, meta=meta or {}))
+
+
+def test_month_page_data(spider):
+    response = saved_page('timeanddate_historic_month.html', spider.historic_url)
+    items = list(spider.parse(response))
+
+    assert all(isinstance(item, WeatherDataItem) for item in items)
+    assert [(item['day_number'], item['time']) for item in items] == [
+        ('1', '00:00'), ('1', '06:00'), ('1', '12:00'), ('2', '00:00'), ('2', '06:00'),
+    ]
+    first = items[0]
+    assert first['unique_id'] == 'gujranwala_2015_12_1_0000'
+    assert first['location'] == 'Gujranwala, Pakistan'
+    assert first['temperature_high'] == '9'
+    assert first['weather_condition'] == 'Fog.'
+    assert first['wind_speed'] == 'No wind'
+    assert first['humidity'] == '93%'
+    assert first['pressure'] == '1020 mbar'
+    assert first['visibility'] == 'N/A'
+    assert items[4]['temperature_high'] == '12.5'
+    assert items[3]['visibility'] == '0.5 km'
+
+
+def test_day_page_table(spider):
+    url = f"{spider.historic_url}&hd=20151201"
+    items = list(spider.parse(saved_page('timeanddate_historic_day.html', url, meta={'day': 1})))
+
+    assert [(item['day_number'], item['time']) for item in items] == [('1', '00:00'), ('1', '06:00'), ('1', '12:00')]
+    second = items[1]
+    assert second['location'] == 'Gujranwala, Pakistan'
+    assert second['temperature_high'] == '11'
+    assert second['weather_condition'] == 'Haze.'
+    assert second['wind_speed'] == '7 km/h'
+    assert second['humidity'] == '82%'
+    assert second['pressure'] == '1021 mbar'
+    assert second['visibility'] == '3 km'
+    assert items[0]['wind_speed'] == 'No wind'
+
+
+def test_both_pages_give_the_same_observations(spider):
+    month = list(spider.parse(saved_page('timeanddate_historic_month.html', spider.historic_url)))
+    day = list(spider.parse(saved_page('timeanddate_historic_day.html', spider.historic_url, meta={'day': 1})))
+
+    # Stored rows of the same hour share their unique_id and readings
+    from_data = {item['unique_id']: observation(dict(item)) for item in month}
+    for item in day:
+        stored = observation(dict(item))
+        assert stored['unique_id'] in from_data
+        expected = from_data[stored['unique_id']]
+        for field in ('timestamp', 'temperature_high_c', 'humidity_pct', 'pressure_hpa', 'wind_speed_kmh', 'visibility_km'):
+            assert stored.get(field) == expected.get(field)
+
+
+def test_page_without_data_is_requested_day_by_day(spider):
+    response = HtmlResponse(spider.historic_url, body=b'<html><h1>Past Weather</h1></html>', encoding='utf-8',
+                            request=Request(spider.historic_url))
+    requests = list(spider.parse(response))
+
+    assert len(requests) == 31
+    assert requests[0].url.endswith('&hd=20151201')
+    assert requests[0].meta['day'] == 1
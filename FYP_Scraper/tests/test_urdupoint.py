@@ -0,0 +1,65 @@
+import json
+
+import pytest
+from scrapy.http import HtmlResponse, Request, TextResponse
+
+from FYP_Scraper.items import ArticleCategoriesItem, NewsArticleItem
+from FYP_Scraper.spiders.UrduPoint import UrduPointMultiCategorySpider
+
+ARTICLE = 'https://www.urdupoint.com/daily/livenews/2025-03-12/news-1.html'
+
+
+@pytest.fixture
+def spider(crawler):
+    spider = UrduPointMultiCategorySpider.from_crawler(crawler, selected_category="thief,kidnapping")
+    # Sets the date window
+    list(spider.start_requests())
+    return spider
+
+
+def listing_page(spider, name, links):
+    [category] = [cat for cat in spider.categories if cat["name"] == name]
+    request = spider.listing_request(category, page=1)
+    html = ''.join(
+        f'<li class="item_shadow"><a href="{link}">x</a>'
+        '<div class="item_date"><span>12 مارچ 2025</span><span>10:15</span></div></li>'
+        for link in links
+    )
+    body = json.dumps({"data": html}).encode('utf-8')
+    return TextResponse(request.url, body=body, encoding='utf-8', request=request)
+
+
+def article_page(request, body):
+    html = f'<h1 class="urdu">لاہور میں واردات</h1><div class="detail_txt urdu"><p>{body}</p></div>'
+    return HtmlResponse(request.url, body=html.encode('utf-8'), encoding='utf-8', request=request)
+
+
+def article_requests(results):
+    return [result for result in results if isinstance(result, Request) and result.callback.__name__ == 'parse_article']
+
+
+def test_rejected_article_is_parsed_again_for_a_later_listing(spider):
+    [request] = article_requests(spider.parse_ajax(listing_page(spider, "thief", [ARTICLE])))
+    # Listed as a theft but only a kidnapping keyword in the body: rejected
+    assert list(spider.parse_article(article_page(request, "بچے کے اغوا کا مقدمہ درج"))) == []
+    assert "kidnapping" in spider.article_matches[ARTICLE]
+
+    results = list(spider.parse_ajax(listing_page(spider, "kidnapping", [ARTICLE])))
+    assert not any(isinstance(result, ArticleCategoriesItem) for result in results)
+    [again] = article_requests(results)
+    assert again.dont_filter
+
+    [item] = spider.parse_article(article_page(again, "بچے کے اغوا کا مقدمہ درج"))
+    assert isinstance(item, NewsArticleItem)
+    assert item["categories"] == ["kidnapping"]
+
+
+def test_kept_article_gets_the_later_listing_category(spider):
+    [request] = article_requests(spider.parse_ajax(listing_page(spider, "thief", [ARTICLE])))
+    [item] = spider.parse_article(article_page(request, "چوری کے بعد اغوا کی کوشش"))
+    assert item["categories"] == ["thief"]
+
+    results = list(spider.parse_ajax(listing_page(spider, "kidnapping", [ARTICLE])))
+    assert article_requests(results) == []
+    [late] = [result for result in results if isinstance(result, ArticleCategoriesItem)]
+    assert dict(late) == {"url": ARTICLE, "source": "urdupoint", "categories": ["kidnapping"]}
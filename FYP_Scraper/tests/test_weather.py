@@ -0,0 +1,84 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from FYP_Scraper.weather import (
+    humidity_pct,
+    observation,
+    observed_at,
+    pressure_hpa,
+    temperature_c,
+    visibility_km,
+    wind_speed_kmh,
+)
+
+
+@pytest.mark.parametrize('convert, text, expected', [
+    (temperature_c, '9', 9.0),
+    (temperature_c, '18 °C', 18.0),
+    (temperature_c, '−1.5 °C', -1.5),
+    (temperature_c, '50 °F', 10.0),
+    (temperature_c, 'N/A', None),
+    (humidity_pct, '93%', 93.0),
+    (humidity_pct, None, None),
+    (pressure_hpa, '1020 mbar', 1020.0),
+    (pressure_hpa, '30.12 inHg', 1020.0),
+    (wind_speed_kmh, '7 km/h', 7.0),
+    (wind_speed_kmh, '10 mph', 16.1),
+    (wind_speed_kmh, 'No wind', 0.0),
+    (wind_speed_kmh, 'N/A', None),
+    (visibility_km, '3 km', 3.0),
+    (visibility_km, '2 mi', 3.2),
+    (visibility_km, 'N/A', None),
+])
+def test_readings_are_converted_to_fixed_units(convert, text, expected):
+    assert convert(text) == expected
+
+
+def test_observation_time_is_local_to_pakistan():
+    assert observed_at('2015', '12', '1', '05:00') == datetime(2015, 12, 1, 0, 0, tzinfo=timezone.utc)
+    assert observed_at(2015, 12, 1, '2:30 pm') == datetime(2015, 12, 1, 9, 30, tzinfo=timezone.utc)
+    assert observed_at(2015, 2, 30, '05:00') is None
+    assert observed_at(2015, 12, 1, 'noon') is None
+    assert observed_at(None, 12, 1, '05:00') is None
+
+
+def test_observation_document():
+    row = {
+        'unique_id': 'gujranwala_2015_12_1_0500',
+        'date': '1 Dec',
+        'time': '05:00',
+        'day_number': '1',
+        'month': '12',
+        'year': '2015',
+        'location': 'Gujranwala, Pakistan',
+        'temperature_high': '11',
+        'temperature_low': '9',
+        'weather_condition': 'Haze.',
+        'wind_speed': 'No wind',
+        'humidity': '82%',
+        'pressure': '1021 mbar',
+        'visibility': 'N/A',
+        'url': 'https://www.timeanddate.com/weather/pakistan/gujranwala/historic?month=12&year=2015',
+        'scraped_at': '2025-03-12T10:00:00+05:00',
+    }
+    document = observation(row)
+
+    assert document == {
+        'timestamp': datetime(2015, 12, 1, 0, 0, tzinfo=timezone.utc),
+        'location': 'Gujranwala, Pakistan',
+        'unique_id': 'gujranwala_2015_12_1_0500',
+        'temperature_high_c': 11.0,
+        'temperature_low_c': 9.0,
+        'humidity_pct': 82.0,
+        'wind_speed_kmh': 0.0,
+        'pressure_hpa': 1021.0,
+        'weather_condition': 'Haze.',
+        'year': 2015,
+        'month': 12,
+        'day_number': 1,
+        'url': row['url'],
+        'scraped_at': datetime(2025, 3, 12, 5, 0, tzinfo=timezone.utc),
+    }
+    # Without a usable time the row cannot go into the time series
+    assert observation({**row, 'time': 'N/A'}) is None
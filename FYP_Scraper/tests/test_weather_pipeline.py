@@ -0,0 +1,84 @@
+import time
+
+from twisted.internet import defer
+
+from FYP_Scraper.items import WeatherDataItem
+from FYP_Scraper.pipelines import WeatherMongoDBPipeline
+from tests.conftest import open_pipeline, result_of
+
+
+def weather_rows(days, hours=24):
+    for day in range(1, days + 1):
+        for hour in range(hours):
+            yield WeatherDataItem(
+                unique_id=f"gujranwala_2015_12_{day}_{hour:02d}00",
+                date=f"{day} Dec",
+                time=f"{hour:02d}:00",
+                day_number=str(day),
+                temperature_high='9',
+                temperature_low='9',
+                weather_condition='Fog.',
+                wind_speed='No wind',
+                humidity='93%',
+                pressure='1020 mbar',
+                visibility='N/A',
+                location='Gujranwala, Pakistan',
+                month='12',
+                year='2015',
+                url='https://www.timeanddate.com/weather/pakistan/gujranwala/historic',
+                scraped_at='2025-01-01T00:00:00',
+            )
+
+
+def make_pipeline(spider, mongo_client, stats, **kwargs):
+    db = mongo_client['weather_db']
+    if 'weather_observations' not in db.list_collection_names():
+        # mongomock has no time-series collections
+        db.create_collection('weather_observations')
+    pipeline = WeatherMongoDBPipeline('mongodb://test', write_threads=0, stats=stats, **kwargs)
+    return open_pipeline(pipeline, spider, mongo_client)
+
+
+def test_month_is_written_in_size_driven_batches(spider, mongo_client, stats):
+    pipeline = make_pipeline(spider, mongo_client, stats, batch_size=500, batch_max_age=5.0)
+    started = time.monotonic()
+    for item in weather_rows(31):
+        # Handed back at once: holding items until their batch is written
+        # would cap the buffer at CONCURRENT_ITEMS
+        assert pipeline.process_item(item, spider) is item
+    result_of(pipeline.close_spider(spider))
+    elapsed = time.monotonic() - started
+
+    assert stats.values['weather/batches'] == 2  # 500 on size, 244 at close
+    assert stats.values['weather/inserted'] == 31 * 24
+    assert elapsed < pipeline.batch_max_age
+    assert mongo_client['weather_db']['weather_observations'].count_documents({}) == 744
+
+
+def test_rerun_skips_stored_and_repeated_rows(spider, mongo_client, stats):
+    pipeline = make_pipeline(spider, mongo_client, stats, batch_size=10)
+    for item in weather_rows(1):
+        pipeline.process_item(item, spider)
+    result_of(pipeline.close_spider(spider))
+
+    pipeline = make_pipeline(spider, mongo_client, stats, batch_size=10)
+    rows = list(weather_rows(2))
+    for item in rows + rows[:5]:
+        pipeline.process_item(item, spider)
+    result_of(pipeline.close_spider(spider))
+
+    assert mongo_client['weather_db']['weather_observations'].count_documents({}) == 48
+    assert stats.values['weather/inserted'] == 48
+    assert stats.values['weather/duplicates'] == 24 + 5
+
+
+def test_items_wait_only_when_every_write_slot_is_taken(spider, mongo_client, stats):
+    pipeline = make_pipeline(spider, mongo_client, stats, batch_size=1, max_pending_writes=1)
+    held = result_of(pipeline.write_slots.acquire())  # a write still in flight
+    item = next(weather_rows(1))
+
+    waiting = pipeline.process_item(item, spider)
+    assert isinstance(waiting, defer.Deferred) and not waiting.called
+    held.release()
+    assert result_of(waiting) is item
+    assert stats.values['weather/inserted'] == 1